@@ -1,13 +1,24 @@
+import asyncio
 import logging
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
 
 from app.core.admin_dependencies import require_admin
 from app.core.dependencies import get_admin_service
 from app.core.exceptions import ResourceNotFoundError
-from app.models.admin import Thread, ThreadDetails
+from app.core.metrics import metrics
+from app.core.profiling import profile_store
+from app.core.serialization import model_response
+from app.models.admin import (BulkCompactionRequest, BulkCompactionResponse,
+                              BulkDeleteRequest, BulkDeleteResponse,
+                              ColdArchiveRequest, ColdArchiveResponse, Thread,
+                              ThreadCompactionRequest, ThreadCompactionResult,
+                              ThreadDetails)
+from app.models.security import SupabaseAuthUser
 from app.services.admin_service import AdminService
+from app.services.cold_storage import cold_thread_store
 
 logger = logging.getLogger(__name__)
 
@@ -28,22 +39,114 @@ async def list_all_threads(
     
     threads = await admin_service.get_all_user_threads()
     logger.info(f"[ADMIN_API] Retrieved {len(threads)} threads with full message data")
-    return threads
+    # Already validated by the service; serialize once, straight to bytes
+    return model_response(List[Thread], threads)
 
 @router.get("/threads/{thread_id}", response_model=ThreadDetails)
 async def get_thread_details(
     thread_id: str,
+    include_archived: bool = False,
     admin_service: AdminService = Depends(get_admin_service)
 ):
-    """Get detailed information about a specific thread including all messages"""
-    logger.info(f"[ADMIN_API] Getting thread details for {thread_id}")
-    thread_details = await admin_service.get_thread_details(thread_id)
+    """Get detailed information about a specific thread including all messages
+    
+    Messages archived by compaction are loaded only with ?include_archived=true
+    """
+    logger.info(f"[ADMIN_API] Getting thread details for {thread_id} (include_archived={include_archived})")
+    thread_details = await admin_service.get_thread_details(thread_id, include_archived=include_archived)
     
     if not thread_details:
         logger.warning(f"[ADMIN_API] Thread not found: {thread_id}")
         raise ResourceNotFoundError("Thread not found", resource_type="thread", resource_id=thread_id)
     
-    return thread_details
+    return model_response(ThreadDetails, thread_details)
+
+@router.post("/threads/bulk-delete", response_model=BulkDeleteResponse)
+async def bulk_delete_threads(
+    request: BulkDeleteRequest,
+    admin_user: SupabaseAuthUser = Depends(require_admin),
+    admin_service: AdminService = Depends(get_admin_service)
+):
+    """Delete many threads by id or metadata filter (admin only, supports dry run)"""
+    logger.info(f"[ADMIN_API] Admin {admin_user.id} requested bulk delete (dry_run={request.dry_run})")
+    
+    result = await admin_service.bulk_delete_threads(
+        thread_ids=request.thread_ids,
+        metadata_filter=request.metadata_filter,
+        dry_run=request.dry_run,
+        admin_user_id=admin_user.id
+    )
+    
+    logger.info(f"[ADMIN_API] Bulk delete matched {result.matched}, deleted {result.deleted}, failed {result.failed}")
+    return result
+
+@router.post("/threads/compact", response_model=BulkCompactionResponse)
+async def compact_threads(
+    request: BulkCompactionRequest,
+    admin_user: SupabaseAuthUser = Depends(require_admin),
+    admin_service: AdminService = Depends(get_admin_service)
+):
+    """Archive old messages of every long thread (admin only, supports dry run)"""
+    logger.info(f"[ADMIN_API] Admin {admin_user.id} requested bulk compaction (dry_run={request.dry_run})")
+    
+    result = await admin_service.compact_threads(
+        min_messages=request.min_messages,
+        keep_turns=request.keep_turns,
+        dry_run=request.dry_run,
+        admin_user_id=admin_user.id
+    )
+    
+    logger.info(f"[ADMIN_API] Compaction matched {result.matched}, compacted {result.compacted}, failed {result.failed}")
+    return result
+
+@router.post("/threads/{thread_id}/compact", response_model=ThreadCompactionResult)
+async def compact_thread(
+    thread_id: str,
+    request: Optional[ThreadCompactionRequest] = None,
+    admin_user: SupabaseAuthUser = Depends(require_admin),
+    admin_service: AdminService = Depends(get_admin_service)
+):
+    """Archive all but the most recent turns of a thread (admin only)"""
+    logger.info(f"[ADMIN_API] Admin {admin_user.id} compacting thread {thread_id}")
+    return await admin_service.compact_thread(
+        thread_id,
+        keep_turns=request.keep_turns if request else None,
+        admin_user_id=admin_user.id
+    )
+
+@router.post("/threads/archive-idle", response_model=ColdArchiveResponse)
+async def archive_idle_threads(
+    request: ColdArchiveRequest,
+    admin_user: SupabaseAuthUser = Depends(require_admin),
+    admin_service: AdminService = Depends(get_admin_service)
+):
+    """Move long-idle threads to the local cold store (admin only, supports dry run)"""
+    logger.info(f"[ADMIN_API] Admin {admin_user.id} requested idle-thread archival (dry_run={request.dry_run})")
+    
+    result = await admin_service.archive_idle_threads(
+        idle_days=request.idle_days,
+        limit=request.limit,
+        dry_run=request.dry_run,
+        admin_user_id=admin_user.id
+    )
+    
+    logger.info(f"[ADMIN_API] Archival matched {result.matched}, archived {result.archived}, failed {result.failed}")
+    return result
+
+@router.post("/threads/{thread_id}/restore")
+async def restore_thread(
+    thread_id: str,
+    admin_service: AdminService = Depends(get_admin_service)
+):
+    """Restore a cold-archived thread into LangGraph"""
+    if not await admin_service.restore_thread(thread_id):
+        raise ResourceNotFoundError("Archived thread not found", resource_type="thread", resource_id=thread_id)
+    return {"message": "Thread restored", "thread_id": thread_id}
+
+@router.get("/cold-threads")
+async def list_cold_threads() -> Dict[str, Dict[str, Any]]:
+    """Threads currently in the cold store with their sizes and archive times"""
+    return cold_thread_store.entries()
 
 @router.delete("/threads/{thread_id}")
 async def delete_thread(
@@ -60,4 +163,22 @@ async def delete_thread(
         return {"message": "Thread deleted successfully", "thread_id": thread_id}
     else:
         logger.error(f"[ADMIN_API] Failed to delete thread {thread_id}")
-        raise HTTPException(status_code=500, detail="Failed to delete thread")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to delete thread")
+
+@router.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """Snapshot of in-process metrics (admission control, queue depth, ...)"""
+    return metrics.snapshot()
+
+@router.get("/profiles")
+async def list_profiles() -> List[Dict[str, Any]]:
+    """Recently captured request profiles, newest first"""
+    return await asyncio.to_thread(profile_store.list)
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str) -> PlainTextResponse:
+    """A request profile as folded stacks (for flamegraph.pl, speedscope, ...)"""
+    profile = await asyncio.to_thread(profile_store.get, profile_id)
+    if profile is None:
+        raise ResourceNotFoundError("Profile not found", resource_type="profile", resource_id=profile_id)
+    return PlainTextResponse(profile["folded"])
@@ -1,13 +1,14 @@
 import logging
 import traceback
 
-import requests
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.core.config import settings
 from app.core.dependencies import get_current_user
 from app.core.exceptions import (BaseAppException, ConfigurationError,
                                  InternalServerError, ValidationError)
+from app.core.metrics import track_upstream
+from app.core.tracing import tracer
 from app.models.security import SupabaseAuthUser
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,9 @@ router = APIRouter(prefix="/api/assistant", tags=["assistant"])
 @router.post("/token")
 async def create_assistant_token(current_user: SupabaseAuthUser = Depends(get_current_user)):
     """Create an assistant-ui cloud token for the authenticated user"""
+    # Imported on first use to keep requests out of cold start
+    import requests
+    
     try:
         logger.info(f"[DEBUG] Current user JWT payload: {current_user}")
         
@@ -50,16 +54,23 @@ async def create_assistant_token(current_user: SupabaseAuthUser = Depends(get_cu
             "Content-Type": "application/json"
         }
         
+        token_url = f"{settings.assistant_api_base_url.rstrip('/')}/v1/auth/tokens"
+        
         logger.info(f"[DEBUG] Request headers: {headers}")
-        logger.info(f"[DEBUG] Making request to: https://backend.assistant-api.com/v1/auth/tokens")
+        logger.info(f"[DEBUG] Making request to: {token_url}")
         
         # Call Assistant Cloud API to create token
         try:
-            response = requests.post(
-                "https://backend.assistant-api.com/v1/auth/tokens",
-                headers=headers,
-                timeout=settings.api_timeout
-            )
+            with tracer.span("assistant_cloud.create_token", kind="client") as span, \
+                    track_upstream("assistant_cloud", "create_token") as upstream_timer:
+                response = requests.post(
+                    token_url,
+                    headers=tracer.inject(dict(headers)),
+                    timeout=settings.api_timeout
+                )
+                span.set_attribute("http.status_code", response.status_code)
+                if response.status_code != 200:
+                    upstream_timer.mark_error(f"http_{response.status_code}")
             
             logger.info(f"[DEBUG] Response status code: {response.status_code}")
             logger.info(f"[DEBUG] Response headers: {dict(response.headers)}")
@@ -1,17 +1,33 @@
-import json
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from pydantic import ValidationError as PydanticValidationError
+from starlette.background import BackgroundTask
 
-from app.core.dependencies import get_langgraph_client
+from app.core.concurrency import stream_governor
+from app.core.dependencies import (get_current_user_optional,
+                                   get_langgraph_client)
+from app.core.metrics import metrics
+from app.core.serialization import json_dumps
+from app.models.chat import SendMessageRequest, parse_send_message
+from app.models.security import SupabaseAuthUser
 from app.services.langgraph_client import LangGraphClient
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["langgraph"])
 
+_streams_in_flight = metrics.gauge(
+    "langgraph_streams_in_flight", "Chat streams currently being relayed to clients"
+)
+
+def sse_frame(event: Dict[str, Any]) -> bytes:
+    """Serialize one event as a server-sent events `data:` frame (UTF-8 bytes)"""
+    return b"data: " + json_dumps(event) + b"\n\n"
+
 class CreateThreadRequest(BaseModel):
     user_id: str
     user_email: str
@@ -19,8 +35,19 @@ class CreateThreadRequest(BaseModel):
 class CreateThreadResponse(BaseModel):
     thread_id: str
 
-class SendMessageRequest(BaseModel):
-    messages: List[Dict[str, Any]]
+async def parse_send_message_request(request: Request) -> SendMessageRequest:
+    """
+    Parse the stream request body in one pass with pydantic-core's JSON parser
+    
+    FastAPI's body handling would json.loads the payload and then validate
+    the resulting dicts; long conversations make that double walk noticeable.
+    """
+    try:
+        return parse_send_message(await request.body())
+    except PydanticValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
 
 @router.post("/threads", response_model=CreateThreadResponse)
 async def create_thread(
@@ -47,20 +74,35 @@ async def get_thread_state(
 @router.post("/threads/{thread_id}/stream")
 async def stream_messages(
     thread_id: str, 
-    request: SendMessageRequest,
+    http_request: Request,
+    request: SendMessageRequest = Depends(parse_send_message_request),
+    current_user: Optional[SupabaseAuthUser] = Depends(get_current_user_optional),
     langgraph_client: LangGraphClient = Depends(get_langgraph_client)
 ):
     """Stream messages with LangGraph"""
+    # Admission control: authenticated users are limited by user id,
+    # anonymous callers by client address
+    if current_user is not None:
+        owner = f"user:{current_user.id}"
+    else:
+        owner = f"ip:{http_request.client.host if http_request.client else 'unknown'}"
+    
+    # Acquire before the response starts so rejections get a proper 429/503
+    lease = await stream_governor.acquire(owner)
     
     async def event_stream():
+        _streams_in_flight.inc()
         try:
             async for event in langgraph_client.stream_messages(
-                thread_id, request.messages
+                thread_id, request["messages"]
             ):
-                yield f"data: {json.dumps(event)}\n\n"
+                yield sse_frame(event)
         except Exception as e:
             error_event = {"type": "error", "data": {"message": str(e)}}
-            yield f"data: {json.dumps(error_event)}\n\n"
+            yield sse_frame(error_event)
+        finally:
+            _streams_in_flight.dec()
+            lease.release()
     
     return StreamingResponse(
         event_stream(),
@@ -69,5 +111,7 @@ async def stream_messages(
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "Access-Control-Allow-Origin": "*",
-        }
+        },
+        # Also release if the body is never iterated (e.g. client went away)
+        background=BackgroundTask(lease.release)
     ) 
\ No newline at end of file
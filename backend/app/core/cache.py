@@ -0,0 +1,122 @@
+"""
+Small asyncio-friendly caching primitives.
+
+- SingleFlight: coalesces concurrent calls for the same key into one
+  in-flight task whose result is shared by every caller.
+- TTLCache: bounded LRU cache whose entries expire after a fixed TTL.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import (Any, Awaitable, Callable, Dict, Hashable, Optional,
+                    Tuple)
+
+from app.core.metrics import metrics
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between concurrent callers of the same key.
+
+    The work runs in its own task, so a caller that is cancelled (e.g. the
+    client disconnected) does not cancel the call for everyone else.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._calls = metrics.counter(
+            f"{name}_singleflight_calls_total",
+            "Calls made through single-flight, by whether they started or joined a call",
+            ["result"]
+        )
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn` for `key`, or join the call already in flight for it"""
+        task = self._inflight.get(key)
+        if task is None:
+            self._calls.inc(result="leader")
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self._calls.inc(result="coalesced")
+        return await asyncio.shield(task)
+
+    def owns(self, key: Hashable, task: Optional[asyncio.Task]) -> bool:
+        """True if `task` is still the registered call for `key` (not forgotten)"""
+        return task is not None and self._inflight.get(key) is task
+
+    def forget(self, key: Hashable) -> None:
+        """Detach the in-flight call for `key` so later callers start a new one"""
+        self._inflight.pop(key, None)
+
+    def forget_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [k for k in self._inflight if predicate(k)]:
+            self._inflight.pop(key, None)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry expiry.
+
+    A TTL of 0 disables the cache: get() always misses and set() is a no-op.
+    """
+
+    def __init__(self, name: str, ttl: float, max_size: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lookups = metrics.counter(
+            f"{name}_cache_lookups_total", "Cache lookups by result", ["result"]
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self._lookups.inc(result="miss")
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._lookups.inc(result="expired")
+            return None
+        self._entries.move_to_end(key)
+        self._lookups.inc(result="hit")
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [k for k in self._entries if predicate(k)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,204 @@
+"""
+Admission control for long-running upstream work.
+
+The governor caps how many runs a single user and the whole worker may hold
+open at once. Requests that cannot get a global slot wait in a bounded queue
+for a limited time; everything else is rejected early with a structured error
+instead of piling more load onto the LangGraph server.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict
+
+from app.core.config import settings
+from app.core.exceptions import RateLimitError, ServiceUnavailableError
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLease:
+    """
+    A granted slot. Release it exactly once when the run finishes;
+    extra calls to release() are ignored.
+    """
+
+    def __init__(self, governor: "ConcurrencyGovernor", key: str):
+        self._governor = governor
+        self.key = key
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._governor._release(self.key)
+
+    async def __aenter__(self) -> "ConcurrencyLease":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+class ConcurrencyGovernor:
+    """
+    Per-user and global concurrency limiter with a bounded wait queue.
+
+    - A user already holding `per_user_limit` runs is rejected immediately
+      with RateLimitError (429).
+    - When all `global_limit` slots are busy the request waits in a queue of
+      at most `max_queue` entries for up to `queue_timeout` seconds, after
+      which (or if the queue is full) it is rejected with
+      ServiceUnavailableError (503).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        global_limit: int,
+        per_user_limit: int,
+        max_queue: int,
+        queue_timeout: float
+    ):
+        self.name = name
+        self.global_limit = global_limit
+        self.per_user_limit = per_user_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._global = asyncio.Semaphore(global_limit)
+        self._user_active: Dict[str, int] = {}
+        self._waiting = 0
+
+        self._active_gauge = metrics.gauge(
+            f"{name}_active", "Runs currently holding a concurrency slot"
+        )
+        self._queue_gauge = metrics.gauge(
+            f"{name}_queue_depth", "Runs waiting for a global concurrency slot"
+        )
+        self._admitted = metrics.counter(
+            f"{name}_admitted_total", "Runs granted a concurrency slot"
+        )
+        self._rejected = metrics.counter(
+            f"{name}_rejected_total", "Runs rejected by admission control", ["reason"]
+        )
+        self._wait_seconds = metrics.counter(
+            f"{name}_queue_wait_seconds_total", "Total time admitted runs spent queued"
+        )
+
+    @property
+    def active(self) -> int:
+        return sum(self._user_active.values())
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    async def acquire(self, key: str) -> ConcurrencyLease:
+        """
+        Acquire a slot for `key` (usually a user id).
+
+        Raises:
+            RateLimitError: If the key already holds its maximum number of runs
+            ServiceUnavailableError: If the queue is full or the wait timed out
+        """
+        if self._user_active.get(key, 0) >= self.per_user_limit:
+            self._rejected.inc(reason="per_user_limit")
+            logger.warning(
+                "Concurrency limit reached for user",
+                extra={"governor": self.name, "key": key, "limit": self.per_user_limit}
+            )
+            raise RateLimitError(
+                message="Too many concurrent requests",
+                limit=self.per_user_limit,
+                window="concurrent",
+                context={"scope": "user"}
+            )
+
+        # Reserve the per-user slot before waiting so parallel arrivals
+        # from the same user cannot overshoot the limit
+        self._user_active[key] = self._user_active.get(key, 0) + 1
+        try:
+            await self._acquire_global(key)
+        except BaseException:
+            self._release_user(key)
+            raise
+
+        self._admitted.inc()
+        self._active_gauge.set(self.active)
+        return ConcurrencyLease(self, key)
+
+    async def _acquire_global(self, key: str) -> None:
+        if not self._global.locked():
+            await self._global.acquire()
+            return
+
+        if self._waiting >= self.max_queue:
+            self._rejected.inc(reason="queue_full")
+            logger.warning(
+                "Concurrency queue full",
+                extra={"governor": self.name, "key": key, "queue_depth": self._waiting}
+            )
+            raise ServiceUnavailableError(
+                message="Server is at capacity, please retry shortly",
+                context={"reason": "queue_full"}
+            )
+
+        self._waiting += 1
+        self._queue_gauge.set(self._waiting)
+        started = time.monotonic()
+        # Not wait_for: on timeout or cancellation it can drop a permit the
+        # semaphore granted in the same loop iteration
+        waiter = asyncio.ensure_future(self._global.acquire())
+        try:
+            try:
+                done, _ = await asyncio.wait({waiter}, timeout=self.queue_timeout)
+            except BaseException:
+                self._abandon(waiter)
+                raise
+            if not done:
+                self._abandon(waiter)
+                self._rejected.inc(reason="queue_timeout")
+                logger.warning(
+                    "Timed out waiting for concurrency slot",
+                    extra={"governor": self.name, "key": key, "timeout": self.queue_timeout}
+                )
+                raise ServiceUnavailableError(
+                    message="Server is at capacity, please retry shortly",
+                    context={"reason": "queue_timeout"}
+                )
+        finally:
+            self._waiting -= 1
+            self._queue_gauge.set(self._waiting)
+
+        self._wait_seconds.inc(time.monotonic() - started)
+
+    def _abandon(self, waiter: "asyncio.Future[bool]") -> None:
+        """Give up on a pending global acquire, returning the permit if it was granted"""
+        if not waiter.cancel() and not waiter.cancelled() and waiter.exception() is None:
+            self._global.release()
+
+    def _release_user(self, key: str) -> None:
+        remaining = self._user_active.get(key, 0) - 1
+        if remaining > 0:
+            self._user_active[key] = remaining
+        else:
+            self._user_active.pop(key, None)
+
+    def _release(self, key: str) -> None:
+        self._release_user(key)
+        self._global.release()
+        self._active_gauge.set(self.active)
+
+
+# Governor for LangGraph streaming runs (one per worker process)
+stream_governor = ConcurrencyGovernor(
+    name="langgraph_stream",
+    global_limit=settings.max_concurrent_streams,
+    per_user_limit=settings.max_concurrent_streams_per_user,
+    max_queue=settings.stream_queue_size,
+    queue_timeout=settings.stream_queue_timeout
+)
@@ -1,16 +1,22 @@
 # type: ignore
+import atexit
 import logging
-import sys
 from typing import List, Optional
 
 from pydantic import validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from app.core.log_handlers import (ErrorDeduplicationFilter, JsonFormatter,
+                                   SamplingFilter, StdoutHandler,
+                                   parse_sample_rates, start_queue_logging,
+                                   stop_queue_logging)
+
 
 class Settings(BaseSettings):
     # Assistant UI Cloud (Public) - REQUIRED
     assistant_ui_cloud_url: str
     assistant_api_key: str
+    assistant_api_base_url: str = "https://backend.assistant-api.com"
     
     # LangGraph Configuration - REQUIRED
     langgraph_api_url: str
@@ -29,6 +35,16 @@ class Settings(BaseSettings):
     server_host: str
     server_port: int
     server_reload: bool
+    server_workers: int = 1  # >1 runs pre-forked workers under a supervisor
+    server_loop: str = "auto"  # "auto" (uvloop when installed), "uvloop" or "asyncio"
+    server_http: str = "auto"  # "auto" (httptools when installed), "httptools" or "h11"
+    server_reuse_port: bool = False  # each worker binds its own SO_REUSEPORT socket
+    server_max_requests: int = 0  # recycle a worker after this many requests; 0 never
+    server_max_requests_jitter: int = 0  # random extra requests so workers recycle at different times
+    server_keep_alive: int = 65  # idle keep-alive seconds; keep above the load balancer's idle timeout
+    server_backlog: int = 2048  # pending connections per listening socket (capped by net.core.somaxconn)
+    server_graceful_timeout: float = 30.0  # seconds to drain in-flight requests on recycle/shutdown
+    server_preload_modules: bool = True  # import deferred SDKs in the background once serving
     
     # CORS Configuration - Operational defaults OK
     cors_origins: List[str]
@@ -41,9 +57,75 @@ class Settings(BaseSettings):
     default_thread_limit: int
     content_preview_length: int
     
+    # Stream Admission Control - Operational defaults OK
+    max_concurrent_streams: int = 64
+    max_concurrent_streams_per_user: int = 3
+    stream_queue_size: int = 128
+    stream_queue_timeout: float = 10.0
+    
+    # Thread State Cache - Operational defaults OK (TTL 0 disables caching)
+    thread_state_cache_ttl: float = 0.0
+    thread_state_cache_size: int = 1024
+    
+    # Admin Bulk Operations - Operational defaults OK
+    bulk_delete_concurrency: int = 8
+    bulk_delete_max_threads: int = 1000
+    
+    # Thread Compaction - Operational defaults OK
+    thread_archive_dir: str = "thread_archive"  # compressed message archives, one directory per thread
+    thread_compaction_keep_turns: int = 20  # user turns left in thread state
+    thread_compaction_min_messages: int = 100  # bulk compaction skips shorter threads
+    
+    # Cold Thread Archival - Operational defaults OK
+    thread_cold_store_dir: str = "thread_cold_store"
+    thread_cold_codec: str = "gzip"  # "gzip" or "zstd" (needs the zstandard package)
+    thread_cold_segment_max_bytes: int = 64 * 1024 * 1024
+    thread_cold_idle_days: float = 90.0  # threads untouched this long are archived
+    thread_cold_batch_limit: int = 500  # threads examined per archival run
+    
+    # Warm Thread Pool - Operational defaults OK (0 disables the pool)
+    thread_pool_size: int = 0
+    thread_pool_ttl: float = 3600.0  # seconds before an unclaimed pool thread is replaced
+    
+    # LangGraph Resilience - Operational defaults OK (hedge delay 0 disables hedging)
+    langgraph_retry_attempts: int = 3
+    langgraph_retry_base_delay: float = 0.1
+    langgraph_retry_max_delay: float = 2.0
+    langgraph_breaker_failure_threshold: int = 5
+    langgraph_breaker_recovery_timeout: float = 30.0
+    langgraph_hedge_delay: float = 0.0
+    
     # Environment & Logging - Operational defaults OK
     environment: str
     log_level: str
+    log_format: str = "json"  # "json" or "text"
+    log_queue_size: int = 10000  # records buffered before new ones are dropped
+    log_sample_rates: str = ""  # e.g. "app.core.middleware=0.1"; below-WARNING records only
+    log_error_dedup_window: float = 60.0  # seconds; 0 disables error deduplication
+    error_traceback_window: float = 60.0  # seconds between tracebacks per raising site; 0 logs every one
+    
+    # Metrics - Operational defaults OK (exposes GET /metrics)
+    metrics_enabled: bool = True
+    
+    # Event loop monitor - Operational defaults OK
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval: float = 0.1  # seconds between lag samples
+    loop_block_threshold: float = 0.25  # log the blocking stack past this lag
+    
+    # Request profiling - Operational defaults OK (middleware not installed unless enabled)
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0  # fraction of requests profiled without the admin header
+    profiling_interval: float = 0.005  # seconds between stack samples
+    profiling_max_profiles: int = 20  # most recent profiles kept
+    profiling_dir: str = ""  # share profiles between workers through this directory; "" keeps them in memory
+    
+    # Tracing - Operational defaults OK (off unless enabled)
+    tracing_enabled: bool = False
+    tracing_sample_rate: float = 0.1  # fraction of new traces recorded
+    tracing_exporter: str = "file"  # "file" or "otlp"
+    tracing_file_path: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_service_name: str = "assistant-ui-backend"
     
     # HTTP Status Codes - Operational defaults OK
     default_error_status_code: int
@@ -77,15 +159,29 @@ class Settings(BaseSettings):
 settings = Settings()
 
 # Configure logging
+_log_listener = None
+_error_dedup_filter = None
+
+
 def setup_logging():
-    """Configure structured logging for the application"""
+    """
+    Configure structured logging for the application
+    
+    The root logger only enqueues records (never blocks on stdout); a
+    background QueueListener formats them (JSON by default) and writes them.
+    """
+    global _log_listener, _error_dedup_filter
+    
     log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
     
     # Create formatter
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    if settings.log_format.lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
     
     # Configure root logger
     root_logger = logging.getLogger()
@@ -94,17 +190,52 @@ def setup_logging():
     # Remove existing handlers to avoid duplicates
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    stop_queue_logging(_log_listener)
     
-    # Add console handler
-    console_handler = logging.StreamHandler(sys.stdout)
+    # Console handler runs on the listener thread; it looks sys.stdout up
+    # per record so records flushed at exit never hit a replaced, closed stream
+    console_handler = StdoutHandler()
     console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    
+    queue_handler, _log_listener = start_queue_logging(
+        [console_handler], max_queue_size=settings.log_queue_size
+    )
+    
+    # Sampling and error deduplication run before records are queued
+    sample_rates = parse_sample_rates(settings.log_sample_rates)
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+    _error_dedup_filter = None
+    if settings.log_error_dedup_window > 0:
+        _error_dedup_filter = ErrorDeduplicationFilter(settings.log_error_dedup_window)
+        queue_handler.addFilter(_error_dedup_filter)
+    
+    root_logger.addHandler(queue_handler)
     
     # Set third-party loggers to WARNING to reduce noise
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
     logging.getLogger("fastapi").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
 
+
+def shutdown_logging():
+    """Report pending duplicate-error counts, flush queued records and stop the listener"""
+    global _log_listener, _error_dedup_filter
+    if _error_dedup_filter is not None and _log_listener is not None:
+        for (logger_name, _, message, _), count in _error_dedup_filter.pending_summaries():
+            _log_listener.handle(logging.makeLogRecord({
+                "name": logger_name,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Suppressed {count} duplicate log records: {message}",
+                "suppressed_in_last_window": count
+            }))
+    stop_queue_logging(_log_listener)
+    _log_listener = None
+    _error_dedup_filter = None
+
+
 # Initialize logging when config is imported
-setup_logging() 
\ No newline at end of file
+setup_logging()
+atexit.register(shutdown_logging)
\ No newline at end of file
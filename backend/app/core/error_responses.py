@@ -0,0 +1,157 @@
+"""
+Lean rendering for error responses.
+
+During an upstream outage nearly every request ends in an exception
+handler, so the error path has to stay cheap:
+
+- bodies for the common "no details" errors are spliced from pre-encoded
+  JSON around the per-request correlation id and timestamp, without
+  building or validating an ErrorResponse model
+- full tracebacks are formatted at most once per window for each raising
+  site; repeats only report how many were skipped
+- Starlette re-raises unhandled exceptions to the server after the
+  response is sent; the server's own traceback log is dropped for the
+  ones the app already logged
+
+The wire format matches app.models.error.ErrorResponse.
+"""
+
+import functools
+import logging
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.responses import Response
+
+from app.core.serialization import json_dumps
+
+# (status_code, error, message) bodies encoded ahead of the first request
+COMMON_ERRORS = (
+    (400, "HTTP_ERROR", "Bad Request"),
+    (401, "HTTP_ERROR", "Not authenticated"),
+    (403, "HTTP_ERROR", "Not authenticated"),
+    (403, "HTTP_ERROR", "Forbidden"),
+    (404, "HTTP_ERROR", "Not Found"),
+    (405, "HTTP_ERROR", "Method Not Allowed"),
+    (429, "HTTP_ERROR", "Too Many Requests"),
+    (500, "INTERNAL_SERVER_ERROR", "An unexpected error occurred"),
+    (502, "HTTP_ERROR", "Bad Gateway"),
+    (503, "HTTP_ERROR", "Service Unavailable"),
+    (504, "HTTP_ERROR", "Gateway Timeout"),
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _template(status_code: int, error: str, message: str, empty_details: bool) -> Tuple[bytes, bytes]:
+    head = json_dumps({"success": False, "error": error, "message": message})
+    tail = json_dumps({"status_code": status_code, "details": {} if empty_details else None, "validation_errors": None})
+    return head[:-1] + b',"correlation_id":', b'",' + tail[1:]
+
+
+def error_body(
+    status_code: int,
+    error: str,
+    message: str,
+    correlation_id: str,
+    timestamp: str,
+    details: Optional[Dict[str, Any]] = None,
+    validation_errors: Optional[List[Dict[str, Any]]] = None
+) -> bytes:
+    """Encode an ErrorResponse-shaped body"""
+    if details or validation_errors:
+        return json_dumps({
+            "success": False,
+            "error": error,
+            "message": message,
+            "correlation_id": correlation_id,
+            "timestamp": timestamp,
+            "status_code": status_code,
+            "details": details,
+            "validation_errors": validation_errors,
+        })
+
+    head, tail = _template(status_code, error, message, details is not None)
+    # The id may come from a caller, so it is encoded; timestamps are ours
+    return head + json_dumps(correlation_id) + b',"timestamp":"' + timestamp.encode() + tail
+
+
+def error_response(status_code: int, *args: Any, **kwargs: Any) -> Response:
+    """JSON error response; see error_body for the arguments"""
+    return Response(
+        content=error_body(status_code, *args, **kwargs),
+        status_code=status_code,
+        media_type="application/json"
+    )
+
+
+class TracebackSampler:
+    """
+    Format a full traceback at most once per `window` seconds per signature.
+
+    The signature is the exception type and the innermost frame it was
+    raised from, so one failing call site in a storm costs a single
+    traceback per window while a new failure is still captured right away.
+    `window` 0 always formats.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._lock = threading.Lock()
+        # signature -> (window start, skipped count)
+        self._windows: Dict[Tuple[Any, ...], Tuple[float, int]] = {}
+
+    @staticmethod
+    def signature(exc: BaseException) -> Tuple[Any, ...]:
+        tb = exc.__traceback__
+        if tb is None:
+            return (type(exc),)
+        while tb.tb_next is not None:
+            tb = tb.tb_next
+        return (type(exc), tb.tb_frame.f_code.co_filename, tb.tb_lineno)
+
+    def capture(self, exc: BaseException) -> Tuple[Optional[str], int]:
+        """
+        Return (traceback text or None, tracebacks skipped before this one)
+
+        None means this signature was already captured in the current window.
+        """
+        if self.window > 0:
+            key = self.signature(exc)
+            now = time.monotonic()
+            with self._lock:
+                started, skipped = self._windows.get(key, (0.0, 0))
+                if now - started < self.window:
+                    self._windows[key] = (started, skipped + 1)
+                    return None, 0
+                self._windows[key] = (now, 0)
+                if len(self._windows) > 1024:
+                    self._prune(now)
+        else:
+            skipped = 0
+        return "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)), skipped
+
+    def _prune(self, now: float) -> None:
+        for key in [k for k, (started, _) in self._windows.items() if now - started >= self.window]:
+            del self._windows[key]
+
+
+class HandledErrorFilter(logging.Filter):
+    """Drop server log records for exceptions the app handler already logged"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        exc = record.exc_info[1] if record.exc_info else None
+        return not getattr(exc, "_app_logged", False)
+
+
+def mark_logged(exc: BaseException) -> None:
+    """Flag `exc` as logged so HandledErrorFilter skips its re-raise"""
+    try:
+        exc._app_logged = True
+    except AttributeError:
+        pass
+
+
+for _error in COMMON_ERRORS:
+    _template(*_error, False)
@@ -6,17 +6,47 @@ handling throughout the application, enabling better error handling, logging,
 and API responses.
 """
 
-import uuid
-from datetime import datetime
+import random
+import time
+from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") of the last formatted timestamp
+_last_second = (-1, "")
+
+
+def new_correlation_id() -> str:
+    """
+    Random version 4 UUID string for correlating an error with its logs
+
+    Drawn from the process PRNG (reseeded after fork) instead of
+    os.urandom: correlation ids need to be unique, not unguessable.
+    """
+    value = random.getrandbits(128)
+    value = (value & ~(0xF000 << 64) | (0x4000 << 64)) & ~(0xC000 << 48) | (0x8000 << 48)
+    text = f"{value:032x}"
+    return f"{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}"
+
+
+def utc_timestamp(epoch: Optional[float] = None) -> str:
+    """ISO 8601 UTC timestamp (naive, microsecond precision) for `epoch` or now"""
+    global _last_second
+    if epoch is None:
+        epoch = time.time()
+    second = int(epoch)
+    if _last_second[0] != second:
+        _last_second = (second, datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"))
+    return f"{_last_second[1]}.{int((epoch - second) * 1_000_000):06d}"
+
 
 class BaseAppException(Exception):
     """
     Base exception class for all application-specific exceptions.
     
     Provides common functionality like correlation IDs, HTTP status codes,
-    error context, and structured error messages.
+    error context, and structured error messages. The correlation ID and
+    timestamp are only formatted when first read, so exceptions that are
+    caught and handled internally stay cheap.
     """
     
     def __init__(
@@ -32,8 +62,25 @@ class BaseAppException(Exception):
         self.status_code = status_code
         self.error_code = error_code or self.__class__.__name__
         self.context = context or {}
-        self.correlation_id = correlation_id or str(uuid.uuid4())
-        self.timestamp = datetime.utcnow().isoformat()
+        self._correlation_id = correlation_id
+        self._created = time.time()
+        self._timestamp: Optional[str] = None
+    
+    @property
+    def correlation_id(self) -> str:
+        if self._correlation_id is None:
+            self._correlation_id = new_correlation_id()
+        return self._correlation_id
+    
+    @correlation_id.setter
+    def correlation_id(self, value: str) -> None:
+        self._correlation_id = value
+    
+    @property
+    def timestamp(self) -> str:
+        if self._timestamp is None:
+            self._timestamp = utc_timestamp(self._created)
+        return self._timestamp
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert exception to dictionary for API responses"""
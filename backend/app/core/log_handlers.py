@@ -0,0 +1,291 @@
+"""
+Logging handlers, filters and formatters used by setup_logging.
+
+Log calls on the event loop only push the record onto a bounded in-memory
+queue; a QueueListener thread does the JSON formatting and the actual write.
+When the queue is full records are dropped and counted rather than blocking
+the request that logged them.
+
+Before a record is queued, optional filters sample routine (below WARNING)
+logs per logger and collapse repeated identical errors within a time window.
+"""
+
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.metrics import metrics
+
+_dropped_records = metrics.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+_sampled_out_records = metrics.counter(
+    "log_records_sampled_out_total", "Routine log records skipped by sampling", ["logger"]
+)
+_suppressed_errors = metrics.counter(
+    "log_errors_suppressed_total", "Repeated error records collapsed by deduplication", ["logger"]
+)
+
+# Extra fields that carry bulky diagnostics; stripped from duplicate errors
+_BULKY_EXTRA_FIELDS = ("traceback", "context", "validation_errors")
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RESERVED_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None)).keys()
+) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra=` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class StdoutHandler(logging.StreamHandler):
+    """
+    StreamHandler that writes to whatever sys.stdout is when a record is
+    emitted rather than the stream that was current at setup. Test runners
+    and servers swap and close stdout; records flushed at exit then go to the
+    live stream, or are skipped once it is closed, instead of raising.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self) -> Any:
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value: Any) -> None:
+        pass
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if getattr(self.stream, "closed", False):
+            return
+        super().emit(record)
+
+    def flush(self) -> None:
+        if not getattr(self.stream, "closed", False):
+            super().flush()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks: when the queue is full the record is
+    dropped and counted. The next record that fits is preceded by a warning
+    saying how many were lost.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported_drops = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now, since they may be mutated after the call returns;
+        # all other formatting happens on the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._unreported_drops:
+            notice = logging.LogRecord(
+                name=__name__, level=logging.WARNING, pathname=__file__, lineno=0,
+                msg=f"Dropped {self._unreported_drops} log records (log queue full)",
+                args=None, exc_info=None
+            )
+            notice.dropped_records = self._unreported_drops
+            try:
+                self.queue.put_nowait(notice)
+                self._unreported_drops = 0
+            except queue.Full:
+                pass
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported_drops += 1
+            _dropped_records.inc()
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener whose stop() waits for room in a full queue instead of failing"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse "logger=rate,other.logger=rate" into a dict, e.g.
+    "app.core.middleware=0.1" keeps 10% of routine middleware logs.
+    """
+    rates: Dict[str, float] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of routine records (below WARNING) for configured
+    loggers. The most specific logger prefix wins; warnings and errors are
+    never sampled.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def _rate_for(self, logger_name: str) -> float:
+        rate = self._resolved.get(logger_name)
+        if rate is None:
+            rate = 1.0
+            best = -1
+            for prefix, prefix_rate in self.rates.items():
+                if (logger_name == prefix or logger_name.startswith(prefix + ".")) and len(prefix) > best:
+                    rate, best = prefix_rate, len(prefix)
+            self._resolved[logger_name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        _sampled_out_records.inc(logger=record.name)
+        return False
+
+
+class ErrorDeduplicationFilter(logging.Filter):
+    """
+    Collapse repeated errors (WARNING and above) with the same signature.
+
+    The first occurrence in each `window` seconds passes untouched. Later
+    duplicates lose their traceback and other bulky fields; duplicates that
+    carry a correlation_id are still logged in this compact form so the id
+    can be traced, the rest are dropped. The first record of the next window
+    carries `suppressed_in_last_window` with the count.
+
+    Messages often embed ids or exception text, so every distinct one is a
+    new signature. Once more than `max_signatures` are tracked, expired
+    windows are removed and, if that is not enough, the oldest ones; their
+    pending counts are only reported by shutdown's final flush if kept.
+    """
+
+    def __init__(self, window: float, max_signatures: int = 1024):
+        super().__init__()
+        self.window = window
+        self.max_signatures = max_signatures
+        self._lock = threading.Lock()
+        # signature -> (window start, suppressed count)
+        self._windows: Dict[Tuple[Any, ...], Tuple[float, int]] = {}
+
+    @staticmethod
+    def signature(record: logging.LogRecord) -> Tuple[Any, ...]:
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        return (
+            record.name,
+            record.levelno,
+            record.msg if isinstance(record.msg, str) else repr(record.msg),
+            exc_type or getattr(record, "exception_type", None) or getattr(record, "error_code", None),
+        )
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+
+        key = self.signature(record)
+        now = time.monotonic()
+        with self._lock:
+            started, suppressed = self._windows.get(key, (0.0, 0))
+            if now - started >= self.window:
+                self._windows[key] = (now, 0)
+                if len(self._windows) > self.max_signatures:
+                    self._prune(now)
+                if suppressed:
+                    record.suppressed_in_last_window = suppressed
+                return True
+            self._windows[key] = (started, suppressed + 1)
+
+        _suppressed_errors.inc(logger=record.name)
+        if getattr(record, "correlation_id", None) is None:
+            return False
+
+        # Keep the correlation id, drop the expensive parts
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        for field in _BULKY_EXTRA_FIELDS:
+            record.__dict__.pop(field, None)
+        record.duplicate = True
+        return True
+
+    def _prune(self, now: float) -> None:
+        for key in [k for k, (started, _) in self._windows.items() if now - started >= self.window]:
+            del self._windows[key]
+        excess = len(self._windows) - self.max_signatures // 2
+        if excess > 0 and len(self._windows) > self.max_signatures:
+            oldest = sorted(self._windows.items(), key=lambda item: item[1][0])[:excess]
+            for key, _ in oldest:
+                del self._windows[key]
+
+    def pending_summaries(self) -> List[Tuple[Tuple[Any, ...], int]]:
+        """Signatures with duplicates not yet reported, for a final flush"""
+        with self._lock:
+            return [(key, count) for key, (_, count) in self._windows.items() if count]
+
+
+def start_queue_logging(
+    handlers: List[logging.Handler],
+    max_queue_size: int
+) -> "tuple[DroppingQueueHandler, DrainingQueueListener]":
+    """
+    Create a bounded queue, a DroppingQueueHandler feeding it and a started
+    QueueListener that dispatches records to `handlers` on a background thread.
+    """
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=max_queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = DrainingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return queue_handler, listener
+
+
+def stop_queue_logging(listener: Optional[QueueListener]) -> None:
+    """Flush and stop a listener started by start_queue_logging"""
+    if listener is not None and listener._thread is not None:
+        listener.stop()
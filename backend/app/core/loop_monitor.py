@@ -0,0 +1,154 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+
+A coroutine on the event loop wakes up every `interval` seconds and records
+how late it woke up as `event_loop_lag_seconds`. Lag means something ran on
+the loop without yielding: a synchronous HTTP call, a Supabase `.execute()`,
+heavy JSON work and so on.
+
+A watchdog thread watches the coroutine's heartbeat. When the loop has not
+come back for longer than `threshold`, the watchdog grabs the loop thread's
+current stack and logs it, together with the route being served, while the
+offending call is still running.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Lag is normally a few milliseconds; the tail is what matters
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Frames kept in a logged stack (innermost last)
+STACK_LIMIT = 30
+
+
+def _route_from_stack(frame) -> Optional[str]:
+    """
+    Find the request being served by looking for an ASGI `scope` in the
+    blocked stack. Returns the route template when routing has happened.
+    """
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            route = getattr(scope.get("route"), "path", None)
+            return f"{scope.get('method', '')} {route or scope.get('path', '')}".strip()
+        frame = frame.f_back
+    return None
+
+
+class EventLoopMonitor:
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        # Monotonic time the loop last checked in; read by the watchdog thread
+        self._heartbeat = 0.0
+
+        self._lag = metrics.histogram(
+            "event_loop_lag_seconds", "Delay between scheduled and actual monitor wake-ups",
+            buckets=LAG_BUCKETS
+        )
+        self._max_lag = metrics.gauge(
+            "event_loop_lag_max_seconds", "Largest event loop lag seen since startup"
+        )
+        self._blocked = metrics.counter(
+            "event_loop_blocked_total", "Times the event loop was blocked past the threshold", ["route"]
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start measuring lag on the current loop and the watchdog thread"""
+        if self._task is not None:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            "Event loop monitor started",
+            extra={"interval": self.interval, "threshold": self.threshold}
+        )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.interval * 2)
+            self._watchdog = None
+
+    async def _measure(self) -> None:
+        max_lag = 0.0
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            lag = max(0.0, now - expected)
+            self._lag.observe(lag)
+            if lag > max_lag:
+                max_lag = lag
+                self._max_lag.set(lag)
+
+    def _watch(self) -> None:
+        # Check several times per threshold so the stack is caught mid-block
+        poll = max(0.01, min(self.interval, self.threshold / 4))
+        reported_heartbeat: Optional[float] = None
+
+        while not self._stopping.wait(poll):
+            heartbeat = self._heartbeat
+            # Budget is one sleep interval plus the allowed lag
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.threshold or heartbeat == reported_heartbeat:
+                continue
+
+            # Report each stall once, as soon as it crosses the threshold
+            reported_heartbeat = heartbeat
+            self._report(blocked_for)
+
+    def _report(self, blocked_for: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+
+        route = _route_from_stack(frame) or "unknown"
+        stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+        self._blocked.inc(route=route)
+        logger.warning(
+            f"Event loop blocked for {blocked_for:.3f}s while serving {route}",
+            extra={"route": route, "blocked_seconds": round(blocked_for, 3), "stack": stack}
+        )
+
+
+# Process-wide monitor, started from the application lifespan
+loop_monitor = EventLoopMonitor(
+    interval=settings.loop_monitor_interval,
+    threshold=settings.loop_block_threshold
+)
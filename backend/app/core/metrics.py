@@ -0,0 +1,293 @@
+"""
+In-process metrics registry for the Assistant UI LangGraph Backend.
+
+Metrics are kept in memory as plain values keyed by label tuples, so recording
+a sample is a dictionary update that never blocks the event loop. The registry
+can be snapshotted as a dictionary for the admin API or rendered in the
+Prometheus text exposition format for GET /metrics.
+
+Each worker process has its own registry, and a scrape (or admin request)
+reaches whichever worker accepts it. Every sample therefore carries a
+`worker` label with the process id: each worker is its own series, so
+counters only reset when that worker restarts, and per-series `rate()`
+summed over `worker` gives correct totals for the whole server.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+LabelKey = Tuple[str, ...]
+
+# Latency buckets in seconds, from fast local calls up to long model streams
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Metric:
+    """Base class for named metrics with an optional fixed set of labels"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        """Build the storage key for a set of label values"""
+        if not self.labelnames:
+            return ()
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def get(self, **labels) -> float:
+        """Return the current value for the given labels (0 if never recorded)"""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Dict[str, Any]]:
+        """Return all recorded values with their labels"""
+        return [
+            {"labels": dict(zip(self.labelnames, key)), "value": value}
+            for key, value in list(self._values.items())
+        ]
+
+
+class Counter(Metric):
+    """Monotonically increasing value, e.g. number of rejected requests"""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Value that can go up and down, e.g. current queue depth"""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Distribution of observed values (e.g. latencies) in fixed buckets"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label key: [count per bucket..., count above last bucket], sum
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def get(self, **labels) -> float:
+        """Return the number of observations for the given labels"""
+        return float(sum(self._counts.get(self._key(labels), ())))
+
+    def samples(self) -> List[Dict[str, Any]]:
+        result = []
+        for key, counts in list(self._counts.items()):
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else repr(bound)] = cumulative
+            result.append({
+                "labels": dict(zip(self.labelnames, key)),
+                "count": cumulative,
+                "sum": self._sums.get(key, 0.0),
+                "buckets": buckets,
+            })
+        return result
+
+
+class MetricsRegistry:
+    """
+    Process-wide collection of metrics.
+
+    Registering the same name twice returns the existing metric so modules can
+    declare their metrics at import time without coordinating.
+    """
+
+    def __init__(self, const_labels: Optional[Dict[str, str]] = None):
+        self.const_labels = dict(const_labels or {})
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name: str, description: str, labelnames: Sequence[str], **kwargs) -> Any:
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, metric_class):
+                    raise ValueError(f"Metric {name} already registered as {existing.metric_type}")
+                return existing
+            metric = metric_class(name, description, labelnames, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._register(Counter, name, description, labelnames)
+
+    def gauge(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._register(Gauge, name, description, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram"""
+        return self._register(Histogram, name, description, labelnames, buckets=buckets)
+
+    def collect(self) -> List[Metric]:
+        """Return all registered metrics in registration order"""
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of every metric"""
+        return {
+            metric.name: {
+                "type": metric.metric_type,
+                "description": metric.description,
+                "samples": [
+                    {**sample, "labels": {**sample["labels"], **self.const_labels}}
+                    for sample in metric.samples()
+                ],
+            }
+            for metric in self.collect()
+        }
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format (0.0.4)"""
+        lines: List[str] = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.description)}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for sample in metric.samples():
+                labels = {**sample["labels"], **self.const_labels}
+                if isinstance(metric, Histogram):
+                    for bound, count in sample["buckets"].items():
+                        lines.append(f"{metric.name}_bucket{_format_labels(labels, le=bound)} {count}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {sample['count']}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(sample['value'])}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str], **extra: str) -> str:
+    items = {**labels, **extra}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(str(value))}"' for name, value in items.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+# Global registry shared by the whole process
+metrics = MetricsRegistry(const_labels={"worker": str(os.getpid())})
+
+# Upstream call instrumentation shared by the service clients
+upstream_duration = metrics.histogram(
+    "upstream_request_duration_seconds",
+    "Latency of calls to upstream services",
+    ["service", "operation", "outcome"]
+)
+upstream_errors = metrics.counter(
+    "upstream_errors_total",
+    "Failed calls to upstream services",
+    ["service", "operation", "error_type"]
+)
+
+
+class UpstreamTimer:
+    """
+    Context manager that records one upstream call:
+
+        with track_upstream("supabase", "beta_emails.select") as timer:
+            response = ...
+            if response.status_code != 200:
+                timer.mark_error("http_500")
+
+    Exceptions are recorded as errors (their type becomes `error_type`);
+    cancellation is recorded with outcome "cancelled" and is not an error.
+    It also works around the body of an async generator.
+    """
+
+    __slots__ = ("service", "operation", "_start", "_error_type")
+
+    def __init__(self, service: str, operation: str):
+        self.service = service
+        self.operation = operation
+        self._start = 0.0
+        self._error_type: Optional[str] = None
+
+    def mark_error(self, error_type: str) -> None:
+        self._error_type = error_type
+
+    def __enter__(self) -> "UpstreamTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter() - self._start
+        # Cancelled calls and abandoned streams (GeneratorExit) are not errors
+        if exc_type is not None and issubclass(exc_type, (asyncio.CancelledError, GeneratorExit)):
+            outcome = "cancelled"
+        else:
+            if exc_type is not None:
+                self._error_type = exc_type.__name__
+            outcome = "error" if self._error_type else "success"
+
+        upstream_duration.observe(elapsed, service=self.service, operation=self.operation, outcome=outcome)
+        if outcome == "error":
+            upstream_errors.inc(service=self.service, operation=self.operation, error_type=self._error_type)
+        return False
+
+
+def track_upstream(service: str, operation: str) -> UpstreamTimer:
+    """Time an upstream call; see UpstreamTimer"""
+    return UpstreamTimer(service, operation)
@@ -6,19 +6,47 @@ This module provides comprehensive security middleware including:
 - Request size limits and timeout protection
 - Security logging for suspicious requests
 - Rate limiting protection
+- Request metrics (latency, in-flight requests, time to first byte)
+- Request and per-middleware tracing spans
+- On-demand sampling profiles of single requests
 """
 
+import asyncio
 import ipaddress
 import logging
+import random
+import threading
 import time
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
-from fastapi import Request
+from fastapi import HTTPException, Request
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import metrics
+from app.core.profiling import SamplingProfiler, profile_store
+from app.core.security import verify_jwt_token
+from app.core.tracing import parse_traceparent, tracer
 
 logger = logging.getLogger(__name__)
 
+_http_request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ["method", "route", "status"]
+)
+_http_requests_in_flight = metrics.gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed"
+)
+_http_time_to_first_byte = metrics.histogram(
+    "http_time_to_first_byte_seconds",
+    "Time until the first response body bytes were sent",
+    ["route"]
+)
+_request_profiles = metrics.counter(
+    "request_profiles_total", "Requests profiled by the sampling profiler", ["trigger"]
+)
+
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """
@@ -369,4 +397,192 @@ class TrustedProxyMiddleware(BaseHTTPMiddleware):
                         )
         
         response = await call_next(request)
-        return response 
\ No newline at end of file
+        return response 
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency per route template and
+    status, in-flight requests, and time to first byte for selected routes.
+    
+    Implemented without BaseHTTPMiddleware so streaming responses pass
+    through untouched and recording costs a few dictionary updates.
+    """
+    
+    def __init__(self, app: ASGIApp, ttfb_routes: Iterable[str] = ()):
+        self.app = app
+        self.ttfb_routes = frozenset(ttfb_routes)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status_code = 500
+        first_byte_at: Optional[float] = None
+        
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, first_byte_at
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif first_byte_at is None and message["type"] == "http.response.body" and message.get("body"):
+                first_byte_at = time.perf_counter()
+            await send(message)
+        
+        _http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _http_requests_in_flight.dec()
+            # FastAPI stores the matched route in the scope; use its template
+            # (e.g. /api/threads/{thread_id}) to keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            _http_request_duration.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=route,
+                status=str(status_code)
+            )
+            if first_byte_at is not None and route in self.ttfb_routes:
+                _http_time_to_first_byte.observe(first_byte_at - start, route=route)
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware that opens the root server span for each request,
+    continuing the caller's trace when a valid traceparent header is sent.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        traceparent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                traceparent = parse_traceparent(value.decode("latin-1"))
+                break
+        
+        method = scope["method"]
+        with tracer.span(
+            f"{method} {scope['path']}",
+            parent=traceparent,
+            kind="server",
+            attributes={"http.method": method, "http.target": scope["path"]}
+        ) as span:
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route and span.sampled:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
+
+
+class MiddlewareSpan:
+    """
+    Pure ASGI wrapper that records one span around the next middleware in the
+    stack, so time spent in each middleware shows up in the request trace.
+    """
+    
+    def __init__(self, app: ASGIApp, name: str):
+        self.app = app
+        self.name = f"middleware {name}"
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        with tracer.span(self.name):
+            await self.app(scope, receive, send)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that profiles single requests end to end.
+    
+    A request is profiled when an admin sends the `X-Profile-Request` header
+    (checked against the bearer token) or when it is picked by `sample_rate`.
+    The response carries `X-Profile-Id`; the folded stacks are then available
+    from GET /api/admin/profiles/{profile_id}. The middleware is only
+    installed when PROFILING_ENABLED is set.
+    """
+    
+    def __init__(self, app: ASGIApp, sample_rate: float = 0.0, interval: float = 0.005):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.interval = interval
+    
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        headers = dict(scope.get("headers", ()))
+        if b"x-profile-request" in headers:
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            scheme, _, token = authorization.partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            
+            try:
+                user = verify_jwt_token(token)
+            except HTTPException:
+                return None
+            if user.user_role != "admin":
+                logger.warning(f"[ADMIN_DENIED] Non-admin user requested a profile. Role: {user.user_role}")
+                return None
+            return "admin"
+        
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        
+        profile_id = profile_store.new_id()
+        status_code = 500
+        
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+        
+        profiler = SamplingProfiler(threading.get_ident(), self.interval)
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            folded = profiler.stop()
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            await asyncio.to_thread(
+                profile_store.add,
+                profile_id,
+                folded,
+                method=scope["method"],
+                route=route,
+                path=scope["path"],
+                status_code=status_code,
+                duration=round(time.perf_counter() - start, 4),
+                samples=profiler.samples,
+                trigger=trigger
+            )
+            _request_profiles.inc(trigger=trigger)
+            logger.info(
+                f"Profiled {scope['method']} {route} ({profiler.samples} samples)",
+                extra={"profile_id": profile_id, "trigger": trigger}
+            )
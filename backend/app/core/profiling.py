@@ -0,0 +1,167 @@
+"""
+On-demand request profiling.
+
+A sampling profiler records the event loop thread's stack every few
+milliseconds while a single request is in flight and produces "folded"
+stacks (one `frame;frame;frame count` line per distinct stack), the input
+format of flamegraph.pl, speedscope and most flamegraph viewers.
+
+The loop thread is shared, so a profile also contains frames from any other
+request running concurrently; idle time shows up as the loop's selector wait.
+
+Profiles (the most recent PROFILING_MAX_PROFILES) are fetched through the
+admin API. They are kept in memory unless PROFILING_DIR is set; with
+several server workers set it, because the request that fetches a profile
+usually lands on a different worker than the one that recorded it.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples one thread's stack on a background thread until stopped"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the folded stacks"""
+        self._stopping.set()
+        self._thread.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self._stacks.most_common()) + "\n"
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+
+class ProfileStore:
+    """
+    Bounded, most-recent-first store of finished profiles
+
+    With a `directory` every profile is written there (metadata as
+    <id>.json, stacks as <id>.folded) so all worker processes share them;
+    otherwise they live in this process only. Reads and writes may touch the
+    disk, so call them off the event loop.
+    """
+
+    def __init__(self, max_profiles: int, directory: Optional[str] = None):
+        self.max_profiles = max_profiles
+        self.directory = directory
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex[:16]
+
+    def add(self, profile_id: str, folded: str, **info: Any) -> None:
+        entry = {"profile_id": profile_id, "created_at": time.time(), "worker": os.getpid(), **info}
+        if self.directory:
+            self._write(profile_id, entry, folded)
+            return
+        with self._lock:
+            self._profiles[profile_id] = {**entry, "folded": folded}
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        if self.directory:
+            return self._read(profile_id)
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Profile metadata (without the stacks), newest first"""
+        if self.directory:
+            entries = [self._read_meta(path) for path in self._meta_paths()]
+            return sorted((e for e in entries if e is not None), key=lambda e: e["created_at"], reverse=True)
+        with self._lock:
+            entries = list(self._profiles.values())
+        return [
+            {key: value for key, value in entry.items() if key != "folded"}
+            for entry in reversed(entries)
+        ]
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        # Ids come from URLs; never let one escape the directory
+        return os.path.join(self.directory, os.path.basename(profile_id) + suffix)
+
+    def _meta_paths(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.directory, name) for name in names if name.endswith(".json")]
+
+    def _write(self, profile_id: str, entry: Dict[str, Any], folded: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(profile_id, ".folded"), "w", encoding="utf-8") as f:
+            f.write(folded)
+        # Metadata last: a profile is listed only once its stacks are complete
+        tmp_path = self._path(profile_id, ".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(profile_id, ".json"))
+
+        paths = sorted(self._meta_paths(), key=os.path.getmtime)
+        for path in paths[:max(0, len(paths) - self.max_profiles)]:
+            for stale in (path, path[:-len(".json")] + ".folded"):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _read_meta(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            # Pruned by another worker, or half-written
+            return None
+
+    def _read(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._read_meta(self._path(profile_id, ".json"))
+        if entry is None:
+            return None
+        try:
+            with open(self._path(profile_id, ".folded"), encoding="utf-8") as f:
+                return {**entry, "folded": f.read()}
+        except FileNotFoundError:
+            return None
+
+
+# Process-wide store, filled by ProfilingMiddleware and read by the admin API
+profile_store = ProfileStore(
+    max_profiles=settings.profiling_max_profiles,
+    directory=settings.profiling_dir or None
+)
@@ -0,0 +1,227 @@
+"""
+Resilience helpers for upstream calls.
+
+- CircuitBreaker: stops calling a failing upstream for a while and fails fast
+  with ServiceUnavailableError instead of piling on more load.
+- RetryPolicy / call_with_retry: bounded retries with full-jitter exponential
+  backoff for idempotent calls, plus optional hedged requests for reads.
+
+Only transient failures (connection errors, timeouts, HTTP 5xx and 429) are
+retried or counted against the breaker; a 404 means the upstream is healthy.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+from app.core.exceptions import ServiceUnavailableError
+from app.core.metrics import metrics, track_upstream
+
+logger = logging.getLogger(__name__)
+
+_breaker_state = metrics.gauge(
+    "circuit_breaker_state", "Circuit breaker state (0=closed, 1=half_open, 2=open)", ["breaker"]
+)
+_breaker_transitions = metrics.counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state transitions", ["breaker", "state"]
+)
+_breaker_rejections = metrics.counter(
+    "circuit_breaker_rejections_total", "Calls rejected because the circuit was open", ["breaker"]
+)
+_retries = metrics.counter(
+    "upstream_retries_total", "Retried upstream calls", ["service", "operation"]
+)
+_hedges = metrics.counter(
+    "upstream_hedged_requests_total", "Hedged (duplicate) requests sent for slow reads", ["service", "operation"]
+)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Return True if the error is worth retrying"""
+    if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status_code, int):
+        return status_code >= 500 or status_code == 429
+    return False
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+
+    closed    -> calls flow; `failure_threshold` consecutive transient
+                 failures open the circuit
+    open      -> calls are rejected until `recovery_timeout` has passed
+    half_open -> a single probe call is allowed; success closes the
+                 circuit, failure opens it again
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        _breaker_state.set(0, breaker=name)
+
+    def before_call(self) -> None:
+        """
+        Raise ServiceUnavailableError if the call must not go upstream.
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                self._reject()
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self._reject()
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self.state != self.CLOSED:
+            self._transition(self.CLOSED)
+
+    def record_cancelled(self) -> None:
+        """The call was abandoned before an outcome; let another probe through"""
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        if self.state == self.HALF_OPEN:
+            self._transition(self.OPEN)
+            return
+        self._failures += 1
+        if self.state == self.CLOSED and self._failures >= self.failure_threshold:
+            self._transition(self.OPEN)
+
+    def _reject(self) -> None:
+        _breaker_rejections.inc(breaker=self.name)
+        raise ServiceUnavailableError(
+            message=f"{self.name} is temporarily unavailable",
+            context={"service_name": self.name, "reason": "circuit_open"}
+        )
+
+    def _transition(self, state: str) -> None:
+        previous = self.state
+        self.state = state
+        self._probe_in_flight = False
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        if state == self.CLOSED:
+            self._failures = 0
+
+        _breaker_state.set(self._STATE_VALUES[state], breaker=self.name)
+        _breaker_transitions.inc(breaker=self.name, state=state)
+        log = logger.warning if state == self.OPEN else logger.info
+        log(
+            f"Circuit breaker {self.name}: {previous} -> {state}",
+            extra={"breaker": self.name, "from_state": previous, "to_state": state}
+        )
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.1, max_delay: float = 2.0):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retrying after the given (1-based) failed attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+async def call_with_retry(
+    fn: Callable[[], Awaitable[Any]],
+    *,
+    service: str,
+    operation: str,
+    breaker: CircuitBreaker,
+    policy: RetryPolicy,
+    hedge_delay: Optional[float] = None
+) -> Any:
+    """
+    Call an idempotent upstream operation with retries and a circuit breaker.
+
+    Args:
+        fn: Zero-argument coroutine factory; called once per attempt
+        hedge_delay: If set, send a second request when the first has not
+            completed after this many seconds and use whichever finishes first
+
+    Raises:
+        ServiceUnavailableError: If the circuit is open
+        Exception: The last error from `fn` when retries are exhausted or the
+            error is not transient
+    """
+    async def timed_attempt() -> Any:
+        with track_upstream(service, operation):
+            return await fn()
+    
+    for attempt in range(1, policy.attempts + 1):
+        breaker.before_call()
+        try:
+            if hedge_delay:
+                result = await _hedged(timed_attempt, hedge_delay, service, operation)
+            else:
+                result = await timed_attempt()
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            raise
+        except Exception as e:
+            if not is_transient_error(e):
+                # The upstream answered; the request itself was bad
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt == policy.attempts:
+                raise
+            delay = policy.backoff(attempt)
+            _retries.inc(service=service, operation=operation)
+            logger.warning(
+                f"Transient {service} error in {operation}, retrying in {delay:.2f}s: {e}",
+                extra={"service_name": service, "operation": operation, "attempt": attempt}
+            )
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+async def _hedged(fn: Callable[[], Awaitable[Any]], delay: float, service: str, operation: str) -> Any:
+    """Run `fn`, starting a duplicate if it is slower than `delay`; first success wins"""
+    tasks = [asyncio.ensure_future(fn())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            _hedges.inc(service=service, operation=operation)
+            tasks.append(asyncio.ensure_future(fn()))
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -1,15 +1,16 @@
 import logging
 
-import jwt
 from fastapi import HTTPException, status
 
 from app.core.config import settings
 from app.core.exceptions import AuthenticationError, ConfigurationError
+from app.core.tracing import traced
 from app.models.security import SupabaseAuthUser
 
 logger = logging.getLogger(__name__)
 
 
+@traced("auth.verify_jwt_token")
 def verify_jwt_token(token: str) -> SupabaseAuthUser:
     """
     Verify Supabase JWT token and return structured user object
@@ -20,6 +21,9 @@ def verify_jwt_token(token: str) -> SupabaseAuthUser:
     Raises:
         HTTPException: If token is invalid, expired, or malformed
     """
+    # Imported on first use to keep jwt/cryptography out of cold start
+    import jwt
+    
     try:
         if not settings.supabase_jwt_secret:
             raise ConfigurationError("SUPABASE_JWT_SECRET not configured", config_key="supabase_jwt_secret")
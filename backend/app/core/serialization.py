@@ -0,0 +1,57 @@
+"""
+Fast JSON encoding for responses and stream frames.
+
+orjson encodes dicts, lists, datetimes and UUIDs natively and returns bytes,
+so responses skip the stdlib encoder and the str -> bytes copy. Pydantic
+data is dumped by pydantic-core straight to JSON bytes through a cached
+TypeAdapter, skipping FastAPI's dump / re-validate / jsonable pass.
+"""
+
+import functools
+from typing import Any
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import JSONResponse, Response
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Encode `obj` as compact UTF-8 JSON bytes"""
+    return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+@functools.lru_cache(maxsize=None)
+def _adapter(type_: Any) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+def model_json(type_: Any, value: Any) -> bytes:
+    """Dump already-validated pydantic data of `type_` (e.g. List[Thread]) to JSON bytes"""
+    return _adapter(type_).dump_json(value)
+
+
+def model_response(type_: Any, value: Any, status_code: int = 200) -> Response:
+    """
+    JSON response for pydantic data, serialized once by pydantic-core
+    
+    Routes keep their response_model for the OpenAPI schema; returning a
+    Response makes FastAPI skip its own validation and encoding.
+    """
+    return Response(content=model_json(type_, value), status_code=status_code, media_type="application/json")
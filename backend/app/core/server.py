@@ -0,0 +1,241 @@
+"""
+Production server launcher: uvicorn workers under a pre-fork supervisor.
+
+A single uvicorn process serves from one core. With SERVER_WORKERS > 1 the
+supervisor starts that many worker processes, each running its own event
+loop and importing the app itself (spawned, not forked, so no threads or
+connection pools leak from the parent). Two listening modes:
+
+- shared socket (default): the supervisor binds the port once and every
+  worker accepts from it
+- SO_REUSEPORT (SERVER_REUSE_PORT=true): each worker binds its own socket
+  and the kernel spreads new connections evenly across them; connections
+  still queued on a worker's socket when it exits are reset, and new ones
+  are refused while every worker is restarting, so prefer the shared
+  socket (or a generous jitter) when recycling often
+
+Workers recycle after SERVER_MAX_REQUESTS requests (plus up to
+SERVER_MAX_REQUESTS_JITTER so they don't all restart together): uvicorn
+stops accepting, drains in-flight requests for up to
+SERVER_GRACEFUL_TIMEOUT seconds and exits, and the supervisor starts a
+replacement. Crashed workers are replaced the same way; a worker that fails
+within MIN_WORKER_LIFETIME of starting is restarted with exponential
+backoff, and after MAX_FAILED_STARTS such failures in a row the supervisor
+stops with exit status 1 instead of spinning on a broken deploy.
+
+Workers share nothing in memory, so per-process state and the settings that
+size it are multiplied by SERVER_WORKERS; divide totals by the worker count
+when setting them:
+
+- stream admission (MAX_CONCURRENT_STREAMS, STREAM_QUEUE_SIZE): N workers
+  admit N times as many streams, and MAX_CONCURRENT_STREAMS_PER_USER only
+  holds within the worker a request lands on
+- thread-state cache (THREAD_STATE_CACHE_*): each worker caches and
+  coalesces on its own, and an invalidation only reaches the worker that
+  made the change; the others may serve the old state for up to the TTL
+- warm thread pool (THREAD_POOL_SIZE): each worker pre-creates its own
+  threads; a recycling worker deletes its unclaimed ones on the way out and
+  its replacement creates a fresh set, so frequent recycling costs
+  THREAD_POOL_SIZE creates and deletes upstream every time
+- the LangGraph circuit breaker trips per worker
+- metrics: GET /metrics and /api/admin/metrics answer from whichever
+  worker accepted the request; every sample carries a `worker` label (the
+  pid) so per-worker series stay monotonic; sum them across workers
+- request profiles are recorded by the worker that served the request;
+  set PROFILING_DIR so GET /api/admin/profiles/{id} finds them from any
+  worker
+"""
+
+import logging
+import multiprocessing
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+APP = "app.main:app"
+
+# A worker exiting with an error sooner than this after starting counts as a
+# failed start: it is restarted after RESTART_BACKOFF seconds, doubling per
+# consecutive failure up to MAX_RESTART_BACKOFF
+MIN_WORKER_LIFETIME = 10.0
+RESTART_BACKOFF = 1.0
+MAX_RESTART_BACKOFF = 30.0
+# Consecutive failed starts of one worker slot before the supervisor gives up
+MAX_FAILED_STARTS = 5
+
+
+def server_options(settings: Any) -> Dict[str, Any]:
+    """uvicorn.Config keyword arguments for the configured server"""
+    return {
+        "host": settings.server_host,
+        "port": settings.server_port,
+        "loop": settings.server_loop,
+        "http": settings.server_http,
+        "backlog": settings.server_backlog,
+        "timeout_keep_alive": settings.server_keep_alive,
+        "timeout_graceful_shutdown": settings.server_graceful_timeout or None,
+        "log_level": settings.log_level.lower(),
+    }
+
+
+def _reuse_port_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def _run_worker(options: Dict[str, Any], sock: Optional[socket.socket], max_requests: Optional[int]) -> None:
+    config = uvicorn.Config(APP, limit_max_requests=max_requests, **options)
+    if sock is None:
+        sock = _reuse_port_socket(config.host, config.port)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class WorkerSupervisor:
+    """Start, watch, recycle and stop a fixed number of worker processes"""
+
+    def __init__(
+        self,
+        options: Dict[str, Any],
+        workers: int,
+        reuse_port: bool = False,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        graceful_timeout: float = 30.0
+    ):
+        self.options = options
+        self.workers = workers
+        self.reuse_port = reuse_port
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._socket: Optional[socket.socket] = None
+        self._processes: List[Optional[multiprocessing.process.BaseProcess]] = [None] * workers
+        self._started: List[float] = [0.0] * workers
+        self._failed_starts: List[int] = [0] * workers
+        self._restart_at: List[Optional[float]] = [None] * workers
+        self._should_exit = False
+        self.exit_code = 0
+
+    def _spawn(self, slot: int) -> None:
+        max_requests = None
+        if self.max_requests > 0:
+            max_requests = self.max_requests + random.randint(0, max(self.max_requests_jitter, 0))
+        process = self._context.Process(
+            target=_run_worker,
+            args=(self.options, self._socket, max_requests),
+            name=f"worker-{slot}"
+        )
+        process.start()
+        self._processes[slot] = process
+        self._started[slot] = time.monotonic()
+
+    def _handle_exit(self, signum: int, frame: Any) -> None:
+        self._should_exit = True
+
+    def _restart_delay(self, slot: int, process: multiprocessing.process.BaseProcess, now: float) -> float:
+        if process.exitcode != 0 and now - self._started[slot] < MIN_WORKER_LIFETIME:
+            self._failed_starts[slot] += 1
+        else:
+            self._failed_starts[slot] = 0
+        failures = self._failed_starts[slot]
+        if failures == 0:
+            return 0.0
+        return min(MAX_RESTART_BACKOFF, RESTART_BACKOFF * 2 ** (failures - 1))
+
+    def _replace_exited(self) -> None:
+        now = time.monotonic()
+        for slot, process in enumerate(self._processes):
+            if process is None or process.is_alive():
+                continue
+            if self._restart_at[slot] is None:
+                delay = self._restart_delay(slot, process, now)
+                if self._failed_starts[slot] >= MAX_FAILED_STARTS:
+                    logger.error(
+                        "Worker keeps failing on startup, stopping the server",
+                        extra={"worker": process.name, "exit_code": process.exitcode, "failed_starts": self._failed_starts[slot]}
+                    )
+                    self.exit_code = 1
+                    self._should_exit = True
+                    return
+                self._restart_at[slot] = now + delay
+                logger.info(
+                    "Worker exited, starting a replacement",
+                    extra={"worker": process.name, "pid": process.pid, "exit_code": process.exitcode, "delay": delay}
+                )
+            if now < self._restart_at[slot]:
+                continue
+            self._restart_at[slot] = None
+            process.close()
+            self._spawn(slot)
+
+    def _stop(self) -> None:
+        processes = [p for p in self._processes if p is not None and p.is_alive()]
+        for process in processes:
+            process.terminate()  # SIGTERM: uvicorn stops accepting and drains
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("Worker did not stop in time, killing it", extra={"pid": process.pid})
+                process.kill()
+                process.join()
+
+    def run(self) -> int:
+        """Serve until SIGINT/SIGTERM, then stop the workers gracefully; returns the exit status"""
+        if not self.reuse_port:
+            self._socket = uvicorn.Config(APP, **self.options).bind_socket()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._handle_exit)
+
+        logger.info(
+            "Starting workers",
+            extra={
+                "workers": self.workers,
+                "reuse_port": self.reuse_port,
+                "max_requests": self.max_requests,
+                "pid": multiprocessing.current_process().pid
+            }
+        )
+        for slot in range(self.workers):
+            self._spawn(slot)
+        try:
+            while not self._should_exit:
+                time.sleep(0.5)
+                self._replace_exited()
+        finally:
+            self._stop()
+            if self._socket is not None:
+                self._socket.close()
+        return self.exit_code
+
+
+def serve(settings: Any) -> None:
+    """Run the backend as configured: reload, a single process or supervised workers"""
+    options = server_options(settings)
+    if settings.server_reload:
+        uvicorn.run(APP, reload=True, **options)
+    elif settings.server_workers <= 1 and settings.server_max_requests <= 0:
+        uvicorn.run(APP, **options)
+    else:
+        exit_code = WorkerSupervisor(
+            options,
+            workers=max(settings.server_workers, 1),
+            reuse_port=settings.server_reuse_port,
+            max_requests=settings.server_max_requests,
+            max_requests_jitter=settings.server_max_requests_jitter,
+            graceful_timeout=settings.server_graceful_timeout
+        ).run()
+        if exit_code:
+            sys.exit(exit_code)
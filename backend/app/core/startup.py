@@ -0,0 +1,41 @@
+"""
+Deferred imports of heavy client libraries.
+
+The SDKs below are imported where they are first used rather than at
+module level, so a cold `import app.main` (and therefore a new worker or
+container) is ready sooner. Once the server is up they are preloaded on a
+background thread, so the first request that needs one usually finds it
+already imported instead of paying for it.
+
+benchmarks/bench_startup.py checks that none of them is imported by
+`import app.main` again.
+"""
+
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Imported on first use by LangGraphClient, verify_jwt_token, the
+# assistant token route and SupabaseClient
+LAZY_MODULES = ("langgraph_sdk", "jwt", "requests", "supabase")
+
+
+def _preload() -> None:
+    for name in LAZY_MODULES:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning("Could not preload module", extra={"module": name, "error": str(e)})
+            continue
+        logger.debug("Preloaded module", extra={"module": name, "seconds": round(time.perf_counter() - start, 3)})
+
+
+def preload_lazy_modules() -> threading.Thread:
+    """Import LAZY_MODULES on a daemon thread; returns the started thread"""
+    thread = threading.Thread(target=_preload, name="preload-imports", daemon=True)
+    thread.start()
+    return thread
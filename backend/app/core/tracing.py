@@ -0,0 +1,413 @@
+"""
+Lightweight distributed tracing for the Assistant UI LangGraph Backend.
+
+Follows the OpenTelemetry data model closely enough to be consumed by the
+usual tooling:
+
+- W3C `traceparent` headers are extracted from incoming requests and injected
+  into upstream calls, so traces continue across services.
+- Root spans are head-sampled (TRACING_SAMPLE_RATE); children inherit the
+  decision, so unsampled requests only pay for a context-variable lookup.
+- Finished spans are batched on a background thread and written either to a
+  local JSON-lines file or to an OTLP/HTTP (JSON) collector endpoint.
+
+Tracing is off unless TRACING_ENABLED is set.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_dropped_spans = metrics.counter(
+    "tracing_spans_dropped_total", "Finished spans dropped because the export queue was full"
+)
+
+EXPORT_BATCH_SIZE = 512
+EXPORT_INTERVAL = 2.0
+
+
+class Span:
+    """A sampled, recording span"""
+
+    __slots__ = (
+        "tracer", "name", "trace_id", "span_id", "parent_id", "kind",
+        "start_ns", "end_ns", "attributes", "events", "status", "status_message",
+    )
+
+    sampled = True
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        kind: str,
+        attributes: Optional[Dict[str, Any]]
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.events: List[Dict[str, Any]] = []
+        self.status = "unset"
+        self.status_message: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes or {}})
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.status_message = f"{type(exc).__name__}: {exc}"
+        self.add_event("exception", {"exception.type": type(exc).__name__, "exception.message": str(exc)})
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer._on_end(self)
+
+
+class _NonRecordingSpan:
+    """
+    Stand-in for spans that were not sampled. It carries the trace context
+    (if any) so children make the same sampling decision.
+    """
+
+    sampled = False
+
+    def __init__(self, trace_id: Optional[str] = None, span_id: Optional[str] = None):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    @property
+    def traceparent(self) -> Optional[str]:
+        if self.trace_id and self.span_id:
+            return f"00-{self.trace_id}-{self.span_id}-00"
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NON_RECORDING_SPAN = _NonRecordingSpan()
+
+_current_span: contextvars.ContextVar[Optional[Any]] = contextvars.ContextVar("current_span", default=None)
+
+
+class _RemoteParent:
+    """Span context extracted from an incoming traceparent header"""
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[_RemoteParent]:
+    """Parse a W3C traceparent header, returning None if it is malformed"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3][:2], 16)
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return _RemoteParent(parts[1], parts[2], bool(flags & 0x01))
+
+
+class Tracer:
+    def __init__(self, service_name: str, sample_rate: float, exporter: Optional["SpanExporter"]):
+        self.service_name = service_name
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current_span(self) -> Optional[Any]:
+        return _current_span.get()
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[Any] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        Create a span without making it current. `parent` defaults to the
+        current span; it may also be a context from parse_traceparent().
+        """
+        if not self.enabled:
+            return NON_RECORDING_SPAN
+
+        if parent is None:
+            parent = _current_span.get()
+
+        if parent is None:
+            if random.random() >= self.sample_rate:
+                return _NonRecordingSpan(os.urandom(16).hex(), os.urandom(8).hex())
+            return Span(self, name, os.urandom(16).hex(), None, kind, attributes)
+
+        if not parent.sampled:
+            return parent if isinstance(parent, _NonRecordingSpan) else _NonRecordingSpan(parent.trace_id, parent.span_id)
+        return Span(self, name, parent.trace_id, parent.span_id, kind, attributes)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        parent: Optional[Any] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Any]:
+        """Start a span, make it current for the block, and end it afterwards"""
+        span = self.start_span(name, parent=parent, kind=kind, attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def inject(self, headers: Optional[Dict[str, str]] = None, span: Optional[Any] = None) -> Dict[str, str]:
+        """Add a traceparent header for `span` (default: the current span) to `headers`"""
+        headers = {} if headers is None else headers
+        if span is None:
+            span = _current_span.get()
+        if span is not None and span.traceparent:
+            headers["traceparent"] = span.traceparent
+        return headers
+
+    def _on_end(self, span: Span) -> None:
+        if self.exporter is not None:
+            self.exporter.submit(span)
+
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def trace_headers() -> Optional[Dict[str, str]]:
+    """Headers that propagate the current trace upstream, or None if not tracing"""
+    if not tracer.enabled:
+        return None
+    return tracer.inject() or None
+
+
+def traced(name: str, kind: str = "internal") -> Callable:
+    """
+    Decorator wrapping a function or coroutine function in a span.
+    When tracing is disabled the original function runs directly.
+    """
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await fn(*args, **kwargs)
+                with tracer.span(name, kind=kind):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name, kind=kind):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+# Exporters
+
+_SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def span_to_otlp(span: Span) -> Dict[str, Any]:
+    """Convert a finished span to the OTLP JSON span representation"""
+    otlp_span: Dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": _SPAN_KINDS.get(span.kind, 1),
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "events": [
+            {
+                "name": event["name"],
+                "timeUnixNano": str(event["time_ns"]),
+                "attributes": _otlp_attributes(event["attributes"]),
+            }
+            for event in span.events
+        ],
+        "status": {"code": 2 if span.status == "error" else 0},
+    }
+    if span.parent_id:
+        otlp_span["parentSpanId"] = span.parent_id
+    if span.status_message:
+        otlp_span["status"]["message"] = span.status_message
+    return otlp_span
+
+
+class SpanExporter:
+    """
+    Batches finished spans on a background thread. Subclasses implement
+    export(); a full queue drops spans instead of blocking the request.
+    """
+
+    def __init__(self, service_name: str, max_queue_size: int = 10000):
+        self.service_name = service_name
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            _dropped_spans.inc()
+
+    def shutdown(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + EXPORT_INTERVAL
+            while len(batch) < EXPORT_BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            if batch:
+                try:
+                    self.export(batch)
+                except Exception as e:
+                    logger.warning(f"Failed to export {len(batch)} spans: {e}")
+
+
+class FileSpanExporter(SpanExporter):
+    """Append spans as OTLP-style JSON objects, one per line"""
+
+    def __init__(self, service_name: str, path: str, **kwargs):
+        self.path = path
+        super().__init__(service_name, **kwargs)
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                record = span_to_otlp(span)
+                record["service.name"] = self.service_name
+                f.write(json.dumps(record) + "\n")
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """POST spans to an OTLP/HTTP collector using the JSON encoding"""
+
+    def __init__(self, service_name: str, endpoint: str, timeout: float = 10.0, **kwargs):
+        # Import here so httpx is only needed when this exporter is used
+        import httpx
+        self.endpoint = endpoint
+        self._client = httpx.Client(timeout=timeout)
+        super().__init__(service_name, **kwargs)
+
+    def export(self, spans: List[Span]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [span_to_otlp(span) for span in spans],
+                }],
+            }]
+        }
+        response = self._client.post(self.endpoint, json=payload)
+        response.raise_for_status()
+
+
+def _build_tracer() -> Tracer:
+    exporter: Optional[SpanExporter] = None
+    if settings.tracing_enabled:
+        if settings.tracing_exporter.lower() == "otlp":
+            exporter = OTLPHttpSpanExporter(settings.tracing_service_name, settings.tracing_otlp_endpoint)
+        else:
+            exporter = FileSpanExporter(settings.tracing_service_name, settings.tracing_file_path)
+    return Tracer(settings.tracing_service_name, settings.tracing_sample_rate, exporter)
+
+
+# Process-wide tracer
+tracer = _build_tracer()
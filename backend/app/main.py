@@ -1,42 +1,77 @@
+import asyncio
 import logging
-import traceback
-import uuid
-from datetime import datetime
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse, Response
+from starlette.exceptions import HTTPException
 
 from app.api.admin import router as admin_router
 from app.api.assistant import router as assistant_router
 from app.api.auth import router as auth_router
 from app.api.langgraph import router as langgraph_router
 from app.core.config import settings
-from app.core.exceptions import BaseAppException, InternalServerError
+from app.core.error_responses import (HandledErrorFilter, TracebackSampler,
+                                      error_response, mark_logged)
+from app.core.exceptions import (BaseAppException, new_correlation_id,
+                                 utc_timestamp)
+from app.core.loop_monitor import loop_monitor
 # Import security middleware
-from app.core.middleware import (RequestSizeMiddleware,
+from app.core.metrics import metrics
+from app.core.middleware import (MetricsMiddleware, MiddlewareSpan,
+                                 ProfilingMiddleware, RequestSizeMiddleware,
                                  RequestTimeoutMiddleware,
                                  SecurityHeadersMiddleware,
-                                 SecurityLoggingMiddleware,
+                                 SecurityLoggingMiddleware, TracingMiddleware,
                                  TrustedProxyMiddleware)
-from app.models.error import ErrorDetail, ErrorResponse
+from app.core.serialization import FastJSONResponse
+from app.core.startup import preload_lazy_modules
+from app.core.tracing import tracer
+from app.services.cold_storage import cold_thread_store
+from app.services.thread_pool import warm_thread_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background services owned by this worker"""
+    if settings.loop_monitor_enabled:
+        await loop_monitor.start()
+    await warm_thread_pool.start()
+    # Load the archive index now so the first requests see archived threads
+    await asyncio.to_thread(cold_thread_store.refresh)
+    if settings.server_preload_modules:
+        preload_lazy_modules()
+    try:
+        yield
+    finally:
+        await warm_thread_pool.stop()
+        await loop_monitor.stop()
+        tracer.shutdown()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Assistant UI LangGraph Backend",
     description="FastAPI backend for Assistant UI + LangGraph integration with Authentication and Admin",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Configure logger for exception handlers
 logger = logging.getLogger(__name__)
+traceback_sampler = TracebackSampler(settings.error_traceback_window)
+# Unhandled errors are re-raised to the server after general_exception_handler
+# responds; don't let it format and log the traceback a second time
+logging.getLogger("uvicorn.error").addFilter(HandledErrorFilter())
 
 
 # Global Exception Handlers
 
 @app.exception_handler(BaseAppException)
-async def custom_exception_handler(request: Request, exc: BaseAppException) -> JSONResponse:
+async def custom_exception_handler(request: Request, exc: BaseAppException) -> Response:
     """
     Handle custom application exceptions with structured error responses.
     
@@ -47,7 +82,7 @@ async def custom_exception_handler(request: Request, exc: BaseAppException) -> J
         f"Application exception occurred: {exc.error_code}",
         extra={
             "correlation_id": exc.correlation_id,
-            "path": str(request.url),
+            "path": request.scope["path"],
             "method": request.method,
             "status_code": exc.status_code,
             "error_code": exc.error_code,
@@ -55,148 +90,131 @@ async def custom_exception_handler(request: Request, exc: BaseAppException) -> J
         }
     )
     
-    error_response = ErrorResponse(
-        error=exc.error_code,
-        message=exc.message,
-        correlation_id=exc.correlation_id,
-        timestamp=exc.timestamp,
-        status_code=exc.status_code,
+    return error_response(
+        exc.status_code,
+        exc.error_code,
+        exc.message,
+        exc.correlation_id,
+        exc.timestamp,
         details=exc.context
     )
-    
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=error_response.model_dump()
-    )
 
 
 @app.exception_handler(RequestValidationError)
-async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+async def validation_exception_handler(request: Request, exc: RequestValidationError) -> Response:
     """
     Handle FastAPI/Pydantic validation errors with detailed field-level error information.
     
     This handler catches validation errors from request parsing and provides
     detailed information about which fields failed validation.
     """
-    correlation_id = str(uuid.uuid4())
+    correlation_id = new_correlation_id()
     
-    # Convert Pydantic validation errors to our ErrorDetail format
-    validation_errors = []
-    for error in exc.errors():
-        field_path = " -> ".join(str(loc) for loc in error["loc"]) if error["loc"] else None
-        validation_errors.append(ErrorDetail(
-            field=field_path,
-            message=error["msg"],
-            code=error["type"]
-        ))
+    # Pydantic validation errors in the ErrorDetail format
+    validation_errors = [
+        {
+            "field": " -> ".join(str(loc) for loc in error["loc"]) if error["loc"] else None,
+            "message": error["msg"],
+            "code": error["type"]
+        }
+        for error in exc.errors()
+    ]
     
     logger.warning(
         f"Validation error occurred",
         extra={
             "correlation_id": correlation_id,
-            "path": str(request.url),
+            "path": request.scope["path"],
             "method": request.method,
-            "validation_errors": [
-                {"field": err.field, "message": err.message, "code": err.code}
-                for err in validation_errors
-            ]
+            "validation_errors": validation_errors
         }
     )
     
-    error_response = ErrorResponse(
-        error="VALIDATION_ERROR",
-        message="Request validation failed",
-        correlation_id=correlation_id,
-        timestamp=datetime.utcnow().isoformat(),
-        status_code=422,
+    return error_response(
+        422,
+        "VALIDATION_ERROR",
+        "Request validation failed",
+        correlation_id,
+        utc_timestamp(),
         validation_errors=validation_errors
     )
-    
-    return JSONResponse(
-        status_code=422,
-        content=error_response.model_dump()
-    )
 
 
 @app.exception_handler(HTTPException)
-async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: HTTPException) -> Response:
     """
     Handle FastAPI HTTPExceptions with consistent error formatting.
     
     This ensures that even manually raised HTTPExceptions follow our
-    standardized error response format.
+    standardized error response format. Registered for Starlette's base
+    class so routing errors (unknown path, wrong method) are covered too.
     """
-    correlation_id = str(uuid.uuid4())
+    correlation_id = new_correlation_id()
     
     logger.warning(
         f"HTTP exception occurred",
         extra={
             "correlation_id": correlation_id,
-            "path": str(request.url),
+            "path": request.scope["path"],
             "method": request.method,
             "status_code": exc.status_code,
             "detail": str(exc.detail)
         }
     )
     
-    error_response = ErrorResponse(
-        error="HTTP_ERROR",
-        message=str(exc.detail),
-        correlation_id=correlation_id,
-        timestamp=datetime.utcnow().isoformat(),
-        status_code=exc.status_code
-    )
-    
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=error_response.model_dump()
-    )
+    response = error_response(exc.status_code, "HTTP_ERROR", str(exc.detail), correlation_id, utc_timestamp())
+    if exc.headers:
+        response.headers.update(exc.headers)
+    return response
 
 
 @app.exception_handler(Exception)
-async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def general_exception_handler(request: Request, exc: Exception) -> Response:
     """
     Fallback handler for any unhandled exceptions.
     
     This is the last line of defense to ensure that no unhandled exceptions
     leak sensitive information to clients. All unexpected errors are logged
-    with full details but return a generic error response.
+    with full details but return a generic error response. The traceback is
+    formatted once per window for each raising site (ERROR_TRACEBACK_WINDOW);
+    repeats log the correlation id without it.
     """
-    correlation_id = str(uuid.uuid4())
+    correlation_id = new_correlation_id()
+    traceback_text, skipped = traceback_sampler.capture(exc)
     
-    # Log the full exception details for debugging
-    logger.error(
-        f"Unhandled exception occurred: {type(exc).__name__}",
-        extra={
-            "correlation_id": correlation_id,
-            "path": str(request.url),
-            "method": request.method,
-            "exception_type": type(exc).__name__,
-            "traceback": traceback.format_exc()
-        }
-    )
-    
-    # Create a generic internal server error
-    internal_error = InternalServerError(
-        message="An unexpected error occurred",
-        correlation_id=correlation_id
-    )
+    extra = {
+        "correlation_id": correlation_id,
+        "path": request.scope["path"],
+        "method": request.method,
+        "exception_type": type(exc).__name__,
+    }
+    if traceback_text is not None:
+        extra["traceback"] = traceback_text
+        if skipped:
+            extra["tracebacks_skipped"] = skipped
     
-    error_response = ErrorResponse(
-        error=internal_error.error_code,
-        message=internal_error.message,
-        correlation_id=internal_error.correlation_id,
-        timestamp=internal_error.timestamp,
-        status_code=internal_error.status_code
-    )
+    # Log the exception details for debugging
+    logger.error(f"Unhandled exception occurred: {type(exc).__name__}", extra=extra)
+    mark_logged(exc)
     
-    return JSONResponse(
-        status_code=internal_error.status_code,
-        content=error_response.model_dump()
+    # Generic internal server error
+    return error_response(
+        500,
+        "INTERNAL_SERVER_ERROR",
+        "An unexpected error occurred",
+        correlation_id,
+        utc_timestamp()
     )
 
+def add_middleware(middleware_class, **options):
+    """Add a middleware, wrapped in its own tracing span when tracing is on"""
+    app.add_middleware(middleware_class, **options)
+    if settings.tracing_enabled:
+        app.add_middleware(MiddlewareSpan, name=middleware_class.__name__)
+
+
 # Add CORS middleware
-app.add_middleware(
+add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=settings.cors_allow_credentials,
@@ -206,31 +224,50 @@ app.add_middleware(
 
 # Add security middleware (order matters - most specific to most general)
 # 1. Trusted proxy handling (must be first to sanitize headers)
-app.add_middleware(
+add_middleware(
     TrustedProxyMiddleware,
     trusted_proxies=[]  # Add trusted proxy IPs here in production
 )
 
 # 2. Request size limiting (early rejection of oversized requests)
-app.add_middleware(
+add_middleware(
     RequestSizeMiddleware,
     max_size=10 * 1024 * 1024  # 10MB limit
 )
 
 # 3. Security headers (applies to all responses)
-app.add_middleware(
+add_middleware(
     SecurityHeadersMiddleware,
     environment=settings.environment
 )
 
 # 4. Request timeout protection
-app.add_middleware(
+add_middleware(
     RequestTimeoutMiddleware,
     timeout=30.0  # 30 seconds
 )
 
 # 5. Security logging (should be last to catch everything)
-app.add_middleware(SecurityLoggingMiddleware)
+add_middleware(SecurityLoggingMiddleware)
+
+# 6. Request tracing (root span for the request and all middleware spans)
+if settings.tracing_enabled:
+    app.add_middleware(TracingMiddleware)
+
+# 7. Metrics (outermost, so latency covers the whole middleware stack)
+if settings.metrics_enabled:
+    app.add_middleware(
+        MetricsMiddleware,
+        ttfb_routes=["/api/threads/{thread_id}/stream"]
+    )
+
+# 8. Profiling (outermost, so a profile covers every middleware and the route)
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=settings.profiling_sample_rate,
+        interval=settings.profiling_interval
+    )
 
 # Include routers
 app.include_router(auth_router)
@@ -249,3 +286,12 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        """Metrics in the Prometheus text exposition format"""
+        return PlainTextResponse(
+            metrics.render_prometheus(),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
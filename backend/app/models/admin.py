@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -23,6 +23,8 @@ class Thread(BaseModel):
     messages: List[MessageResponse]
     # Store raw LangGraph data for any additional processing if needed
     raw_metadata: Optional[dict] = None
+    # Older messages moved out of thread state by compaction (not in `messages`)
+    archived_message_count: int = 0
 
 class ThreadSummary(BaseModel):
     """Legacy model - keeping for backward compatibility"""
@@ -41,6 +43,8 @@ class ThreadDetails(BaseModel):
     last_updated: datetime
     user_email: str
     user_id: str
+    archived_message_count: int = 0
+    archived_included: bool = False  # True when archived messages are prepended to `messages`
 
 class UserSummary(BaseModel):
     id: str
@@ -53,6 +57,68 @@ class ThreadDeleteResponse(BaseModel):
     deleted: bool
     message: str
 
+class BulkDeleteRequest(BaseModel):
+    """Select threads either by explicit ids or by a LangGraph metadata filter"""
+    thread_ids: Optional[List[str]] = None
+    metadata_filter: Optional[Dict[str, Any]] = None  # e.g. {"user_id": "..."}
+    dry_run: bool = False
+
+class BulkDeleteResult(BaseModel):
+    thread_id: str
+    deleted: bool
+    error: Optional[str] = None
+
+class BulkDeleteResponse(BaseModel):
+    dry_run: bool
+    matched: int
+    deleted: int
+    failed: int
+    results: List[BulkDeleteResult]
+    # More threads match the filter than one request may delete; run it again
+    truncated: bool = False
+
+class ThreadCompactionRequest(BaseModel):
+    keep_turns: Optional[int] = None  # defaults to THREAD_COMPACTION_KEEP_TURNS
+
+class BulkCompactionRequest(BaseModel):
+    """Compact every thread with at least min_messages messages in its state"""
+    min_messages: Optional[int] = None  # defaults to THREAD_COMPACTION_MIN_MESSAGES
+    keep_turns: Optional[int] = None
+    dry_run: bool = False
+
+class ThreadCompactionResult(BaseModel):
+    thread_id: str
+    archived_messages: int = 0
+    kept_messages: int = 0
+    segment_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkCompactionResponse(BaseModel):
+    dry_run: bool
+    matched: int
+    compacted: int
+    failed: int
+    results: List[ThreadCompactionResult]
+
+class ColdArchiveRequest(BaseModel):
+    """Archive threads idle for at least idle_days (oldest first, up to limit)"""
+    idle_days: Optional[float] = None  # defaults to THREAD_COLD_IDLE_DAYS
+    limit: Optional[int] = None  # defaults to THREAD_COLD_BATCH_LIMIT
+    dry_run: bool = False
+
+class ColdArchiveResult(BaseModel):
+    thread_id: str
+    archived: bool
+    compressed_bytes: int = 0
+    error: Optional[str] = None
+
+class ColdArchiveResponse(BaseModel):
+    dry_run: bool
+    matched: int
+    archived: int
+    failed: int
+    results: List[ColdArchiveResult]
+
 class AdminStatsResponse(BaseModel):
     total_users: int
     total_threads: int
@@ -0,0 +1,77 @@
+"""
+Typed chat payloads for the stream endpoint.
+
+The schema is made of TypedDicts so pydantic-core validates the request
+body straight from JSON into plain dicts: no model instances are built and
+nothing has to be converted afterwards. Keys not in the schema (ids,
+timestamps added by the UI) are dropped during validation, which leaves
+messages in exactly the {"role", "content"} shape LangGraph accepts as input.
+
+The frontend posts assistant-ui LangChainMessage objects, which carry a
+`type` ("human", "ai", ...) instead of a `role`; parse_send_message maps
+the type to a role, defaulting to "user" like the old conversion did.
+"""
+
+from typing import Dict, List, Literal, Union
+
+from pydantic import ConfigDict, Field, TypeAdapter
+from typing_extensions import Annotated, NotRequired, TypedDict
+
+ChatRole = Literal["user", "assistant", "system"]
+
+
+class TextPart(TypedDict):
+    type: Literal["text"]
+    text: str
+
+
+class MediaPart(TypedDict):
+    """Any non-text content block (image_url, file, ...), passed through unchanged"""
+    __pydantic_config__ = ConfigDict(extra="allow")
+
+    type: str
+
+
+# Text blocks are by far the most common; try them first
+ContentPart = Annotated[Union[TextPart, MediaPart], Field(union_mode="left_to_right")]
+
+
+class ChatMessage(TypedDict):
+    role: ChatRole
+    content: Union[str, List[ContentPart]]
+
+
+class IncomingChatMessage(TypedDict):
+    """A message as posted: OpenAI-style `role` or LangChain-style `type`"""
+    role: NotRequired[ChatRole]
+    type: NotRequired[str]
+    content: NotRequired[Union[str, List[ContentPart]]]
+
+
+class SendMessageRequest(TypedDict):
+    messages: List[ChatMessage]
+
+
+class _IncomingRequest(TypedDict):
+    messages: List[IncomingChatMessage]
+
+
+_incoming_request = TypeAdapter(_IncomingRequest)
+
+# LangChain message types; anything else (e.g. "tool") falls back to "user"
+_TYPE_ROLES: Dict[str, ChatRole] = {"human": "user", "ai": "assistant", "system": "system"}
+
+
+def parse_send_message(body: Union[str, bytes]) -> SendMessageRequest:
+    """
+    Validate a stream request body and return LangGraph-ready messages
+
+    Raises pydantic.ValidationError for malformed bodies.
+    """
+    request = _incoming_request.validate_json(body)
+    for message in request["messages"]:
+        message_type = message.pop("type", None)
+        if "role" not in message:
+            message["role"] = _TYPE_ROLES.get(message_type or "", "user")
+        message.setdefault("content", "")
+    return request  # type: ignore[return-value]
@@ -1,13 +1,81 @@
+import asyncio
 import logging
-from datetime import datetime
-from typing import List, Optional
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
 
 from app.core.config import settings
-from app.core.exceptions import ExternalServiceError
-from app.models.admin import MessageResponse, Thread, ThreadDetails
+from app.core.exceptions import (BaseAppException, ExternalServiceError,
+                                 ValidationError)
+from app.core.metrics import metrics
+from app.models.admin import (BulkCompactionResponse, BulkDeleteResponse,
+                              BulkDeleteResult, ColdArchiveResponse,
+                              ColdArchiveResult, MessageResponse, Thread,
+                              ThreadCompactionResult, ThreadDetails)
+from app.services.cold_storage import cold_thread_store
+from app.services.message_archive import message_archive
+from app.services.thread_pool import POOL_METADATA_KEY, POOL_UNASSIGNED
 
 logger = logging.getLogger(__name__)
 
+# Thread state key holding the pointer to compacted (archived) messages
+ARCHIVE_STATE_KEY = "archive"
+# Graph node the compaction update is attributed to, so no run is triggered
+COMPACTION_AS_NODE = "call_model"
+SUMMARY_MAX_TOPICS = 10
+# Threads fetched per search request when paging through a metadata filter
+SEARCH_PAGE_SIZE = 1000
+
+_compactions = metrics.counter(
+    "thread_compactions_total", "Thread compaction attempts by result", ["result"]
+)
+_archived_messages = metrics.counter(
+    "thread_archived_messages_total", "Messages moved from thread state into the archive"
+)
+_cold_archived = metrics.counter(
+    "cold_threads_archived_total", "Idle threads exported to the cold store, by result", ["result"]
+)
+_cold_archive_seconds = metrics.histogram(
+    "cold_archive_run_seconds", "Duration of one idle-thread archival run"
+)
+
+
+def _to_message_response(msg: Dict[str, Any]) -> MessageResponse:
+    """Convert LangGraph message format to our MessageResponse format"""
+    return MessageResponse(
+        id=msg.get("id", ""),
+        content=msg.get("content", ""),
+        role="user" if msg.get("type") == "human" else "assistant",
+        timestamp=None  # LangGraph doesn't provide per-message timestamps
+    )
+
+
+def _preview(text: str) -> str:
+    return text[:settings.content_preview_length] + ("..." if len(text) > settings.content_preview_length else "")
+
+
+def _compaction_boundary(messages: List[Dict[str, Any]], keep_turns: int) -> int:
+    """Index of the first message of the last `keep_turns` user turns (0 if fewer)"""
+    turns = 0
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index].get("type") == "human":
+            turns += 1
+            if turns == keep_turns:
+                return index
+    return 0
+
+
+def _extend_summary(summary: str, messages: List[Dict[str, Any]]) -> str:
+    """Append a short extractive note about archived messages to the running summary"""
+    topics = [
+        _preview(m["content"]) for m in messages
+        if m.get("type") == "human" and isinstance(m.get("content"), str)
+    ]
+    note = f"{len(messages)} earlier messages were archived."
+    if topics:
+        note += " Topics the user raised: " + "; ".join(topics[:SUMMARY_MAX_TOPICS])
+    return f"{summary}\n{note}" if summary else note
+
 class AdminService:
     def __init__(self, langgraph_client=None):
         """
@@ -42,6 +110,10 @@ class AdminService:
             threads = []
             
             for thread_data in threads_data:
+                # Skip pre-created threads that no user has claimed yet
+                if (thread_data.get("metadata") or {}).get(POOL_METADATA_KEY) == POOL_UNASSIGNED:
+                    continue
+                
                 try:
                     # Extract required fields
                     thread_id = thread_data.get("thread_id", "")
@@ -50,29 +122,15 @@ class AdminService:
                     status = thread_data.get("status", "unknown")
                     
                     # Process messages
-                    raw_messages = thread_data.get("values", {}).get("messages", [])
-                    messages = []
+                    values = thread_data.get("values", {})
+                    messages = [_to_message_response(msg) for msg in values.get("messages", [])]
                     title = "Untitled Thread"
                     
-                    for msg in raw_messages:
-                        # Convert LangGraph message format to our MessageResponse format
-                        role = "user" if msg.get("type") == "human" else "assistant"
-                        content = msg.get("content", "")
-                        msg_id = msg.get("id", "")
-                        
-                        message = MessageResponse(
-                            id=msg_id,
-                            content=content,
-                            role=role,
-                            timestamp=None  # LangGraph doesn't provide per-message timestamps
-                        )
-                        messages.append(message)
-                    
                     # Set title to first user message
                     if messages:
                         for msg in messages:
                             if msg.role == "user":
-                                title = msg.content[:settings.content_preview_length] + ("..." if len(msg.content) > settings.content_preview_length else "")
+                                title = _preview(msg.content)
                                 break
                     
                     # Extract user information from metadata
@@ -91,7 +149,8 @@ class AdminService:
                         user_id=user_id,
                         status=status,
                         messages=messages,
-                        raw_metadata=thread_data.get("metadata", {})
+                        raw_metadata=thread_data.get("metadata", {}),
+                        archived_message_count=(values.get(ARCHIVE_STATE_KEY) or {}).get("message_count", 0)
                     )
                     
                     threads.append(thread)
@@ -111,10 +170,13 @@ class AdminService:
                 service_name="langgraph"
             )
 
-    async def get_thread_details(self, thread_id: str) -> Optional[ThreadDetails]:
+    async def get_thread_details(self, thread_id: str, include_archived: bool = False) -> Optional[ThreadDetails]:
         """
         Get detailed information about a specific thread.
         Uses the centralized LangGraph client.
+        
+        Messages moved out by compaction are only read from the archive when
+        include_archived is set; otherwise just their count is reported.
         """
         try:
             logger.info(f"[ADMIN] Getting thread details for: {thread_id}")
@@ -123,22 +185,15 @@ class AdminService:
             thread_state = await self.langgraph_client.get_thread_state(thread_id)
             
             # Process the thread state into ThreadDetails
-            raw_messages = thread_state.get("values", {}).get("messages", [])
-            messages = []
-            
-            for msg in raw_messages:
-                # Convert LangGraph message format to our MessageResponse format
-                role = "user" if msg.get("type") == "human" else "assistant"
-                content = msg.get("content", "")
-                msg_id = msg.get("id", "")
-                
-                message = MessageResponse(
-                    id=msg_id,
-                    content=content,
-                    role=role,
-                    timestamp=None  # LangGraph doesn't provide per-message timestamps
-                )
-                messages.append(message)
+            values = thread_state.get("values", {})
+            raw_messages = values.get("messages", [])
+            
+            archive = values.get(ARCHIVE_STATE_KEY) or {}
+            archive_segments = [segment["id"] for segment in archive.get("segments", [])]
+            if include_archived and archive_segments:
+                raw_messages = await message_archive.load(thread_id, archive_segments) + raw_messages
+            
+            messages = [_to_message_response(msg) for msg in raw_messages]
             
             # Extract metadata
             metadata = thread_state.get("metadata", {})
@@ -150,7 +205,7 @@ class AdminService:
             if messages:
                 for msg in messages:
                     if msg.role == "user":
-                        title = msg.content[:settings.content_preview_length] + ("..." if len(msg.content) > settings.content_preview_length else "")
+                        title = _preview(msg.content)
                         break
             
             thread_details = ThreadDetails(
@@ -159,11 +214,15 @@ class AdminService:
                 user_email=user_email,
                 user_id=user_id,
                 last_updated=datetime.utcnow(),
-                messages=messages
+                messages=messages,
+                archived_message_count=archive.get("message_count", 0),
+                archived_included=include_archived and bool(archive_segments)
             )
             
             return thread_details
             
+        except BaseAppException:
+            raise
         except Exception as e:
             logger.error(f"[ADMIN] Error getting thread details for {thread_id}: {e}")
             raise ExternalServiceError(
@@ -180,8 +239,7 @@ class AdminService:
         try:
             logger.info(f"[ADMIN] Admin {admin_user_id} deleting thread: {thread_id}")
             
-            # Use the centralized client method
-            await self.langgraph_client.delete_thread(thread_id)
+            await self._delete_thread_everywhere(thread_id)
             
             logger.info(f"[ADMIN_AUDIT] Thread {thread_id} successfully deleted by admin {admin_user_id}")
             return True
@@ -194,4 +252,345 @@ class AdminService:
                 context={"thread_id": thread_id, "admin_user_id": admin_user_id}
             )
 
- 
\ No newline at end of file
+    async def _delete_thread_everywhere(self, thread_id: str) -> None:
+        # A cold-archived thread no longer exists upstream
+        if cold_thread_store.contains(thread_id):
+            await asyncio.to_thread(cold_thread_store.remove, thread_id)
+        else:
+            await self.langgraph_client.delete_thread(thread_id)
+        await message_archive.delete_thread(thread_id)
+
+    async def bulk_delete_threads(
+        self,
+        thread_ids: Optional[List[str]] = None,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        dry_run: bool = False,
+        admin_user_id: str = "admin"
+    ) -> BulkDeleteResponse:
+        """
+        Delete many threads at once with bounded parallelism.
+        
+        Threads are selected either by explicit ids or by a non-empty metadata
+        filter (e.g. {"user_id": "..."}). With dry_run=True only the number of
+        matching threads is reported and nothing is deleted.
+        
+        A filter may match more than BULK_DELETE_MAX_THREADS threads: `matched`
+        is then the full count, only the oldest BULK_DELETE_MAX_THREADS are
+        deleted and `truncated` is set so the caller can repeat the request.
+        """
+        if bool(thread_ids) == bool(metadata_filter):
+            raise ValidationError(
+                "Provide either a non-empty list of thread_ids or a non-empty metadata_filter",
+                field="thread_ids"
+            )
+        
+        if thread_ids:
+            # Preserve order, drop duplicates
+            targets = list(dict.fromkeys(thread_ids))
+            if len(targets) > settings.bulk_delete_max_threads:
+                raise ValidationError(
+                    f"Too many threads in one request (max {settings.bulk_delete_max_threads})",
+                    field="thread_ids"
+                )
+            matched = len(targets)
+        else:
+            matching = await self._search_thread_ids(metadata_filter)
+            matched = len(matching)
+            targets = matching[:settings.bulk_delete_max_threads]
+        truncated = matched > len(targets)
+        
+        logger.info(
+            f"[ADMIN] Admin {admin_user_id} bulk deleting {len(targets)} of {matched} threads "
+            f"(dry_run={dry_run}, filter={metadata_filter})"
+        )
+        
+        if dry_run:
+            return BulkDeleteResponse(
+                dry_run=True, matched=matched, deleted=0, failed=0, results=[], truncated=truncated
+            )
+        
+        semaphore = asyncio.Semaphore(settings.bulk_delete_concurrency)
+        
+        async def delete_one(thread_id: str) -> BulkDeleteResult:
+            async with semaphore:
+                try:
+                    await self._delete_thread_everywhere(thread_id)
+                    logger.info(f"[ADMIN_AUDIT] Thread {thread_id} successfully deleted by admin {admin_user_id} (bulk)")
+                    return BulkDeleteResult(thread_id=thread_id, deleted=True)
+                except Exception as e:
+                    logger.error(f"[ADMIN] Error deleting thread {thread_id} in bulk: {e}")
+                    return BulkDeleteResult(thread_id=thread_id, deleted=False, error=str(e))
+        
+        results = await asyncio.gather(*(delete_one(thread_id) for thread_id in targets))
+        deleted = sum(1 for result in results if result.deleted)
+        
+        return BulkDeleteResponse(
+            dry_run=False,
+            matched=matched,
+            deleted=deleted,
+            failed=len(results) - deleted,
+            results=list(results),
+            truncated=truncated
+        )
+
+    async def _search_thread_ids(self, metadata_filter: Dict[str, Any]) -> List[str]:
+        """Ids of every thread matching the filter, oldest first, paging through the search"""
+        thread_ids: List[str] = []
+        offset = 0
+        while True:
+            page = await self.langgraph_client.search_threads(
+                limit=SEARCH_PAGE_SIZE,
+                metadata_filter=metadata_filter,
+                select=["thread_id"],
+                sort_by="created_at",
+                sort_order="asc",
+                offset=offset
+            )
+            thread_ids.extend(t["thread_id"] for t in page if t.get("thread_id"))
+            offset += len(page)
+            if len(page) < SEARCH_PAGE_SIZE:
+                # A thread created mid-scan can shift a page and be seen twice
+                return list(dict.fromkeys(thread_ids))
+
+    async def compact_thread(
+        self,
+        thread_id: str,
+        keep_turns: Optional[int] = None,
+        admin_user_id: str = "admin"
+    ) -> ThreadCompactionResult:
+        """
+        Move all but the last `keep_turns` user turns of a thread into the archive.
+        
+        The archived messages are removed from the checkpointed state and
+        replaced by a pointer (segment ids and count) plus a short note in the
+        running summary, so the model keeps some context. Earlier checkpoints
+        are not rewritten.
+        """
+        state = await self.langgraph_client.get_thread_state(thread_id)
+        return await self._compact_values(
+            thread_id, state.get("values") or {}, keep_turns, admin_user_id
+        )
+
+    async def _compact_values(
+        self,
+        thread_id: str,
+        values: Dict[str, Any],
+        keep_turns: Optional[int],
+        admin_user_id: str
+    ) -> ThreadCompactionResult:
+        keep_turns = settings.thread_compaction_keep_turns if keep_turns is None else keep_turns
+        if keep_turns < 1:
+            raise ValidationError("keep_turns must be at least 1", field="keep_turns", value=keep_turns)
+        
+        messages = values.get("messages") or []
+        boundary = _compaction_boundary(messages, keep_turns)
+        # System prompts stay in state; messages without an id cannot be removed
+        archived = [m for m in messages[:boundary] if m.get("type") != "system" and m.get("id")]
+        if not archived:
+            _compactions.inc(result="skipped")
+            return ThreadCompactionResult(thread_id=thread_id, kept_messages=len(messages))
+        
+        segment_id = await message_archive.save(thread_id, archived)
+        
+        archive = values.get(ARCHIVE_STATE_KEY) or {}
+        segments = list(archive.get("segments", []))
+        segments.append({
+            "id": segment_id,
+            "message_count": len(archived),
+            "archived_at": datetime.utcnow().isoformat() + "Z"
+        })
+        
+        # summarized_count indexes into messages; shift it past the removed ones
+        summarized_count = values.get("summarized_count") or 0
+        summary = values.get("summary") or ""
+        if boundary > summarized_count:
+            summary = _extend_summary(summary, messages[summarized_count:boundary])
+        
+        update = {
+            "messages": [{"type": "remove", "id": m["id"], "content": ""} for m in archived],
+            ARCHIVE_STATE_KEY: {
+                "segments": segments,
+                "message_count": archive.get("message_count", 0) + len(archived)
+            },
+            "summary": summary,
+            "summarized_count": max(summarized_count, boundary) - len(archived)
+        }
+        try:
+            await self.langgraph_client.update_thread_state(thread_id, update, as_node=COMPACTION_AS_NODE)
+        except Exception:
+            _compactions.inc(result="failed")
+            await message_archive.discard(thread_id, segment_id)
+            raise
+        
+        _compactions.inc(result="compacted")
+        _archived_messages.inc(len(archived))
+        logger.info(
+            f"[ADMIN_AUDIT] Thread {thread_id} compacted by admin {admin_user_id}: "
+            f"{len(archived)} messages archived to segment {segment_id}"
+        )
+        return ThreadCompactionResult(
+            thread_id=thread_id,
+            archived_messages=len(archived),
+            kept_messages=len(messages) - len(archived),
+            segment_id=segment_id
+        )
+
+    async def compact_threads(
+        self,
+        min_messages: Optional[int] = None,
+        keep_turns: Optional[int] = None,
+        dry_run: bool = False,
+        admin_user_id: str = "admin"
+    ) -> BulkCompactionResponse:
+        """
+        Compact every thread holding at least `min_messages` messages.
+        
+        Runs with the same bounded parallelism as bulk deletes; one failing
+        thread does not stop the others.
+        """
+        if min_messages is None:
+            min_messages = settings.thread_compaction_min_messages
+        if keep_turns is not None and keep_turns < 1:
+            raise ValidationError("keep_turns must be at least 1", field="keep_turns", value=keep_turns)
+        
+        threads_data = await self.langgraph_client.search_threads(
+            limit=settings.bulk_delete_max_threads,
+            select=["thread_id", "values"]
+        )
+        targets = [
+            t for t in threads_data
+            if t.get("thread_id") and len((t.get("values") or {}).get("messages") or []) >= min_messages
+        ]
+        
+        logger.info(
+            f"[ADMIN] Admin {admin_user_id} compacting {len(targets)} threads "
+            f"(dry_run={dry_run}, min_messages={min_messages})"
+        )
+        
+        if dry_run:
+            return BulkCompactionResponse(dry_run=True, matched=len(targets), compacted=0, failed=0, results=[])
+        
+        semaphore = asyncio.Semaphore(settings.bulk_delete_concurrency)
+        
+        async def compact_one(thread_data: Dict[str, Any]) -> ThreadCompactionResult:
+            thread_id = thread_data["thread_id"]
+            async with semaphore:
+                try:
+                    return await self._compact_values(
+                        thread_id, thread_data.get("values") or {}, keep_turns, admin_user_id
+                    )
+                except Exception as e:
+                    logger.error(f"[ADMIN] Error compacting thread {thread_id}: {e}")
+                    return ThreadCompactionResult(thread_id=thread_id, error=str(e))
+        
+        results = await asyncio.gather(*(compact_one(thread_data) for thread_data in targets))
+        
+        return BulkCompactionResponse(
+            dry_run=False,
+            matched=len(targets),
+            compacted=sum(1 for result in results if result.segment_id),
+            failed=sum(1 for result in results if result.error),
+            results=list(results)
+        )
+
+    async def archive_idle_threads(
+        self,
+        idle_days: Optional[float] = None,
+        limit: Optional[int] = None,
+        dry_run: bool = False,
+        admin_user_id: str = "admin"
+    ) -> ColdArchiveResponse:
+        """
+        Export threads idle for `idle_days` to the cold store and delete them upstream.
+        
+        Records are written (and fsynced) before any upstream delete; a thread
+        whose delete fails is dropped from the store again so it is never in
+        both places. Archived threads are restored transparently by
+        LangGraphClient when they are next read or streamed to.
+        """
+        if idle_days is None:
+            idle_days = settings.thread_cold_idle_days
+        if limit is None:
+            limit = settings.thread_cold_batch_limit
+        started = time.perf_counter()
+        cutoff = datetime.now(timezone.utc) - timedelta(days=idle_days)
+        
+        threads_data = await self.langgraph_client.search_threads(
+            limit=limit,
+            select=["thread_id", "created_at", "updated_at", "status", "metadata", "values"],
+            sort_by="updated_at",
+            sort_order="asc"
+        )
+        
+        targets = []
+        for thread_data in threads_data:
+            metadata = thread_data.get("metadata") or {}
+            if not thread_data.get("thread_id") or metadata.get(POOL_METADATA_KEY) == POOL_UNASSIGNED:
+                continue
+            # Never archive a thread with a run in progress or waiting on input
+            if thread_data.get("status", "idle") != "idle":
+                continue
+            try:
+                updated_at = datetime.fromisoformat(str(thread_data["updated_at"]).replace("Z", "+00:00"))
+            except (KeyError, ValueError) as e:
+                logger.warning(
+                    f"[ADMIN] Skipping thread {thread_data['thread_id']} for archival: no usable updated_at ({e})"
+                )
+                continue
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            if updated_at < cutoff:
+                targets.append(thread_data)
+        
+        logger.info(
+            f"[ADMIN] Admin {admin_user_id} archiving {len(targets)} idle threads "
+            f"(dry_run={dry_run}, idle_days={idle_days})"
+        )
+        
+        if dry_run or not targets:
+            return ColdArchiveResponse(dry_run=dry_run, matched=len(targets), archived=0, failed=0, results=[])
+        
+        archived_at = time.time()
+        records = [
+            {
+                "thread_id": t["thread_id"],
+                "created_at": t.get("created_at"),
+                "updated_at": t.get("updated_at"),
+                "metadata": t.get("metadata") or {},
+                "values": t.get("values") or {},
+                "archived_at": archived_at
+            }
+            for t in targets
+        ]
+        sizes = await asyncio.to_thread(cold_thread_store.put_many, records)
+        
+        semaphore = asyncio.Semaphore(settings.bulk_delete_concurrency)
+        
+        async def delete_upstream(thread_id: str) -> ColdArchiveResult:
+            async with semaphore:
+                try:
+                    await self.langgraph_client.delete_thread(thread_id)
+                except Exception as e:
+                    logger.error(f"[ADMIN] Error deleting archived thread {thread_id} upstream: {e}")
+                    await asyncio.to_thread(cold_thread_store.remove, thread_id)
+                    _cold_archived.inc(result="failed")
+                    return ColdArchiveResult(thread_id=thread_id, archived=False, error=str(e))
+            _cold_archived.inc(result="archived")
+            return ColdArchiveResult(thread_id=thread_id, archived=True, compressed_bytes=sizes[thread_id])
+        
+        results = await asyncio.gather(*(delete_upstream(record["thread_id"]) for record in records))
+        archived = sum(1 for result in results if result.archived)
+        _cold_archive_seconds.observe(time.perf_counter() - started)
+        
+        logger.info(f"[ADMIN_AUDIT] Admin {admin_user_id} archived {archived} idle threads to the cold store")
+        return ColdArchiveResponse(
+            dry_run=False,
+            matched=len(targets),
+            archived=archived,
+            failed=len(results) - archived,
+            results=list(results)
+        )
+
+    async def restore_thread(self, thread_id: str) -> bool:
+        """Restore an archived thread into LangGraph now (False if it was not archived)"""
+        return await self.langgraph_client.restore_if_archived(thread_id)
@@ -0,0 +1,238 @@
+"""
+Local segment store for threads archived out of LangGraph.
+
+Idle threads are exported (state values plus metadata) as compressed
+records appended to segment files under THREAD_COLD_STORE_DIR; index.json
+maps each thread id to its segment, offset and length. Segments are
+append-only and roll over past THREAD_COLD_SEGMENT_MAX_BYTES. Restored
+threads are only dropped from the index; their bytes stay in the segment.
+
+Writers hold an exclusive lock file, so several worker processes can share
+one store. Readers never wait for a writer: `contains()` runs on the event
+loop for every thread access, so it only looks at an immutable snapshot of
+the index. The snapshot is replaced after every local write and refreshed
+from disk on a background thread at most every INDEX_REFRESH_INTERVAL
+seconds, which is how writes from other workers become visible.
+"""
+
+import fcntl
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for THREAD_COLD_CODEC=zstd
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+LOCK_FILE = ".lock"
+SEGMENT_PATTERN = "segment-{:06d}.bin"
+
+# How stale another worker's archive writes may look to contains()
+INDEX_REFRESH_INTERVAL = 1.0
+
+_store_threads = metrics.gauge("cold_store_threads", "Threads currently held in the cold store")
+_store_bytes = metrics.gauge("cold_store_bytes", "Compressed bytes of threads currently in the cold store")
+_bytes_written = metrics.counter(
+    "cold_store_written_bytes_total", "Bytes of exported thread records by stage", ["kind"]
+)
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("THREAD_COLD_CODEC=zstd requires the zstandard package")
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Reading zstd records requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class ColdThreadStore:
+    def __init__(self, root: str, codec: str = "gzip", segment_max_bytes: int = 64 * 1024 * 1024):
+        self.root = root
+        self.codec = codec
+        self.segment_max_bytes = segment_max_bytes
+        # Writer's working copy, guarded by _lock (and the lock file)
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._index_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        # Published index: replaced, never mutated, so readers need no lock
+        self._snapshot: Dict[str, Dict[str, Any]] = {}
+        self._snapshot_mtime: Optional[float] = None
+        self._publish_lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._checked_at = 0.0
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.root, INDEX_FILE)
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, open(os.path.join(self.root, LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another process may have written since we last looked
+                self._reload_index()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_index(self, known_mtime: Optional[float]) -> Tuple[Optional[Dict[str, Dict[str, Any]]], Optional[float]]:
+        """(index, mtime) from disk; index is None when unchanged since known_mtime"""
+        try:
+            mtime = os.stat(self._index_path).st_mtime_ns
+        except FileNotFoundError:
+            return ({} if known_mtime is not None else None), None
+        if mtime == known_mtime:
+            return None, mtime
+        with open(self._index_path, encoding="utf-8") as f:
+            return json.load(f), mtime
+
+    def _reload_index(self) -> None:
+        index, mtime = self._read_index(self._index_mtime)
+        if index is not None:
+            self._index, self._index_mtime = index, mtime
+            self._publish(dict(index), mtime)
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, separators=(",", ":"))
+        os.replace(tmp_path, self._index_path)
+        self._index_mtime = os.stat(self._index_path).st_mtime_ns
+        self._publish(dict(self._index), self._index_mtime)
+
+    def _publish(self, index: Dict[str, Dict[str, Any]], mtime: Optional[float]) -> None:
+        with self._publish_lock:
+            # A slow refresh must not replace a newer snapshot from a local write
+            if mtime is not None and self._snapshot_mtime is not None and mtime < self._snapshot_mtime:
+                return
+            self._snapshot, self._snapshot_mtime = index, mtime
+        _store_threads.set(len(index))
+        _store_bytes.set(sum(entry["length"] for entry in index.values()))
+
+    def refresh(self) -> None:
+        """Reload the published index if it changed on disk (blocking; call off the event loop)"""
+        self._checked_at = time.monotonic()
+        index, mtime = self._read_index(self._snapshot_mtime)
+        if index is not None:
+            self._publish(index, mtime)
+
+    def _refresh_if_stale(self) -> None:
+        if time.monotonic() - self._checked_at > INDEX_REFRESH_INTERVAL and self._refreshing.acquire(blocking=False):
+            self._checked_at = time.monotonic()
+            threading.Thread(target=self._refresh_in_background, name="cold-store-refresh", daemon=True).start()
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Failed to refresh the cold store index: {e}")
+        finally:
+            self._refreshing.release()
+
+    def _current_segment(self) -> Tuple[int, str]:
+        numbers = [entry["segment"] for entry in self._index.values()]
+        number = max(numbers, default=1)
+        path = os.path.join(self.root, SEGMENT_PATTERN.format(number))
+        # Segments of restored threads drop out of the index, so look at the disk too
+        while os.path.exists(os.path.join(self.root, SEGMENT_PATTERN.format(number + 1))):
+            number += 1
+            path = os.path.join(self.root, SEGMENT_PATTERN.format(number))
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_max_bytes:
+            number += 1
+            path = os.path.join(self.root, SEGMENT_PATTERN.format(number))
+        return number, path
+
+    def contains(self, thread_id: str) -> bool:
+        """
+        Cheap check used on every thread access, safe to call on the event loop
+
+        Never blocks on a writer or touches the disk; when the snapshot is
+        older than INDEX_REFRESH_INTERVAL a background refresh is started.
+        """
+        self._refresh_if_stale()
+        return thread_id in self._snapshot
+
+    def put_many(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Append thread records (each with a "thread_id") to the current segment.
+        
+        Returns the compressed size per thread id. The index is written once
+        per batch, after the segment data has been flushed to disk.
+        """
+        sizes: Dict[str, int] = {}
+        with self._write_lock():
+            number, path = self._current_segment()
+            with open(path, "ab") as segment:
+                for record in records:
+                    raw = json.dumps(record, separators=(",", ":")).encode()
+                    blob = _compress(raw, self.codec)
+                    offset = segment.tell()
+                    segment.write(blob)
+                    self._index[record["thread_id"]] = {
+                        "segment": number,
+                        "offset": offset,
+                        "length": len(blob),
+                        "raw_length": len(raw),
+                        "codec": self.codec,
+                        "archived_at": record.get("archived_at") or time.time(),
+                        "user_id": (record.get("metadata") or {}).get("user_id"),
+                    }
+                    sizes[record["thread_id"]] = len(blob)
+                    _bytes_written.inc(len(raw), kind="raw")
+                    _bytes_written.inc(len(blob), kind="compressed")
+                segment.flush()
+                os.fsync(segment.fileno())
+            self._save_index()
+        return sizes
+
+    def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Read one archived thread record, or None if it is not in the store (blocking)"""
+        self.refresh()
+        entry = self._snapshot.get(thread_id)
+        if entry is None:
+            return None
+        path = os.path.join(self.root, SEGMENT_PATTERN.format(entry["segment"]))
+        with open(path, "rb") as segment:
+            segment.seek(entry["offset"])
+            blob = segment.read(entry["length"])
+        return json.loads(_decompress(blob, entry["codec"]))
+
+    def remove(self, thread_id: str) -> None:
+        """Forget a thread (after it was restored upstream or failed to export)"""
+        with self._write_lock():
+            if self._index.pop(thread_id, None) is not None:
+                self._save_index()
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of the index: thread id -> location, sizes and archive time"""
+        self._refresh_if_stale()
+        return dict(self._snapshot)
+
+
+cold_thread_store = ColdThreadStore(
+    settings.thread_cold_store_dir,
+    codec=settings.thread_cold_codec,
+    segment_max_bytes=settings.thread_cold_segment_max_bytes
+)
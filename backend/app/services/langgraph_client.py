@@ -1,15 +1,72 @@
+import asyncio
 import logging
+import time
 from typing import Any, AsyncGenerator, Dict, List, Optional
 
-from langgraph_sdk import get_client
-
+from app.core.cache import SingleFlight, TTLCache
 from app.core.config import settings
-from app.core.exceptions import ExternalServiceError
+from app.core.exceptions import BaseAppException, ExternalServiceError
+from app.core.metrics import metrics, track_upstream
+from app.core.resilience import CircuitBreaker, RetryPolicy, call_with_retry
+from app.core.tracing import trace_headers, traced, tracer
+from app.models.chat import ChatMessage
+from app.services.cold_storage import cold_thread_store
+from app.services.thread_pool import (POOL_CLAIMED, POOL_METADATA_KEY,
+                                      POOL_UNASSIGNED, warm_thread_pool)
 
 logger = logging.getLogger(__name__)
 
+# Shared across LangGraphClient instances (one is created per request).
+# Keys are (thread_id, checkpoint_id); checkpoint_id is None for "latest".
+_thread_state_flight = SingleFlight("langgraph_thread_state")
+thread_state_cache = TTLCache(
+    "langgraph_thread_state",
+    ttl=settings.thread_state_cache_ttl,
+    max_size=settings.thread_state_cache_size
+)
+
+_restore_flight = SingleFlight("cold_thread_restore")
+
+# Graph node restored state is attributed to, so no run is triggered
+RESTORE_AS_NODE = "call_model"
+
+
+# One breaker per worker so every request sees the same upstream health
+langgraph_breaker = CircuitBreaker(
+    "langgraph",
+    failure_threshold=settings.langgraph_breaker_failure_threshold,
+    recovery_timeout=settings.langgraph_breaker_recovery_timeout
+)
+_retry_policy = RetryPolicy(
+    attempts=settings.langgraph_retry_attempts,
+    base_delay=settings.langgraph_retry_base_delay,
+    max_delay=settings.langgraph_retry_max_delay
+)
+
+
+_stream_first_event = metrics.histogram(
+    "langgraph_stream_first_event_seconds",
+    "Time from starting a LangGraph run stream to its first event"
+)
+_restores = metrics.counter(
+    "cold_thread_restores_total", "Archived threads brought back into LangGraph, by result", ["result"]
+)
+_restore_seconds = metrics.histogram(
+    "cold_thread_restore_seconds", "Time to restore an archived thread into LangGraph"
+)
+
+
+def invalidate_thread_state(thread_id: str) -> None:
+    """Drop cached and in-flight state for a thread after it changed"""
+    thread_state_cache.delete_where(lambda key: key[0] == thread_id)
+    _thread_state_flight.forget_where(lambda key: key[0] == thread_id)
+
+
 class LangGraphClient:
     def __init__(self):
+        # Imported on first use: the SDK is a large share of cold import time
+        from langgraph_sdk import get_client
+
         if settings.langgraph_api_key:
             logger.info("Using API key for LangGraph client")
             self.client = get_client(url=settings.langgraph_api_url, api_key=settings.langgraph_api_key)
@@ -19,46 +76,234 @@ class LangGraphClient:
 
         self.assistant_id = settings.langgraph_assistant_id
     
+    @traced("langgraph.create_thread", kind="client")
     async def create_thread(self, user_id: str, user_email: str) -> Dict[str, Any]:
-        """Create a new thread in LangGraph with user metadata"""
+        """
+        Create a new thread in LangGraph with user metadata
+        
+        When the warm thread pool is enabled a pre-created thread is claimed
+        and only its metadata is patched, saving the create round-trip.
+        """
         metadata = {
             "user_id": user_id,
             "user_email": user_email
         }
+        
+        thread_id = warm_thread_pool.claim()
+        if thread_id is not None:
+            try:
+                with track_upstream("langgraph", "assign_thread"):
+                    await self.client.threads.update(
+                        thread_id=thread_id,
+                        metadata={**metadata, POOL_METADATA_KEY: POOL_CLAIMED},
+                        headers=trace_headers()
+                    )
+                return {"thread_id": thread_id}
+            except Exception as e:
+                logger.warning(
+                    f"Failed to assign pooled thread, creating a new one: {e}",
+                    extra={"thread_id": thread_id}
+                )
             
-        thread = await self.client.threads.create(metadata=metadata)
+        with track_upstream("langgraph", "create_thread"):
+            thread = await self.client.threads.create(metadata=metadata, headers=trace_headers())
         return {"thread_id": thread["thread_id"]}
     
-    async def get_thread_state(self, thread_id: str) -> Dict[str, Any]:
-        """Get the current state of a thread"""
+    @traced("langgraph.create_pool_thread", kind="client")
+    async def create_unassigned_thread(self) -> str:
+        """Create a thread with no owner for the warm thread pool"""
+        with track_upstream("langgraph", "create_pool_thread"):
+            thread = await self.client.threads.create(
+                metadata={POOL_METADATA_KEY: POOL_UNASSIGNED},
+                headers=trace_headers()
+            )
+        return thread["thread_id"]
+    
+    @traced("langgraph.get_thread_state", kind="client")
+    async def get_thread_state(self, thread_id: str, checkpoint_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the state of a thread (latest, or at a specific checkpoint)
+        
+        Concurrent calls for the same thread share one upstream request, and
+        results may be served from a short-lived cache when enabled. The
+        returned dict can be shared between callers and must not be mutated.
+        """
+        await self.restore_if_archived(thread_id)
+        
+        key = (thread_id, checkpoint_id)
+        cached = thread_state_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        return await _thread_state_flight.do(key, lambda: self._fetch_thread_state(thread_id, checkpoint_id))
+    
+    async def _fetch_thread_state(self, thread_id: str, checkpoint_id: Optional[str]) -> Dict[str, Any]:
+        key = (thread_id, checkpoint_id)
         try:
-            return await self.client.threads.get_state(thread_id=thread_id)
+            state = await call_with_retry(
+                lambda: self.client.threads.get_state(
+                    thread_id=thread_id, checkpoint_id=checkpoint_id, headers=trace_headers()
+                ),
+                service="langgraph",
+                operation="get_thread_state",
+                breaker=langgraph_breaker,
+                policy=_retry_policy,
+                hedge_delay=settings.langgraph_hedge_delay or None
+            )
+        except BaseAppException:
+            raise
         except Exception as e:
             raise ExternalServiceError(
                 message=f"Failed to get thread state: {e}",
                 service_name="langgraph",
                 context={"thread_id": thread_id}
             )
+        
+        # Skip caching if the thread was invalidated while we were fetching
+        if _thread_state_flight.owns(key, asyncio.current_task()):
+            thread_state_cache.set(key, state)
+        return state
+    
+    @traced("langgraph.update_thread_state", kind="client")
+    async def update_thread_state(
+        self,
+        thread_id: str,
+        values: Dict[str, Any],
+        as_node: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Apply a state update to a thread as if `as_node` had produced it
+        
+        Not retried: an update is not idempotent (removing the same message
+        twice fails).
+        """
+        try:
+            with track_upstream("langgraph", "update_thread_state"):
+                return await self.client.threads.update_state(
+                    thread_id=thread_id, values=values, as_node=as_node, headers=trace_headers()
+                )
+        except Exception as e:
+            raise ExternalServiceError(
+                message=f"Failed to update thread state: {e}",
+                service_name="langgraph",
+                context={"thread_id": thread_id}
+            )
+        finally:
+            invalidate_thread_state(thread_id)
     
+    async def restore_if_archived(self, thread_id: str) -> bool:
+        """
+        Recreate a thread from the cold store if it was archived
+        
+        Returns True if the thread was in the cold store. Concurrent callers
+        for the same thread share one restore.
+        """
+        if not cold_thread_store.contains(thread_id):
+            return False
+        await _restore_flight.do(thread_id, lambda: self._restore_thread(thread_id))
+        return True
+    
+    @traced("langgraph.restore_thread", kind="client")
+    async def _restore_thread(self, thread_id: str) -> None:
+        started = time.perf_counter()
+        record = await asyncio.to_thread(cold_thread_store.get, thread_id)
+        if record is None:
+            # Another worker restored it in the meantime
+            return
+        
+        try:
+            with track_upstream("langgraph", "restore_thread"):
+                await self.client.threads.create(
+                    thread_id=thread_id,
+                    metadata=record.get("metadata") or {},
+                    if_exists="do_nothing",
+                    headers=trace_headers()
+                )
+                if record.get("values"):
+                    await self.client.threads.update_state(
+                        thread_id=thread_id,
+                        values=record["values"],
+                        as_node=RESTORE_AS_NODE,
+                        headers=trace_headers()
+                    )
+        except Exception as e:
+            _restores.inc(result="failed")
+            raise ExternalServiceError(
+                message=f"Failed to restore archived thread: {e}",
+                service_name="langgraph",
+                context={"thread_id": thread_id}
+            )
+        
+        await asyncio.to_thread(cold_thread_store.remove, thread_id)
+        invalidate_thread_state(thread_id)
+        
+        elapsed = time.perf_counter() - started
+        _restores.inc(result="restored")
+        _restore_seconds.observe(elapsed)
+        logger.info("Restored archived thread", extra={"thread_id": thread_id, "restore_seconds": round(elapsed, 3)})
+    
+    @traced("langgraph.delete_thread", kind="client")
     async def delete_thread(self, thread_id: str) -> None:
-        """Delete a thread"""
+        """
+        Delete a thread
+
+        A 404 on a retry counts as success: the earlier attempt deleted the
+        thread and only its response was lost.
+        """
+        attempts = 0
+
+        async def delete() -> None:
+            nonlocal attempts
+            attempts += 1
+            try:
+                await self.client.threads.delete(thread_id=thread_id, headers=trace_headers())
+            except Exception as e:
+                status_code = getattr(getattr(e, "response", None), "status_code", None)
+                if attempts == 1 or status_code != 404:
+                    raise
+                logger.info("Thread already gone on delete retry", extra={"thread_id": thread_id})
+
         try:
-            await self.client.threads.delete(thread_id=thread_id)
+            await call_with_retry(
+                delete,
+                service="langgraph",
+                operation="delete_thread",
+                breaker=langgraph_breaker,
+                policy=_retry_policy
+            )
             logger.debug("Thread deleted successfully", extra={"thread_id": thread_id})
+        except BaseAppException:
+            raise
         except Exception as e:
             raise ExternalServiceError(
                 message=f"Failed to delete thread: {e}",
                 service_name="langgraph",
                 context={"thread_id": thread_id}
             )
+        finally:
+            invalidate_thread_state(thread_id)
     
-    async def search_threads(self, limit: Optional[int] = None, metadata_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    @traced("langgraph.search_threads", kind="client")
+    async def search_threads(
+        self,
+        limit: Optional[int] = None,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        select: Optional[List[str]] = None,
+        sort_by: Optional[str] = None,
+        sort_order: Optional[str] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
         """
         Search for threads with optional metadata filtering
         
         Args:
             limit: Maximum number of threads to return (defaults to configured default)
             metadata_filter: Optional metadata filter (empty dict = all threads)
+            select: Optional list of fields to return (e.g. ["thread_id"]) to
+                avoid transferring full thread values
+            sort_by: Optional sort field (e.g. "updated_at") with sort_order
+                "asc" or "desc"
+            offset: Number of matching threads to skip, for paging
             
         Returns:
             List of thread data dictionaries from LangGraph
@@ -72,13 +317,28 @@ class LangGraphClient:
                 "limit": limit,
                 "metadata": metadata_filter or {}
             }
+            if select:
+                search_params["select"] = select
+            if offset:
+                search_params["offset"] = offset
+            if sort_by:
+                search_params["sort_by"] = sort_by
+                search_params["sort_order"] = sort_order or "desc"
             
             # Call the search endpoint through the SDK
-            threads_data = await self.client.threads.search(**search_params)
+            threads_data = await call_with_retry(
+                lambda: self.client.threads.search(**search_params, headers=trace_headers()),
+                service="langgraph",
+                operation="search_threads",
+                breaker=langgraph_breaker,
+                policy=_retry_policy
+            )
             
             # Return the raw thread data for processing by business logic layer
             return threads_data if isinstance(threads_data, list) else []
             
+        except BaseAppException:
+            raise
         except Exception as e:
             raise ExternalServiceError(
                 message=f"Failed to search threads: {e}",
@@ -89,12 +349,19 @@ class LangGraphClient:
     async def stream_messages(
         self, 
         thread_id: str, 
-        messages: List[Dict[str, Any]]
+        messages: List[ChatMessage]
     ) -> AsyncGenerator[Dict[str, Any], None]:
-        """Stream messages to LangGraph and yield responses"""
+        """
+        Stream messages to LangGraph and yield responses
+        
+        The validated messages already have LangGraph's input shape and are
+        sent without conversion.
+        """
         
-        # Convert messages to LangGraph format
-        input_data = {"messages": self._convert_messages(messages)}
+        # A reopened archived thread must exist upstream before the run starts
+        await self.restore_if_archived(thread_id)
+        
+        input_data = {"messages": messages}
         config = {
             "configurable": {
                 "model_name": settings.langgraph_model_name,
@@ -103,31 +370,44 @@ class LangGraphClient:
         
         logger.debug("Starting message stream", extra={"thread_id": thread_id})
         
+        # Spans are started explicitly rather than made current: a generator
+        # must not leave its context active across yields
+        stream_span = tracer.start_span(
+            "langgraph.stream_messages", kind="client", attributes={"thread_id": thread_id}
+        )
+        first_event_span = tracer.start_span("langgraph.first_event", parent=stream_span)
+        headers = tracer.inject({}, span=stream_span) if stream_span.sampled else None
+        
         # Stream to the thread
-        async for event in self.client.runs.stream(
-            thread_id=thread_id,
-            assistant_id=self.assistant_id,
-            input=input_data,
-            config=config,
-            stream_mode="messages"
-        ):
-            # Yield LangGraph events directly
-            yield {
-                "type": event.event,
-                "data": event.data
-            }
-    
-    def _convert_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Convert assistant-ui messages to LangGraph format"""
-        converted = []
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            
-            converted.append({
-                "role": role,
-                "content": content
-            })
-        return converted
-
- 
\ No newline at end of file
+        started = time.perf_counter()
+        first_event = True
+        events = 0
+        try:
+            with track_upstream("langgraph", "stream_messages"):
+                async for event in self.client.runs.stream(
+                    thread_id=thread_id,
+                    assistant_id=self.assistant_id,
+                    input=input_data,
+                    config=config,
+                    stream_mode="messages",
+                    headers=headers
+                ):
+                    if first_event:
+                        _stream_first_event.observe(time.perf_counter() - started)
+                        first_event_span.end()
+                        first_event = False
+                    events += 1
+                    # Yield LangGraph events directly
+                    yield {
+                        "type": event.event,
+                        "data": event.data
+                    }
+        except Exception as e:
+            stream_span.record_exception(e)
+            raise
+        finally:
+            first_event_span.end()
+            stream_span.set_attribute("stream.events", events)
+            stream_span.end()
+            # The run appended to the thread, so any cached state is stale
+            invalidate_thread_state(thread_id)
@@ -0,0 +1,85 @@
+"""
+Compressed storage for messages compacted out of LangGraph thread state.
+
+Each compaction writes one gzip-compressed JSON segment under
+THREAD_ARCHIVE_DIR/<thread_id>/<segment_id>.json.gz; the thread state keeps
+only the segment ids (see AdminService.compact_thread). Segments are written
+once and never modified, so they are safe to read from any worker process.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from typing import Any, Dict, List, Sequence
+
+from app.core.config import settings
+from app.core.exceptions import ResourceNotFoundError, ValidationError
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _check_id(value: str, field: str) -> str:
+    # Ids become path components, so reject anything that could escape the root
+    if not _SAFE_ID.match(value or ""):
+        raise ValidationError(f"Invalid {field}", field=field)
+    return value
+
+
+class MessageArchive:
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, thread_id: str, segment_id: str) -> str:
+        return os.path.join(
+            self.root, _check_id(thread_id, "thread_id"), f"{_check_id(segment_id, 'segment_id')}.json.gz"
+        )
+
+    def _write(self, thread_id: str, messages: List[Dict[str, Any]]) -> str:
+        segment_id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        path = self._path(thread_id, segment_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Write to a temp file and rename so readers never see a partial segment
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(messages, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return segment_id
+
+    def _read(self, thread_id: str, segment_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        messages: List[Dict[str, Any]] = []
+        for segment_id in segment_ids:
+            try:
+                with gzip.open(self._path(thread_id, segment_id), "rt", encoding="utf-8") as f:
+                    messages.extend(json.load(f))
+            except FileNotFoundError:
+                raise ResourceNotFoundError(
+                    "Archived messages not found", resource_type="message_archive", resource_id=segment_id
+                )
+        return messages
+
+    async def save(self, thread_id: str, messages: List[Dict[str, Any]]) -> str:
+        """Write one segment and return its id"""
+        return await asyncio.to_thread(self._write, thread_id, messages)
+
+    async def load(self, thread_id: str, segment_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """Read segments in order and return their messages concatenated"""
+        return await asyncio.to_thread(self._read, thread_id, segment_ids)
+
+    async def discard(self, thread_id: str, segment_id: str) -> None:
+        """Remove one segment, e.g. after the state update referencing it failed"""
+        path = self._path(thread_id, segment_id)
+        await asyncio.to_thread(lambda: os.path.exists(path) and os.remove(path))
+
+    async def delete_thread(self, thread_id: str) -> None:
+        """Remove every segment of a thread (no-op if it has none)"""
+        path = os.path.join(self.root, _check_id(thread_id, "thread_id"))
+        await asyncio.to_thread(shutil.rmtree, path, True)
+
+
+message_archive = MessageArchive(settings.thread_archive_dir)
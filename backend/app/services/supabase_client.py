@@ -6,6 +6,8 @@ from supabase import Client, create_client
 from app.core.config import settings
 from app.core.exceptions import (ConfigurationError, DatabaseError,
                                  ExternalServiceError)
+from app.core.metrics import track_upstream
+from app.core.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -41,10 +43,12 @@ class SupabaseClient:
                 service_name="supabase"
             )
 
+    @traced("supabase.check_beta_user", kind="client")
     async def check_beta_user(self, email: str) -> bool:
         """Check if email is in beta list - uses admin client for security"""
         try:
-            result = self.admin_client.table("beta_emails").select("email").eq("email", email).execute()
+            with track_upstream("supabase", "beta_emails.select"):
+                result = self.admin_client.table("beta_emails").select("email").eq("email", email).execute()
             is_beta = len(result.data) > 0
             logger.info(f"Beta check for {email}: {is_beta}")
             return is_beta
@@ -57,11 +61,13 @@ class SupabaseClient:
                 context={"email": email}
             )
 
+    @traced("supabase.get_user_status", kind="client")
     async def get_user_status(self, email: str) -> dict:
         """Get detailed user status including verification state"""
         try:
             # Use admin client to list users
-            response = self.admin_client.auth.admin.list_users()
+            with track_upstream("supabase", "auth.admin.list_users"):
+                response = self.admin_client.auth.admin.list_users()
             
             # Handle different possible response structures
             users_list = None
@@ -93,6 +99,7 @@ class SupabaseClient:
         user_status = await self.get_user_status(email)
         return user_status["exists"]
 
+    @traced("supabase.collect_beta_request", kind="client")
     async def collect_beta_request(self, email: str, user_agent: Optional[str] = None, ip_address: Optional[str] = None) -> bool:
         """Store email for future beta access - uses admin client to bypass RLS"""
         try:
@@ -101,7 +108,8 @@ class SupabaseClient:
                 "user_agent": user_agent,
                 "ip_address": ip_address
             }
-            self.admin_client.table("beta_requests").insert(data).execute()
+            with track_upstream("supabase", "beta_requests.insert"):
+                self.admin_client.table("beta_requests").insert(data).execute()
             logger.info(f"Collected beta request for {email}")
             return True
         except Exception as e:
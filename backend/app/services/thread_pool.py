@@ -0,0 +1,217 @@
+"""
+Warm pool of pre-created LangGraph threads.
+
+Creating a thread costs a full upstream round-trip before the UI can send its
+first message. When enabled (THREAD_POOL_SIZE > 0) the pool keeps a few
+unassigned threads ready; create_thread claims one and only patches its
+metadata. A background task tops the pool back up after every claim.
+
+Pool threads are marked `warm_pool=unassigned` upstream and hidden from the
+admin views, so any that leak would stay forever: a hard-killed worker never
+deletes its pool, and a claim whose metadata patch failed leaves the thread
+unassigned. Each worker therefore retires its own pool threads once they are
+THREAD_POOL_TTL seconds old, and periodically deletes unassigned threads
+upstream that are older than twice that, which no live pool still holds.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Metadata marker for threads that belong to the pool and have no owner yet
+POOL_METADATA_KEY = "warm_pool"
+POOL_UNASSIGNED = "unassigned"
+POOL_CLAIMED = "claimed"
+
+REFILL_RETRY_DELAY = 5.0
+# Seconds between checks for expired pool threads (at most the TTL)
+REAP_INTERVAL = 300.0
+# Orphaned threads deleted per reaper pass
+REAP_BATCH = 100
+
+
+class WarmThreadPool:
+    def __init__(self, size: int, ttl: float = 3600.0):
+        self.size = size
+        self.ttl = ttl
+        # (thread_id, monotonic creation time), oldest first
+        self._available: Deque[Tuple[str, float]] = deque()
+        self._refill_needed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._client = None
+        self._deficit_since: Optional[float] = None
+
+        self._claims = metrics.counter(
+            "thread_pool_claims_total", "New-thread requests by pool result", ["result"]
+        )
+        self._available_gauge = metrics.gauge(
+            "thread_pool_available", "Pre-created threads ready to be claimed"
+        )
+        self._refill_lag = metrics.gauge(
+            "thread_pool_refill_lag_seconds", "Time the last refill took to bring the pool back to full"
+        )
+        self._refill_errors = metrics.counter(
+            "thread_pool_refill_errors_total", "Failed attempts to pre-create a thread"
+        )
+        self._reaped = metrics.counter(
+            "thread_pool_reaped_total", "Unclaimed pool threads deleted, by reason", ["reason"]
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    @property
+    def available(self) -> int:
+        return len(self._available)
+
+    async def start(self) -> None:
+        """Start the background refill task (no-op when the pool is disabled)"""
+        if not self.enabled or self._task is not None:
+            return
+
+        # Import here to avoid circular dependencies
+        from app.services.langgraph_client import LangGraphClient
+        self._client = LangGraphClient()
+
+        self._deficit_since = time.monotonic()
+        self._refill_needed.set()
+        self._task = asyncio.create_task(self._refill_loop())
+        self._reaper = asyncio.create_task(self._reap_loop())
+        logger.info("Warm thread pool started", extra={"size": self.size, "ttl": self.ttl})
+
+    async def stop(self) -> None:
+        """Stop refilling and delete threads that were never claimed"""
+        if self._task is None:
+            return
+
+        for task in (self._task, self._reaper):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._reaper = None
+
+        while self._available:
+            thread_id, _ = self._available.popleft()
+            try:
+                await self._client.delete_thread(thread_id)
+            except Exception as e:
+                logger.warning(f"Failed to delete unclaimed pool thread {thread_id}: {e}")
+        self._available_gauge.set(0)
+
+    def claim(self) -> Optional[str]:
+        """Take a pre-created thread id, or None if the pool is empty or disabled"""
+        if not self.enabled:
+            return None
+
+        if not self._available:
+            self._claims.inc(result="miss")
+            self._request_refill()
+            return None
+
+        thread_id, _ = self._available.popleft()
+        self._claims.inc(result="hit")
+        self._available_gauge.set(len(self._available))
+        self._request_refill()
+        return thread_id
+
+    def _request_refill(self) -> None:
+        if self._deficit_since is None:
+            self._deficit_since = time.monotonic()
+        self._refill_needed.set()
+
+    async def _refill_loop(self) -> None:
+        while True:
+            await self._refill_needed.wait()
+            self._refill_needed.clear()
+
+            while len(self._available) < self.size:
+                try:
+                    thread_id = await self._client.create_unassigned_thread()
+                except Exception as e:
+                    self._refill_errors.inc()
+                    logger.warning(f"Failed to pre-create pool thread: {e}")
+                    await asyncio.sleep(REFILL_RETRY_DELAY)
+                    continue
+
+                self._available.append((thread_id, time.monotonic()))
+                self._available_gauge.set(len(self._available))
+
+            if self._deficit_since is not None:
+                self._refill_lag.set(time.monotonic() - self._deficit_since)
+                self._deficit_since = None
+
+
+    async def _reap_loop(self) -> None:
+        while True:
+            try:
+                await self.retire_expired()
+                await self.reap_orphans()
+            except Exception as e:
+                logger.warning(f"Failed to reap pool threads: {e}")
+            await asyncio.sleep(min(REAP_INTERVAL, self.ttl))
+
+    async def retire_expired(self) -> int:
+        """Delete this pool's threads older than the TTL and refill; returns how many"""
+        cutoff = time.monotonic() - self.ttl
+        retired = 0
+        while self._available and self._available[0][1] < cutoff:
+            thread_id, _ = self._available.popleft()
+            await self._delete(thread_id, "expired")
+            retired += 1
+        if retired:
+            self._available_gauge.set(len(self._available))
+            self._request_refill()
+        return retired
+
+    async def reap_orphans(self) -> int:
+        """Delete unassigned threads upstream that no live pool can hold; returns how many"""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=2 * self.ttl)
+        threads = await self._client.search_threads(
+            limit=REAP_BATCH,
+            metadata_filter={POOL_METADATA_KEY: POOL_UNASSIGNED},
+            select=["thread_id", "created_at"],
+            sort_by="created_at",
+            sort_order="asc"
+        )
+        own = {thread_id for thread_id, _ in self._available}
+        reaped = 0
+        for thread in threads:
+            thread_id = thread.get("thread_id")
+            try:
+                created_at = datetime.fromisoformat(str(thread["created_at"]).replace("Z", "+00:00"))
+            except (KeyError, ValueError):
+                continue
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            if not thread_id or thread_id in own or created_at >= cutoff:
+                continue
+            await self._delete(thread_id, "orphaned")
+            reaped += 1
+        if reaped:
+            logger.info("Deleted orphaned pool threads", extra={"count": reaped})
+        return reaped
+
+    async def _delete(self, thread_id: str, reason: str) -> None:
+        try:
+            await self._client.delete_thread(thread_id)
+        except Exception as e:
+            # Usually another worker's reaper got there first
+            logger.info(f"Failed to delete {reason} pool thread {thread_id}: {e}")
+            return
+        self._reaped.inc(reason=reason)
+
+
+# Process-wide pool, started from the application lifespan
+warm_thread_pool = WarmThreadPool(size=settings.thread_pool_size, ttl=settings.thread_pool_ttl)
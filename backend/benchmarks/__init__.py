@@ -0,0 +1,5 @@
+"""
+Benchmarks for the Assistant UI LangGraph Backend.
+
+Run from the backend directory, e.g. `python -m benchmarks.bench_logging`.
+"""
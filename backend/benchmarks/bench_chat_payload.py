@@ -0,0 +1,95 @@
+"""
+Stream request payload benchmark (before/after).
+
+Parses a chat request body the old way (json.loads, FastAPI validation of
+List[Dict[str, Any]], then _convert_messages rebuilding every message) and
+the new way (parse_send_message in one pass). The "+encode"
+rows include serializing the LangGraph run input as the SDK does (orjson).
+
+Usage:
+    python -m benchmarks.bench_chat_payload [--messages 500] [--rounds 5]
+"""
+
+import argparse
+import json
+from typing import Any, Dict, List
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+
+from app.models.chat import parse_send_message
+from benchmarks.harness import Case, measure
+
+
+class _LegacySendMessageRequest(BaseModel):
+    messages: List[Dict[str, Any]]
+
+
+def _legacy_convert(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    converted = []
+    for msg in messages:
+        converted.append({"role": msg.get("role", "user"), "content": msg.get("content", "")})
+    return converted
+
+
+def _body(count: int) -> bytes:
+    messages = []
+    for i in range(count):
+        if i % 2 == 0:
+            messages.append({
+                "id": f"msg-{i}",
+                "role": "user",
+                "content": "How do I configure the streaming endpoint for production? " * 3,
+                "createdAt": "2025-01-01T12:00:00.000Z",
+            })
+        else:
+            messages.append({
+                "id": f"msg-{i}",
+                "role": "assistant",
+                "content": [{"type": "text", "text": "Set the stream mode and relay events as SSE frames. " * 6}],
+                "createdAt": "2025-01-01T12:00:01.000Z",
+            })
+    return json.dumps({"messages": messages}).encode()
+
+
+def build_pairs(count: int) -> List["tuple[str, Case, Case]"]:
+    body = _body(count)
+    legacy = TypeAdapter(_LegacySendMessageRequest)
+
+    def before_parse():
+        request = legacy.validate_python(json.loads(body))
+        return _legacy_convert(request.messages)
+
+    def after_parse():
+        return parse_send_message(body)["messages"]
+
+    def before_encode():
+        return orjson.dumps({"messages": before_parse()})
+
+    def after_encode():
+        return orjson.dumps({"messages": after_parse()})
+
+    return [
+        (f"parse[{count} msgs]", Case("before", before_parse), Case("after", after_parse)),
+        (f"parse+encode[{count} msgs]", Case("before", before_encode), Case("after", after_encode)),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"{'case':<28} {'before':>12} {'after':>12} {'speedup':>9}")
+    for name, before, after in build_pairs(args.messages):
+        before_time = measure(before, rounds=args.rounds)["median"]
+        after_time = measure(after, rounds=args.rounds)["median"]
+        print(
+            f"{name:<28} {before_time * 1e6:>10.1f}us {after_time * 1e6:>10.1f}us "
+            f"{before_time / after_time:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
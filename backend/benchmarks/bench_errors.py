@@ -0,0 +1,265 @@
+"""
+Error-storm benchmark (before/after).
+
+Compares each exception handler, logging included, against the previous
+implementation (uuid4 + utcnow per exception, an ErrorResponse model built
+and dumped for every response, a full traceback formatted for every
+unhandled error),
+then drives a burst of failing requests through the whole ASGI app,
+middleware included, and reports errors per second.
+
+Usage:
+    python -m benchmarks.bench_errors [--requests 5000] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import traceback
+import uuid
+from datetime import datetime
+from typing import List
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+
+from app.core.exceptions import (ExternalServiceError, InternalServerError,
+                                 ResourceNotFoundError)
+from app.core.serialization import FastJSONResponse
+from app.models.error import ErrorDetail, ErrorResponse
+from benchmarks.bench_hot_paths import _request, _silence_app_logging
+from benchmarks.harness import Case, measure
+
+
+logger = logging.getLogger("app.main")
+
+
+class _LegacyExternalServiceError(ExternalServiceError):
+    # Correlation id and timestamp were formatted in every constructor
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.correlation_id = str(uuid.uuid4())
+        self._timestamp = datetime.utcnow().isoformat()
+
+
+class _LegacyResourceNotFoundError(ResourceNotFoundError):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.correlation_id = str(uuid.uuid4())
+        self._timestamp = datetime.utcnow().isoformat()
+
+
+async def _legacy_app_handler(request, exc):
+    logger.error(
+        f"Application exception occurred: {exc.error_code}",
+        extra={
+            "correlation_id": exc.correlation_id,
+            "path": str(request.url),
+            "method": request.method,
+            "status_code": exc.status_code,
+            "error_code": exc.error_code,
+            "context": exc.context
+        }
+    )
+    error_response = ErrorResponse(
+        error=exc.error_code,
+        message=exc.message,
+        correlation_id=exc.correlation_id,
+        timestamp=exc.timestamp,
+        status_code=exc.status_code,
+        details=exc.context
+    )
+    return FastJSONResponse(status_code=exc.status_code, content=error_response.model_dump())
+
+
+async def _legacy_http_handler(request, exc):
+    correlation_id = str(uuid.uuid4())
+    logger.warning(
+        f"HTTP exception occurred",
+        extra={
+            "correlation_id": correlation_id,
+            "path": str(request.url),
+            "method": request.method,
+            "status_code": exc.status_code,
+            "detail": str(exc.detail)
+        }
+    )
+    error_response = ErrorResponse(
+        error="HTTP_ERROR",
+        message=str(exc.detail),
+        correlation_id=correlation_id,
+        timestamp=datetime.utcnow().isoformat(),
+        status_code=exc.status_code
+    )
+    return FastJSONResponse(status_code=exc.status_code, content=error_response.model_dump())
+
+
+async def _legacy_validation_handler(request, exc):
+    validation_errors = [
+        ErrorDetail(
+            field=" -> ".join(str(loc) for loc in error["loc"]) if error["loc"] else None,
+            message=error["msg"],
+            code=error["type"]
+        )
+        for error in exc.errors()
+    ]
+    correlation_id = str(uuid.uuid4())
+    logger.warning(
+        f"Validation error occurred",
+        extra={
+            "correlation_id": correlation_id,
+            "path": str(request.url),
+            "method": request.method,
+            "validation_errors": [
+                {"field": err.field, "message": err.message, "code": err.code}
+                for err in validation_errors
+            ]
+        }
+    )
+    error_response = ErrorResponse(
+        error="VALIDATION_ERROR",
+        message="Request validation failed",
+        correlation_id=correlation_id,
+        timestamp=datetime.utcnow().isoformat(),
+        status_code=422,
+        validation_errors=validation_errors
+    )
+    return FastJSONResponse(status_code=422, content=error_response.model_dump())
+
+
+async def _legacy_general_handler(request, exc):
+    correlation_id = str(uuid.uuid4())
+    logger.error(
+        f"Unhandled exception occurred: {type(exc).__name__}",
+        extra={
+            "correlation_id": correlation_id,
+            "path": str(request.url),
+            "method": request.method,
+            "exception_type": type(exc).__name__,
+            "traceback": traceback.format_exc()
+        }
+    )
+    internal_error = InternalServerError(message="An unexpected error occurred", correlation_id=correlation_id)
+    error_response = ErrorResponse(
+        error=internal_error.error_code,
+        message=internal_error.message,
+        correlation_id=internal_error.correlation_id,
+        timestamp=internal_error.timestamp,
+        status_code=internal_error.status_code
+    )
+    return FastJSONResponse(status_code=500, content=error_response.model_dump())
+
+
+def _fail(depth: int = 8) -> None:
+    if depth:
+        _fail(depth - 1)
+    raise ConnectionError("upstream connection reset")
+
+
+def _unhandled(handler):
+    async def run():
+        try:
+            _fail()
+        except Exception as exc:
+            return await handler(request, exc)
+    return run
+
+
+request = _request("/api/threads/3f2b1c9e/state", method="GET")
+
+
+def build_pairs() -> List["tuple[str, Case, Case]"]:
+    from app.main import (custom_exception_handler, general_exception_handler,
+                          http_exception_handler, validation_exception_handler)
+
+    validation_error = RequestValidationError([
+        {"type": "missing", "loc": ("body", "messages"), "msg": "Field required", "input": {}},
+    ])
+
+    def app_case(handler, error_class):
+        return lambda: handler(request, error_class("Failed to get thread state", service_name="langgraph"))
+
+    return [
+        (
+            "errors.app_exception",
+            Case("before", app_case(_legacy_app_handler, _LegacyExternalServiceError), is_async=True),
+            Case("after", app_case(custom_exception_handler, ExternalServiceError), is_async=True),
+        ),
+        (
+            "errors.app_exception[no context]",
+            Case("before", lambda: _legacy_app_handler(request, _LegacyResourceNotFoundError("Thread not found")), is_async=True),
+            Case("after", lambda: custom_exception_handler(request, ResourceNotFoundError("Thread not found")), is_async=True),
+        ),
+        (
+            "errors.http_exception[503]",
+            Case("before", lambda: _legacy_http_handler(request, HTTPException(503, "Service Unavailable")), is_async=True),
+            Case("after", lambda: http_exception_handler(request, HTTPException(503, "Service Unavailable")), is_async=True),
+        ),
+        (
+            "errors.validation",
+            Case("before", lambda: _legacy_validation_handler(request, validation_error), is_async=True),
+            Case("after", lambda: validation_exception_handler(request, validation_error), is_async=True),
+        ),
+        (
+            "errors.unhandled",
+            Case("before", _unhandled(_legacy_general_handler), is_async=True),
+            Case("after", _unhandled(general_exception_handler), is_async=True),
+        ),
+    ]
+
+
+async def _storm(requests: int) -> float:
+    """Send `requests` failing requests through the full app; return errors per second"""
+    from app.main import app
+
+    async def fail():
+        _fail()
+
+    app.add_api_route("/__bench/fail", fail, methods=["GET"])
+    scope = dict(request.scope, path="/__bench/fail", raw_path=b"/__bench/fail")
+    scope["headers"] = [(k, v) for k, v in scope["headers"] if k != b"authorization"]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    statuses = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        try:
+            await app(dict(scope), receive, send)
+        except ConnectionError:
+            # Starlette re-raises to the server once the 500 has been sent
+            pass
+    elapsed = time.perf_counter() - start
+    assert set(statuses) == {500}, set(statuses)
+    return requests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="Failing requests in the full-app storm")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    _silence_app_logging()
+    print(f"{'case':<36} {'before':>12} {'after':>12} {'speedup':>9}")
+    for name, before, after in build_pairs():
+        before_time = measure(before, rounds=args.rounds)["median"]
+        after_time = measure(after, rounds=args.rounds)["median"]
+        print(
+            f"{name:<36} {before_time * 1e6:>10.1f}us {after_time * 1e6:>10.1f}us "
+            f"{before_time / after_time:>8.1f}x"
+        )
+
+    rate = asyncio.run(_storm(args.requests))
+    print(f"\nfull app, {args.requests} unhandled errors: {rate:,.0f} errors/s")
+
+
+if __name__ == "__main__":
+    main()
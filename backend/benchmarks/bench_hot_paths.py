@@ -0,0 +1,191 @@
+"""
+Microbenchmarks for per-request CPU hot paths.
+
+Cases:
+- auth.verify_jwt_token           JWT decode/verify + SupabaseAuthUser
+- middleware.is_suspicious_request SecurityLoggingMiddleware pattern scan
+- admin.convert_threads[N msgs]    AdminService thread conversion (20 threads)
+- sse.frame                        SSE frame serialization of a token event
+- errors.*                         exception handler response path
+
+Results are compared against benchmarks/baselines/hot_paths.json; the run
+exits with status 1 when a case is slower than its baseline by more than
+--tolerance. Baselines are machine-specific: record them with --save on the
+machine that runs the comparison.
+
+Usage:
+    python -m benchmarks.bench_hot_paths [--save] [--tolerance 0.25] [--only admin]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import jwt
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import config
+from app.core.config import settings
+from benchmarks.harness import (Case, load_baseline, run_cases,
+                                save_baseline)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "hot_paths.json")
+
+THREADS = 20
+MESSAGE_COUNTS = (1, 10, 100)
+
+
+def _silence_app_logging() -> None:
+    # Keep the logging calls (their cost is part of the hot path) but send
+    # the listener output nowhere instead of flooding the terminal
+    if config._log_listener is not None:
+        devnull = open(os.devnull, "w")
+        for handler in config._log_listener.handlers:
+            if hasattr(handler, "setStream"):
+                handler.setStream(devnull)
+
+
+def _request(path: str = "/api/threads/3f2b1c9e/stream", method: str = "POST") -> Request:
+    headers = {
+        "host": "api.example.com",
+        "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4) AppleWebKit/605.1.15 Safari/605.1.15",
+        "accept": "text/event-stream",
+        "accept-language": "en-US,en;q=0.9",
+        "authorization": "Bearer " + "x" * 600,
+        "content-type": "application/json",
+        "origin": "https://app.example.com",
+        "referer": "https://app.example.com/chat",
+        "x-forwarded-for": "203.0.113.7",
+    }
+    scope = {
+        "type": "http",
+        "method": method,
+        "scheme": "https",
+        "server": ("api.example.com", 443),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+        "client": ("203.0.113.7", 51234),
+    }
+    return Request(scope)
+
+
+def _thread(index: int, messages: int) -> Dict[str, Any]:
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=index)
+    return {
+        "thread_id": f"thread-{index}",
+        "created_at": created.isoformat().replace("+00:00", "Z"),
+        "updated_at": (created + timedelta(hours=1)).isoformat().replace("+00:00", "Z"),
+        "status": "idle",
+        "metadata": {"user_id": f"user-{index}", "user_email": f"user-{index}@example.com"},
+        "values": {
+            "messages": [
+                {
+                    "type": "human" if i % 2 == 0 else "ai",
+                    "id": f"msg-{index}-{i}",
+                    "content": "How do I configure the streaming endpoint for production? " * 4,
+                }
+                for i in range(messages)
+            ]
+        },
+    }
+
+
+class _FakeLangGraphClient:
+    def __init__(self, threads: List[Dict[str, Any]]):
+        self.threads = threads
+
+    async def search_threads(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return self.threads
+
+
+def build_cases() -> List[Case]:
+    from app.api.langgraph import sse_frame
+    from app.core.exceptions import ResourceNotFoundError
+    from app.core.middleware import SecurityLoggingMiddleware
+    from app.core.security import verify_jwt_token
+    from app.main import custom_exception_handler, http_exception_handler
+    from app.services.admin_service import AdminService
+
+    cases: List[Case] = []
+
+    token = jwt.encode(
+        {
+            "sub": "7d3c7a52-9d1e-4a7e-9f0c-2b7e3f1d9a11",
+            "email": "user@example.com",
+            "aud": "authenticated",
+            "iss": settings.supabase_jwt_issuer,
+            "exp": int(time.time()) + 86400,
+            "role": "authenticated",
+            "user_role": "user",
+            "app_metadata": {"provider": "email", "providers": ["email"]},
+            "user_metadata": {"email_verified": True},
+        },
+        settings.supabase_jwt_secret,
+        algorithm="HS256"
+    )
+    cases.append(Case("auth.verify_jwt_token", lambda: verify_jwt_token(token)))
+
+    middleware = SecurityLoggingMiddleware(app=None)
+    request = _request()
+    cases.append(Case("middleware.is_suspicious_request", lambda: middleware._is_suspicious_request(request)))
+
+    for count in MESSAGE_COUNTS:
+        service = AdminService(langgraph_client=_FakeLangGraphClient([_thread(i, count) for i in range(THREADS)]))
+        cases.append(Case(f"admin.convert_threads[{count} msgs]", service.get_all_user_threads, is_async=True))
+
+    token_event = {
+        "type": "messages",
+        "data": [
+            {"type": "AIMessageChunk", "id": "run-5b1f2c", "content": "Hello", "additional_kwargs": {}},
+            {"run_id": "5b1f2c", "langgraph_node": "agent", "langgraph_step": 1},
+        ],
+    }
+    cases.append(Case("sse.frame", lambda: sse_frame(token_event)))
+
+    error_request = _request("/api/admin/threads/missing", method="GET")
+    cases.append(Case(
+        "errors.app_exception",
+        lambda: custom_exception_handler(
+            error_request, ResourceNotFoundError("Thread not found", resource_type="thread", resource_id="missing")
+        ),
+        is_async=True
+    ))
+    cases.append(Case(
+        "errors.http_exception",
+        lambda: http_exception_handler(error_request, HTTPException(status_code=404, detail="Not found")),
+        is_async=True
+    ))
+
+    return cases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--only", help="Run only cases whose name contains this string")
+    args = parser.parse_args()
+
+    _silence_app_logging()
+    baseline = {} if args.save else load_baseline(args.baseline)
+    results, regressions = run_cases(build_cases(), baseline, args.tolerance, args.rounds, args.only)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline written to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
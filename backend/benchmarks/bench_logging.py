@@ -0,0 +1,101 @@
+"""
+Logging throughput benchmark.
+
+Compares the time the *calling* thread spends in logger.info() for:
+- a synchronous StreamHandler writing straight to the stream (old setup)
+- the queued pipeline (DroppingQueueHandler + QueueListener + JsonFormatter)
+
+The target stream can be slowed down to simulate stdout backpressure.
+
+Usage:
+    python -m benchmarks.bench_logging [--records 20000] [--write-delay-us 20]
+"""
+
+import argparse
+import io
+import logging
+import time
+
+from app.core.log_handlers import (JsonFormatter, start_queue_logging,
+                                   stop_queue_logging)
+
+
+class SlowStream(io.StringIO):
+    """In-memory stream whose writes take a fixed amount of time"""
+
+    def __init__(self, write_delay: float):
+        super().__init__()
+        self.write_delay = write_delay
+
+    def write(self, s: str) -> int:
+        if self.write_delay:
+            time.sleep(self.write_delay)
+        return super().write(s)
+
+
+def _make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers[:] = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def _log_records(logger: logging.Logger, records: int) -> float:
+    """Emit `records` request-style log lines; return seconds spent in the caller"""
+    start = time.perf_counter()
+    for i in range(records):
+        logger.info(
+            "Request processed",
+            extra={
+                "path": "/api/threads/abc/stream",
+                "method": "POST",
+                "status_code": 200,
+                "processing_time": 0.012,
+                "client_ip": "127.0.0.1",
+                "request_number": i,
+            }
+        )
+    return time.perf_counter() - start
+
+
+def bench_sync(records: int, write_delay: float) -> float:
+    handler = logging.StreamHandler(SlowStream(write_delay))
+    handler.setFormatter(JsonFormatter())
+    return _log_records(_make_logger("bench.sync", handler), records)
+
+
+def bench_queued(records: int, write_delay: float, queue_size: int) -> "tuple[float, float, int]":
+    handler = logging.StreamHandler(SlowStream(write_delay))
+    handler.setFormatter(JsonFormatter())
+    queue_handler, listener = start_queue_logging([handler], max_queue_size=queue_size)
+    try:
+        caller_time = _log_records(_make_logger("bench.queued", queue_handler), records)
+        drain_start = time.perf_counter()
+    finally:
+        stop_queue_logging(listener)
+    return caller_time, time.perf_counter() - drain_start, queue_handler.dropped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--write-delay-us", type=float, default=20.0, help="Simulated cost of each stream write")
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    write_delay = args.write_delay_us / 1_000_000
+
+    sync_time = bench_sync(args.records, write_delay)
+    queued_time, drain_time, dropped = bench_queued(args.records, write_delay, args.queue_size)
+
+    print(f"records:            {args.records}")
+    print(f"write delay:        {args.write_delay_us:.1f} us")
+    print(f"sync handler:       {args.records / sync_time:>12,.0f} records/s in caller ({sync_time:.3f}s)")
+    print(f"queued handler:     {args.records / queued_time:>12,.0f} records/s in caller ({queued_time:.3f}s)")
+    print(f"queued drain:       {drain_time:.3f}s after last call")
+    print(f"dropped (queue full): {dropped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Response and stream-frame serialization benchmark (before/after).
+
+Compares, on the same data:
+- admin threads: FastAPI's response_model path (dump, re-validate,
+  serialize, stdlib json.dumps) vs model_response (pydantic-core to bytes)
+- chat streams: f"data: {json.dumps(event)}" frames encoded by the ASGI
+  server vs sse_frame() bytes from orjson
+- error bodies: JSONResponse vs FastJSONResponse rendering
+
+Usage:
+    python -m benchmarks.bench_serialization [--threads 20] [--messages 100] [--rounds 5]
+"""
+
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.langgraph import sse_frame
+from app.core.serialization import FastJSONResponse, model_response
+from app.models.admin import MessageResponse, Thread
+from benchmarks.harness import Case, measure
+
+
+def _threads(count: int, messages: int) -> List[Thread]:
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        Thread(
+            id=f"thread-{i}",
+            title="How do I configure the streaming endpoint for production?",
+            message_count=messages,
+            last_updated=created + timedelta(hours=i),
+            created_at=created,
+            user_email=f"user-{i}@example.com",
+            user_id=f"user-{i}",
+            status="idle",
+            messages=[
+                MessageResponse(
+                    id=f"msg-{i}-{j}",
+                    content="How do I configure the streaming endpoint for production? " * 4,
+                    role="user" if j % 2 == 0 else "assistant"
+                )
+                for j in range(messages)
+            ],
+            raw_metadata={"user_id": f"user-{i}", "user_email": f"user-{i}@example.com", "tags": ["beta"]}
+        )
+        for i in range(count)
+    ]
+
+
+def _legacy_sse_frame(event) -> bytes:
+    # Old frame: stdlib string, encoded to bytes by the response/server
+    return f"data: {json.dumps(event)}\n\n".encode()
+
+
+def build_pairs(threads: int, messages: int) -> List["tuple[str, Case, Case]"]:
+    data = _threads(threads, messages)
+    field = create_response_field(name="Response_list_all_threads", type_=List[Thread], mode="serialization")
+
+    async def fastapi_threads():
+        content = await serialize_response(field=field, response_content=data)
+        return JSONResponse(content=content).body
+
+    def fast_threads():
+        return model_response(List[Thread], data).body
+
+    token_event = {
+        "type": "messages",
+        "data": [
+            {"type": "AIMessageChunk", "id": "run-5b1f2c", "content": "Hello", "additional_kwargs": {}},
+            {"run_id": "5b1f2c", "langgraph_node": "call_model", "langgraph_step": 2},
+        ],
+    }
+    stream = [token_event] * 200
+
+    error_body = {
+        "success": False,
+        "error": "EXTERNAL_SERVICE_ERROR",
+        "message": "Failed to search threads",
+        "correlation_id": "550e8400-e29b-41d4-a716-446655440000",
+        "timestamp": "2025-01-01T12:00:00",
+        "status_code": 502,
+        "details": {"service": "langgraph", "limit": 50},
+    }
+
+    return [
+        (
+            f"admin.threads_response[{threads}x{messages}]",
+            Case("before", fastapi_threads, is_async=True),
+            Case("after", fast_threads),
+        ),
+        (
+            "stream.frames[200 tokens]",
+            Case("before", lambda: [_legacy_sse_frame(e) for e in stream]),
+            Case("after", lambda: [sse_frame(e) for e in stream]),
+        ),
+        (
+            "errors.json_body",
+            Case("before", lambda: JSONResponse(content=error_body, status_code=502).body),
+            Case("after", lambda: FastJSONResponse(content=error_body, status_code=502).body),
+        ),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<36} {'before':>12} {'after':>12} {'speedup':>9}")
+    for name, before, after in build_pairs(args.threads, args.messages):
+        before_time = measure(before, rounds=args.rounds)["median"]
+        after_time = measure(after, rounds=args.rounds)["median"]
+        print(
+            f"{name:<36} {before_time * 1e6:>10.1f}us {after_time * 1e6:>10.1f}us "
+            f"{before_time / after_time:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
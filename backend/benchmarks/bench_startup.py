@@ -0,0 +1,154 @@
+"""
+Cold-start benchmark: `import app.main` in fresh interpreters.
+
+Reports the median wall time of the import over --runs new processes and
+a per-module breakdown from one `python -X importtime` run: import cost
+(self time) summed per top-level package, and the slowest single
+modules.
+
+Import times depend on the machine, so there is no stored baseline. The
+same run also times `import fastapi` (the framework floor every worker
+pays) and reports app.main as a multiple of it, which stays comparable
+across machines.
+
+Exits with status 1 when
+- a module from app.core.startup.LAZY_MODULES was imported by app.main
+- the median is more than --max-ratio (default MAX_IMPORT_RATIO) times the
+  `import fastapi` median
+- the median is above --budget seconds, when one is given
+
+tests/test_startup.py runs the same checks in the backend test suite.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 7] [--budget 1.0] [--max-ratio 3.0] [--top 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from app.core.startup import LAZY_MODULES
+
+REFERENCE = "fastapi"
+# app.main may cost at most this multiple of the framework import
+MAX_IMPORT_RATIO = 2.5
+
+_PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import app.main\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print('STARTUP', elapsed, ','.join(m for m in {lazy!r} if m in sys.modules))\n"
+)
+
+_REFERENCE_PROBE = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def _env() -> Dict[str, str]:
+    return dict(os.environ, LOG_LEVEL="WARNING")
+
+
+def cold_import() -> Tuple[float, List[str]]:
+    """Import app.main in a new interpreter; return (seconds, lazy modules it imported)"""
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(lazy=LAZY_MODULES)],
+        capture_output=True, text=True, check=True, env=_env()
+    ).stdout
+    line = next(line for line in output.splitlines() if line.startswith("STARTUP "))
+    _, seconds, *loaded = line.split(" ")
+    return float(seconds), [m for m in ",".join(loaded).split(",") if m]
+
+
+def cold_reference_import() -> float:
+    """Import the REFERENCE module in a new interpreter; return seconds"""
+    output = subprocess.run(
+        [sys.executable, "-c", _REFERENCE_PROBE.format(module=REFERENCE)],
+        capture_output=True, text=True, check=True, env=_env()
+    ).stdout
+    return float(output.split()[-1])
+
+
+def import_profile() -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) for every module imported by app.main"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True, env=_env()
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def print_profile(rows: List[Tuple[str, int, int]], top: int) -> None:
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    total = sum(by_package.values())
+
+    print(f"\n{'package':<32} {'import ms':>10} {'share':>7}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<32} {self_us / 1000:>10.1f} {self_us / total:>6.0%}")
+
+    print(f"\n{'module':<48} {'self ms':>8} {'cumul ms':>9}")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[1])[:top]:
+        print(f"{name:<48} {self_us / 1000:>8.1f} {cumulative_us / 1000:>9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, help="Fail when the median import takes longer (seconds)")
+    parser.add_argument(
+        "--max-ratio", type=float, default=MAX_IMPORT_RATIO,
+        help=f"Fail when the median is more than this multiple of `import {REFERENCE}`"
+    )
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=15, help="Rows in each breakdown table")
+    args = parser.parse_args()
+
+    timings = []
+    reference_timings = []
+    eager = set()
+    for _ in range(args.runs):
+        seconds, loaded = cold_import()
+        timings.append(seconds)
+        eager.update(loaded)
+        reference_timings.append(cold_reference_import())
+    median = statistics.median(timings)
+    reference = statistics.median(reference_timings)
+    ratio = median / reference
+
+    print_profile(import_profile(), args.top)
+
+    print(
+        f"\nimport app.main: median {median * 1000:.0f} ms, min {min(timings) * 1000:.0f} ms over {args.runs} runs"
+        f" ({ratio:.1f}x import {REFERENCE} at {reference * 1000:.0f} ms)"
+    )
+
+    failures = []
+    if eager:
+        failures.append(f"deferred modules imported eagerly: {', '.join(sorted(eager))}")
+    if args.budget is not None and median > args.budget:
+        failures.append(f"over the {args.budget:.2f}s budget")
+    if ratio > args.max_ratio:
+        failures.append(f"more than {args.max_ratio:.1f}x import {REFERENCE}")
+
+    if failures:
+        print("\nFAILED: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Throughput scaling with server workers, on the load-test harness.
+
+Runs `python -m loadtest` once per worker count against the local
+stand-ins and reports the successful requests per second of the scenario
+(summed over its operations), p99 latency of its busiest operation and
+speedup over the first worker count. The stand-ins and the load
+generator share one process, so on small machines they become the
+bottleneck before the backend does; run with more users than workers and
+on a machine with at least workers + 1 cores.
+
+Usage:
+    python -m benchmarks.bench_workers [--workers 1 2 4] [--scenario signup]
+                                       [--users 64] [--iterations 20]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict
+
+
+def run_loadtest(workers: int, args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "results.json")
+        subprocess.run(
+            [
+                sys.executable, "-m", "loadtest",
+                "--scenario", args.scenario,
+                "--users", str(args.users),
+                "--iterations", str(args.iterations),
+                "--upstream-latency", str(args.upstream_latency),
+                "--first-token-latency", "0",
+                "--tokens-per-second", "0",
+                "--workers", str(workers),
+                "--json", output,
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL
+        )
+        with open(output, encoding="utf-8") as f:
+            return json.load(f)[-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--scenario", choices=["signup", "chat", "admin"], default="signup")
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--upstream-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f"cpus: {os.cpu_count()}, scenario: {args.scenario}, users: {args.users}")
+    print(f"{'workers':>7} {'rps':>10} {'errors':>7} {'p99 ms':>9} {'speedup':>9}")
+    first_rps = None
+    for workers in args.workers:
+        result = run_loadtest(workers, args)
+        operations = result["operations"]
+        rps = sum(op["throughput_rps"] for op in operations.values())
+        errors = sum(op["errors"] for op in operations.values())
+        busiest = max(operations.values(), key=lambda op: op["requests"])
+        first_rps = first_rps or rps
+        print(f"{workers:>7} {rps:>10.1f} {errors:>7} {busiest['p99_ms'] or 0:>9.1f} {rps / first_rps:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
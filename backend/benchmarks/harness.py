@@ -0,0 +1,118 @@
+"""
+Minimal microbenchmark harness with stored baselines.
+
+Each case is timed in several rounds; the number of calls per round is
+calibrated so a round takes at least `min_round_time`. The reported figure
+is the median time per call across rounds, which is stable enough to
+compare against a baseline recorded on the same machine.
+
+Baselines are JSON files mapping case name to seconds per call. A case is a
+regression when it is slower than its baseline by more than `tolerance`.
+"""
+
+import asyncio
+import json
+import platform
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Case:
+    def __init__(self, name: str, fn: Callable[[], Any], is_async: bool = False):
+        self.name = name
+        self.fn = fn
+        self.is_async = is_async
+
+
+def _time_calls(case: Case, calls: int, loop: asyncio.AbstractEventLoop) -> float:
+    if case.is_async:
+        async def run() -> float:
+            start = time.perf_counter()
+            for _ in range(calls):
+                await case.fn()
+            return time.perf_counter() - start
+        return loop.run_until_complete(run())
+
+    fn = case.fn
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(case: Case, rounds: int = 5, min_round_time: float = 0.1) -> Dict[str, float]:
+    """Return median/min seconds per call for one case"""
+    loop = asyncio.new_event_loop()
+    try:
+        # Warm up and calibrate
+        calls = 1
+        while True:
+            elapsed = _time_calls(case, calls, loop)
+            if elapsed >= min_round_time or calls >= 1_000_000:
+                break
+            calls = max(calls * 2, int(calls * min_round_time / max(elapsed, 1e-9)))
+
+        per_call = [_time_calls(case, calls, loop) / calls for _ in range(rounds)]
+    finally:
+        loop.close()
+    return {"median": statistics.median(per_call), "min": min(per_call), "calls_per_round": calls}
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["results"]
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, float]]) -> None:
+    payload = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {name: result["median"] for name, result in results.items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _format_time(seconds: float) -> str:
+    if seconds < 1e-6:
+        return f"{seconds * 1e9:.0f} ns"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.2f} us"
+    return f"{seconds * 1e3:.2f} ms"
+
+
+def run_cases(
+    cases: List[Case],
+    baseline: Dict[str, float],
+    tolerance: float,
+    rounds: int,
+    only: Optional[str] = None
+) -> "tuple[Dict[str, Dict[str, float]], List[str]]":
+    """Run and print every case; return the results and the names that regressed"""
+    results: Dict[str, Dict[str, float]] = {}
+    regressions: List[str] = []
+
+    print(f"{'case':<40} {'median':>12} {'baseline':>12} {'change':>9}")
+    for case in cases:
+        if only and only not in case.name:
+            continue
+        result = results[case.name] = measure(case, rounds=rounds)
+        previous = baseline.get(case.name)
+        if previous:
+            change = result["median"] / previous - 1
+            flag = ""
+            if change > tolerance:
+                regressions.append(case.name)
+                flag = "  REGRESSION"
+            print(
+                f"{case.name:<40} {_format_time(result['median']):>12} "
+                f"{_format_time(previous):>12} {change:>+8.1%}{flag}"
+            )
+        else:
+            print(f"{case.name:<40} {_format_time(result['median']):>12} {'-':>12} {'-':>9}")
+    return results, regressions
@@ -0,0 +1,227 @@
+"""Context-window management for the agent graph.
+
+The `trim_context` node runs before the model. It keeps the newest messages
+that fit in a token budget (leading system messages and the latest message
+are always kept) and, when summarization is enabled, folds the messages that
+fell out of the window into a running summary stored in the state. The
+full history stays in `messages`; only the model input is trimmed.
+
+Token counts are a fast approximation (about four characters per token plus
+a per-message overhead) cached per message id, so each message is measured
+once no matter how long the thread grows.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import TAG_NOSTREAM
+
+from agent.models import get_model
+from agent.routing import model_limiter
+from agent.settings import enabled, setting
+from agent.state import State
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONTEXT_TOKENS = 8000
+MESSAGE_OVERHEAD_TOKENS = 4
+CHARS_PER_TOKEN = 4
+MAX_CACHED_COUNTS = 50_000
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an "
+    "assistant. Extend the existing summary with the new messages below. Keep "
+    "facts, decisions, names and open questions; drop pleasantries. Reply with "
+    "the updated summary only."
+)
+
+_token_counts: OrderedDict[str, int] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and isinstance(block.get("text"), str):
+            parts.append(block["text"])
+    return "".join(parts)
+
+
+def _estimate(message: BaseMessage) -> int:
+    text = _text(message)
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        text += str(tool_calls)
+    return (
+        MESSAGE_OVERHEAD_TOKENS + (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    )
+
+
+def count_tokens(message: BaseMessage) -> int:
+    """Return the approximate token count of a message, cached by message id."""
+    if not message.id:
+        return _estimate(message)
+
+    # add_messages replaces a message with a new one rather than editing it,
+    # so the id alone identifies the content; anything derived from the
+    # content would cost as much as the estimate itself
+    key = message.id
+    with _lock:
+        count = _token_counts.get(key)
+        if count is not None:
+            _token_counts.move_to_end(key)
+            return count
+
+    count = _estimate(message)
+    with _lock:
+        _token_counts[key] = count
+        if len(_token_counts) > MAX_CACHED_COUNTS:
+            _token_counts.popitem(last=False)
+    return count
+
+
+def _system_count(messages: List[BaseMessage]) -> int:
+    count = 0
+    while count < len(messages) and isinstance(messages[count], SystemMessage):
+        count += 1
+    return count
+
+
+def select_context(
+    messages: List[BaseMessage], max_tokens: int
+) -> Tuple[List[BaseMessage], int]:
+    """Split messages into the window sent to the model and the older rest.
+
+    Returns the kept messages (in order) and the index of the first message
+    of the window: messages[system_count:start] are the ones left out. The
+    window never starts with an assistant or tool message.
+    """
+    system_count = _system_count(messages)
+
+    budget = max_tokens - sum(count_tokens(m) for m in messages[:system_count])
+    start = len(messages)
+    for index in range(len(messages) - 1, system_count - 1, -1):
+        cost = count_tokens(messages[index])
+        # The latest message is always sent, even over budget
+        if cost > budget and index < len(messages) - 1:
+            break
+        budget -= cost
+        start = index
+
+    # Don't open the window on an orphaned AI reply or tool result
+    while start < len(messages) - 1 and not isinstance(messages[start], HumanMessage):
+        start += 1
+
+    return messages[:system_count] + messages[start:], start
+
+
+async def _fold_into_summary(
+    summary: str, messages: List[BaseMessage], config: RunnableConfig
+) -> str:
+    transcript = "\n".join(f"{m.type}: {_text(m)}" for m in messages)
+    prompt = [
+        SystemMessage(content=SUMMARY_PROMPT),
+        HumanMessage(
+            content=f"Existing summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"
+        ),
+    ]
+    # Tagged so the summary call is not streamed to the user as a reply
+    async with model_limiter.slot():
+        response = await get_model(config).ainvoke(
+            prompt, {**config, "tags": [TAG_NOSTREAM]}
+        )
+    return _text(response)
+
+
+def _summary_message(summary: str) -> SystemMessage:
+    return SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")
+
+
+def model_input(state: State) -> List[BaseMessage]:
+    """Return the messages to send to the model for this turn.
+
+    Rebuilds the window chosen by `trim_context` (the leading system messages
+    plus `messages[context_start:]`) and, when older turns were left out
+    (trimmed here or archived by compaction), inserts the running summary
+    after the system messages. Only the start index is kept in state, so
+    checkpoints don't hold a second copy of the history, and the summary
+    message is built here so it is never streamed to the client as part of
+    a state update.
+    """
+    messages: List[BaseMessage] = list(state["messages"])
+    system_count = _system_count(messages)
+    start = max(state.get("context_start") or 0, system_count)
+    window = (
+        messages[:system_count] + messages[start:] if start > system_count else messages
+    )
+    summary: str = state.get("summary") or ""
+    if not summary or (start == system_count and not state.get("archive")):
+        return window
+    return window[:system_count] + [_summary_message(summary)] + window[system_count:]
+
+
+async def trim_context(state: State, config: RunnableConfig) -> Dict[str, Any]:
+    """Build the model input for this turn within the token budget.
+
+    Configurable (or env): `max_context_tokens` (AGENT_MAX_CONTEXT_TOKENS,
+    0 disables trimming) and `summarize_context` (AGENT_SUMMARIZE_CONTEXT).
+    """
+    messages: List[BaseMessage] = list(state["messages"])
+    max_tokens = int(
+        setting(
+            config,
+            "max_context_tokens",
+            "AGENT_MAX_CONTEXT_TOKENS",
+            DEFAULT_MAX_CONTEXT_TOKENS,
+        )
+    )
+    summarize = enabled(
+        setting(config, "summarize_context", "AGENT_SUMMARIZE_CONTEXT", False)
+    )
+    summary: str = state.get("summary") or ""
+    summarized_count: int = state.get("summarized_count") or 0
+
+    history_tokens = sum(count_tokens(m) for m in messages)
+    update: Dict[str, Any] = {}
+
+    if max_tokens <= 0 or history_tokens <= max_tokens:
+        window, start = messages, 0
+    else:
+        window, start = select_context(messages, max_tokens)
+
+        if summarize and start > summarized_count:
+            dropped = [
+                m
+                for m in messages[summarized_count:start]
+                if not isinstance(m, SystemMessage)
+            ]
+            if dropped:
+                summary = await _fold_into_summary(summary, dropped, config)
+            summarized_count = start
+            update.update({"summary": summary, "summarized_count": summarized_count})
+
+    input_tokens = sum(count_tokens(m) for m in window)
+    if summary and len(window) < len(messages):
+        input_tokens += count_tokens(_summary_message(summary))
+    stats = {
+        "history_tokens": history_tokens,
+        "input_tokens": input_tokens,
+        "tokens_saved": max(0, history_tokens - input_tokens),
+        "messages_sent": len(window),
+        "messages_total": len(messages),
+    }
+    logger.info("Context trimmed for model call", extra=stats)
+
+    update.update({"context_start": start, "context_stats": stats})
+    return update
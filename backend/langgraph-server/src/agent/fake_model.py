@@ -0,0 +1,172 @@
+"""Deterministic fake chat model for offline load tests and benchmarks.
+
+The reply depends only on the conversation (and an optional seed), so runs
+are reproducible. Tokens are streamed at a configurable rate, after a
+configurable first-token latency drawn from a constant, uniform or
+log-normal distribution.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import random
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_VOCABULARY = (
+    "the",
+    "agent",
+    "stream",
+    "token",
+    "thread",
+    "state",
+    "graph",
+    "model",
+    "reply",
+    "message",
+    "latency",
+    "budget",
+    "request",
+    "context",
+    "cache",
+    "quickly",
+    "simply",
+    "local",
+    "offline",
+    "deterministic",
+    "benchmark",
+)
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "lognormal")
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """Chat model that streams deterministic tokens without any network calls.
+
+    Attributes:
+        response_tokens: Number of tokens in every reply.
+        tokens_per_second: Streaming rate; 0 streams all tokens at once.
+        first_token_latency: Mean delay in seconds before the first token.
+        latency_distribution: "constant", "uniform" (mean +/- jitter) or
+            "lognormal" (median first_token_latency, sigma jitter).
+        latency_jitter: Spread of the first-token latency distribution.
+        seed: Mixed into the reply and latency draws; replies are already
+            deterministic per conversation without it.
+    """
+
+    response_tokens: int = 40
+    tokens_per_second: float = 50.0
+    first_token_latency: float = 0.2
+    latency_distribution: str = "constant"
+    latency_jitter: float = 0.0
+    seed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming-chat"
+
+    def _conversation_key(self, messages: List[BaseMessage]) -> int:
+        text = "\n".join(f"{m.type}:{m.content}" for m in messages)
+        digest = hashlib.sha256(f"{self.seed}\n{text}".encode()).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    def _tokens(self, messages: List[BaseMessage]) -> List[str]:
+        rng = random.Random(self._conversation_key(messages))
+        words = [rng.choice(_VOCABULARY) for _ in range(self.response_tokens)]
+        return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+    def _first_token_delay(self, messages: List[BaseMessage]) -> float:
+        rng = random.Random(self._conversation_key(messages) ^ 0x5EED)
+        if self.latency_distribution == "uniform":
+            delay = rng.uniform(
+                self.first_token_latency - self.latency_jitter,
+                self.first_token_latency + self.latency_jitter,
+            )
+        elif self.latency_distribution == "lognormal" and self.first_token_latency > 0:
+            delay = rng.lognormvariate(
+                math.log(self.first_token_latency), self.latency_jitter
+            )
+        else:
+            delay = self.first_token_latency
+        return max(0.0, delay)
+
+    def _chunks(
+        self, messages: List[BaseMessage]
+    ) -> tuple[float, float, List[ChatGenerationChunk]]:
+        interval = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        chunks = [
+            ChatGenerationChunk(message=AIMessageChunk(content=token))
+            for token in self._tokens(messages)
+        ]
+        return self._first_token_delay(messages), interval, chunks
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        first_delay, interval, chunks = self._chunks(messages)
+        time.sleep(first_delay)
+        for i, chunk in enumerate(chunks):
+            if i and interval:
+                time.sleep(interval)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        first_delay, interval, chunks = self._chunks(messages)
+        await asyncio.sleep(first_delay)
+        for i, chunk in enumerate(chunks):
+            if i and interval:
+                await asyncio.sleep(interval)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        content = "".join(
+            chunk.text for chunk in self._stream(messages, stop, run_manager, **kwargs)
+        )
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=content))]
+        )
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        parts = [
+            chunk.text
+            async for chunk in self._astream(messages, stop, run_manager, **kwargs)
+        ]
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content="".join(parts)))]
+        )
@@ -1,50 +1,87 @@
-"""LangGraph chat agent with OpenAI GPT-4o-mini integration.
+"""LangGraph chat agent with OpenAI integration.
 
-Processes conversation messages and returns AI responses.
+Processes conversation messages and returns AI responses. The model comes
+from agent.models (the `model_name` configurable or AGENT_MODEL env var,
+default gpt-4o-mini); "fake" swaps in a deterministic local model for
+offline load tests and benchmarks. Replies can optionally be served from
+a local exact-match cache (agent.response_cache). Model calls go through
+a process-wide concurrency limit and may be routed to a fallback model when
+the primary is slow or failing (agent.routing).
 """
 
 from __future__ import annotations
 
-import os
-from typing import Annotated, Sequence, TypedDict, Optional
+import asyncio
+import logging
+import time
+from typing import Any, Dict
 
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_openai import ChatOpenAI
-from langgraph.graph import StateGraph, add_messages
-from langgraph.graph.message import MessagesState
-from pydantic import SecretStr
-
-
-class State(MessagesState):
-    """The agent state.
-    
-    Extends MessagesState to handle conversation messages.
-    """
-    pass
-
-
-async def call_model(state: State, config: RunnableConfig) -> dict:
-    """Call OpenAI GPT-4o-mini with the conversation messages."""
-    
-    # Get API key and convert to SecretStr if present
-    api_key = os.getenv("OPENAI_API_KEY")
-    
-    secret_key = SecretStr(api_key) if api_key is not None else None
-    
-    # Initialize OpenAI model with hardcoded model name
-    model = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.7,
-        api_key=secret_key
+from langgraph.graph import StateGraph
+
+from agent.context import model_input, trim_context
+from agent.models import get_model, get_model_name
+from agent.response_cache import ReplayChatModel, cache_key, get_response_cache
+from agent.routing import model_limiter, model_router
+from agent.state import State
+
+logger = logging.getLogger(__name__)
+
+
+async def call_model(state: State, config: RunnableConfig) -> Dict[str, Any]:
+    """Call the configured chat model with the conversation messages."""
+    # Trimmed history (plus running summary) prepared by trim_context
+    messages = model_input(state)
+
+    # Serve identical prompts from the response cache when it is enabled
+    cache = get_response_cache(config)
+    if cache is not None:
+        key = cache_key(messages, config)
+        cached = await asyncio.to_thread(cache.get, key)
+        logger.info(
+            "Response cache lookup",
+            extra={"cache_hit": cached is not None, **cache.stats()},
+        )
+        if cached is not None:
+            # Replayed as a stream so clients see the same token events
+            response = await ReplayChatModel(content=cached).ainvoke(messages, config)
+            return {"messages": [response]}
+
+    # Primary model unless its recent latency or error rate is over threshold
+    model_name = model_router.choose(config)
+    model = get_model(config, model_name)
+
+    async with model_limiter.slot() as queue_wait:
+        start = time.perf_counter()
+        try:
+            response = await model.ainvoke(messages, config)
+        except Exception:
+            model_router.record(model_name, time.perf_counter() - start, error=True)
+            raise
+        latency = time.perf_counter() - start
+        model_router.record(model_name, latency)
+
+    fallback = model_name != get_model_name(config)
+    logger.info(
+        "Model call",
+        extra={
+            "model": model_name,
+            "fallback": fallback,
+            "queue_wait_seconds": queue_wait,
+            "latency_seconds": latency,
+            **model_limiter.stats(),
+        },
     )
-    
-    # Get the current messages
-    messages = state["messages"]
-    
-    # Call the model
-    response = await model.ainvoke(messages)
-    
+
+    # Fallback replies are not cached under the primary model's key
+    if (
+        cache is not None
+        and not fallback
+        and isinstance(response.content, str)
+        and not getattr(response, "tool_calls", None)
+    ):
+        await asyncio.to_thread(cache.put, key, response.content)
+
     # Return the response message
     return {"messages": [response]}
 
@@ -52,7 +89,9 @@ async def call_model(state: State, config: RunnableConfig) -> dict:
 # Define the graph
 graph = (
     StateGraph(State)
+    .add_node("trim_context", trim_context)
     .add_node("call_model", call_model)
-    .add_edge("__start__", "call_model")
+    .add_edge("__start__", "trim_context")
+    .add_edge("trim_context", "call_model")
     .compile(name="ChatAgent")
 )
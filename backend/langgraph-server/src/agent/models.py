@@ -0,0 +1,121 @@
+"""Chat model registry for the agent graph.
+
+Resolves the model for a run from the run's `configurable` values, then
+the environment (see agent.settings), and caches one client per distinct configuration so
+every run reuses the same HTTP connection pool instead of building a new
+client (and a new pool) per turn.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.runnables import RunnableConfig
+from langchain_openai import ChatOpenAI
+from pydantic import SecretStr
+
+from agent.fake_model import FakeStreamingChatModel
+from agent.settings import setting
+
+DEFAULT_MODEL_NAME = "gpt-4o-mini"
+DEFAULT_TEMPERATURE = 0.7
+
+# Upper bound on cached clients; configurations beyond this evict the oldest
+MAX_CACHED_MODELS = 32
+
+_FAKE_MODEL_SETTINGS = {
+    # configurable key / env var suffix: type
+    "response_tokens": int,
+    "tokens_per_second": float,
+    "first_token_latency": float,
+    "latency_distribution": str,
+    "latency_jitter": float,
+    "seed": int,
+}
+
+_models: Dict[Tuple[Any, ...], BaseChatModel] = {}
+_lock = threading.Lock()
+
+
+def _configurable(config: Optional[RunnableConfig]) -> Dict[str, Any]:
+    return (config or {}).get("configurable", {})
+
+
+def get_model_name(config: Optional[RunnableConfig]) -> str:
+    """Return the model to use: configurable model_name, then AGENT_MODEL env var."""
+    return str(setting(config, "model_name", "AGENT_MODEL", None) or DEFAULT_MODEL_NAME)
+
+
+def _fake_params(config: Optional[RunnableConfig]) -> Dict[str, Any]:
+    configurable = _configurable(config)
+    params = {}
+    for name, cast in _FAKE_MODEL_SETTINGS.items():
+        value = configurable.get(
+            f"fake_{name}", os.getenv(f"FAKE_MODEL_{name.upper()}")
+        )
+        if value is not None:
+            params[name] = cast(value)
+    return params
+
+
+def fake_model_from_config(config: Optional[RunnableConfig]) -> FakeStreamingChatModel:
+    """Build the fake model from `fake_*` configurable keys or FAKE_MODEL_* env vars."""
+    return FakeStreamingChatModel(**_fake_params(config))
+
+
+def _model_key(
+    config: Optional[RunnableConfig], model_name: Optional[str] = None
+) -> Tuple[Any, ...]:
+    model_name = model_name or get_model_name(config)
+    if model_name.startswith("fake"):
+        return ("fake", tuple(sorted(_fake_params(config).items())))
+
+    temperature = float(_configurable(config).get("temperature", DEFAULT_TEMPERATURE))
+    # Part of the key so a rotated key gets a fresh client
+    return ("openai", model_name, temperature, os.getenv("OPENAI_API_KEY"))
+
+
+def model_signature(config: Optional[RunnableConfig]) -> Tuple[Any, ...]:
+    """Identify the model and the settings that shape its replies, without credentials."""
+    key = _model_key(config)
+    return key[:3] if key[0] == "openai" else key
+
+
+def _build_model(key: Tuple[Any, ...]) -> BaseChatModel:
+    if key[0] == "fake":
+        return FakeStreamingChatModel(**dict(key[1]))
+
+    _, model_name, temperature, api_key = key
+    return ChatOpenAI(
+        model=model_name,
+        temperature=temperature,
+        api_key=SecretStr(api_key) if api_key is not None else None,
+    )
+
+
+def get_model(
+    config: Optional[RunnableConfig], model_name: Optional[str] = None
+) -> BaseChatModel:
+    """Return the cached chat model for this run's configuration.
+
+    Model names starting with "fake" select the offline FakeStreamingChatModel;
+    anything else is an OpenAI model. `temperature` may also be configured.
+    `model_name` overrides the configured model (used for fallbacks).
+    """
+    key = _model_key(config, model_name)
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            if len(_models) >= MAX_CACHED_MODELS:
+                _models.pop(next(iter(_models)))
+            model = _models[key] = _build_model(key)
+        return model
+
+
+def clear_model_cache() -> None:
+    """Drop all cached model clients."""
+    with _lock:
+        _models.clear()
@@ -0,0 +1,260 @@
+"""Exact-match response cache for the agent graph.
+
+Opt-in (`response_cache` configurable or AGENT_RESPONSE_CACHE). Replies are
+stored in a local SQLite file keyed on the normalized model input plus the
+model signature, expire after a TTL and are evicted least-recently-used once
+the store holds more than its maximum number of entries. Cached replies are
+replayed through `ReplayChatModel` so clients still receive a token stream.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableConfig
+
+from agent.models import model_signature
+from agent.settings import enabled, setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(".agent_cache", "responses.sqlite3")
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_ENTRIES = 10_000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(message: BaseMessage) -> Dict[str, Any]:
+    content = message.content
+    if isinstance(content, str):
+        content = _WHITESPACE.sub(" ", content).strip()
+    return {"type": message.type, "content": content}
+
+
+def cache_key(messages: List[BaseMessage], config: Optional[RunnableConfig]) -> str:
+    """Hash the model input and model signature.
+
+    Message ids and surrounding whitespace are ignored so the same prompt in
+    different threads maps to the same entry.
+    """
+    payload = {
+        "model": list(model_signature(config)),
+        "messages": [_normalize(m) for m in messages],
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed store of model replies with TTL and LRU size eviction."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """Open (or create) the cache database at `path`."""
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " content TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached reply for `key`, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return str(row[0])
+
+    def put(self, key: str, content: str) -> None:
+        """Store a reply, then drop expired entries and trim to max_entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, content, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        """Return the number of stored replies, expired ones included until the next put."""
+        with self._lock:
+            return int(
+                self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(config: Optional[RunnableConfig]) -> Optional[ResponseCache]:
+    """Return the shared cache for this run, or None when caching is off.
+
+    Configurable (or env): `response_cache` (AGENT_RESPONSE_CACHE),
+    `response_cache_path` (AGENT_RESPONSE_CACHE_PATH), `response_cache_ttl`
+    (AGENT_RESPONSE_CACHE_TTL, seconds) and `response_cache_max_entries`
+    (AGENT_RESPONSE_CACHE_MAX_ENTRIES).
+    """
+    if not enabled(setting(config, "response_cache", "AGENT_RESPONSE_CACHE", False)):
+        return None
+
+    path = setting(
+        config, "response_cache_path", "AGENT_RESPONSE_CACHE_PATH", DEFAULT_CACHE_PATH
+    )
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = ResponseCache(path)
+        cache.ttl = float(
+            setting(
+                config,
+                "response_cache_ttl",
+                "AGENT_RESPONSE_CACHE_TTL",
+                DEFAULT_TTL_SECONDS,
+            )
+        )
+        cache.max_entries = int(
+            setting(
+                config,
+                "response_cache_max_entries",
+                "AGENT_RESPONSE_CACHE_MAX_ENTRIES",
+                DEFAULT_MAX_ENTRIES,
+            )
+        )
+        return cache
+
+
+def clear_response_caches() -> None:
+    """Close and forget all open caches (the files are kept)."""
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model that streams a fixed reply, used to serve cache hits."""
+
+    content: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "cached-replay"
+
+    def _chunks(self) -> List[ChatGenerationChunk]:
+        # Split on word boundaries, keeping the whitespace with the next word
+        parts = re.findall(r"\s*\S+", self.content) or [self.content]
+        parts[-1] += self.content[len("".join(parts)) :]
+        return [
+            ChatGenerationChunk(message=AIMessageChunk(content=part)) for part in parts
+        ]
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        for chunk in self._chunks():
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for chunk in self._chunks():
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=self.content))]
+        )
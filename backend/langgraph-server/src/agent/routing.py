@@ -0,0 +1,196 @@
+"""Model-call admission control and latency-driven model fallback.
+
+`model_limiter` caps the number of model calls in flight in this process
+(AGENT_MAX_CONCURRENT_MODEL_CALLS, 0 for no limit) so traffic spikes queue
+here instead of tripping provider rate limits, and records how long calls
+waited for a slot.
+
+`model_router` keeps a sliding window of call latencies and errors per
+model. When a fallback model is configured and the primary's recent p95
+latency or error rate passes its threshold, calls go to the fallback until
+the slow samples age out of the window.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+
+from agent.models import get_model_name
+from agent.settings import setting
+
+DEFAULT_MAX_CONCURRENT_CALLS = 16
+DEFAULT_WINDOW_SECONDS = 60.0
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_P95_THRESHOLD = 10.0
+DEFAULT_ERROR_RATE_THRESHOLD = 0.25
+# Hard cap per model, for call rates high enough to fill the window
+MAX_SAMPLES = 10_000
+
+
+class ModelLimiter:
+    """Process-wide cap on concurrent model calls with queueing statistics."""
+
+    def __init__(self, limit: int):
+        """Allow `limit` concurrent calls; 0 or less disables the cap."""
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.calls = 0
+        self.queued_calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created on first use so it belongs to the server's running loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Hold a call slot; yields the seconds spent waiting for it."""
+        start = time.perf_counter()
+        semaphore = self._get_semaphore() if self.limit > 0 else None
+        if semaphore is not None:
+            if semaphore.locked():
+                self.queued_calls += 1
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                await semaphore.acquire()
+            finally:
+                self.waiting -= 1
+
+        wait = time.perf_counter() - start
+        self.calls += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.in_flight += 1
+        try:
+            yield wait
+        finally:
+            self.in_flight -= 1
+            if semaphore is not None:
+                semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current occupancy and queueing totals."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "calls": self.calls,
+            "queued_calls": self.queued_calls,
+            "avg_wait_seconds": self.total_wait / self.calls if self.calls else 0.0,
+            "max_wait_seconds": self.max_wait,
+        }
+
+
+class ModelRouter:
+    """Chooses between a primary and a fallback model from recent call health."""
+
+    def __init__(
+        self,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ):
+        """Judge health over `window_seconds`, once at least `min_samples` calls were seen."""
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[Tuple[float, float, bool]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_name: str, latency: float, error: bool = False) -> None:
+        """Add one call outcome and drop samples that left the window."""
+        now = time.monotonic()
+        with self._lock:
+            samples = self._samples.get(model_name)
+            if samples is None:
+                samples = self._samples[model_name] = deque(maxlen=MAX_SAMPLES)
+            samples.append((now, latency, error))
+            self._expire(samples, now)
+
+    def _expire(self, samples: Deque[Tuple[float, float, bool]], now: float) -> None:
+        cutoff = now - self.window_seconds
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+
+    def _recent(self, model_name: str) -> Deque[Tuple[float, float, bool]]:
+        samples = self._samples.get(model_name, deque())
+        self._expire(samples, time.monotonic())
+        return samples
+
+    def health(self, model_name: str) -> Dict[str, Any]:
+        """Sample count, p95 latency and error rate over the window."""
+        with self._lock:
+            samples = list(self._recent(model_name))
+        if not samples:
+            return {"samples": 0, "p95_seconds": None, "error_rate": 0.0}
+        latencies = sorted(latency for _, latency, _ in samples)
+        p95 = latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)]
+        errors = sum(1 for _, _, error in samples if error)
+        return {
+            "samples": len(samples),
+            "p95_seconds": p95,
+            "error_rate": errors / len(samples),
+        }
+
+    def choose(self, config: Optional[RunnableConfig]) -> str:
+        """Return the model name to call for this run.
+
+        Configurable (or env): `fallback_model_name` (AGENT_FALLBACK_MODEL),
+        `fallback_p95_seconds` (AGENT_FALLBACK_P95_SECONDS) and
+        `fallback_error_rate` (AGENT_FALLBACK_ERROR_RATE).
+        """
+        primary = get_model_name(config)
+        fallback = setting(config, "fallback_model_name", "AGENT_FALLBACK_MODEL", None)
+        if not fallback or fallback == primary:
+            return primary
+
+        health = self.health(primary)
+        if health["samples"] < self.min_samples:
+            return primary
+
+        p95_threshold = float(
+            setting(
+                config,
+                "fallback_p95_seconds",
+                "AGENT_FALLBACK_P95_SECONDS",
+                DEFAULT_P95_THRESHOLD,
+            )
+        )
+        error_threshold = float(
+            setting(
+                config,
+                "fallback_error_rate",
+                "AGENT_FALLBACK_ERROR_RATE",
+                DEFAULT_ERROR_RATE_THRESHOLD,
+            )
+        )
+        if (
+            health["p95_seconds"] > p95_threshold
+            or health["error_rate"] > error_threshold
+        ):
+            return str(fallback)
+        return primary
+
+
+model_limiter = ModelLimiter(
+    int(os.getenv("AGENT_MAX_CONCURRENT_MODEL_CALLS", DEFAULT_MAX_CONCURRENT_CALLS))
+)
+model_router = ModelRouter()
@@ -0,0 +1,26 @@
+"""Run settings shared by the agent graph nodes.
+
+A setting comes from the run's `configurable` values first, then from an
+environment variable, then from the default.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+
+def setting(config: Optional[RunnableConfig], name: str, env: str, default: Any) -> Any:
+    """Return configurable `name`, else env var `env`, else `default`."""
+    configurable = (config or {}).get("configurable", {})
+    value = configurable.get(name, os.getenv(env))
+    return default if value is None else value
+
+
+def enabled(value: Any) -> bool:
+    """Interpret a flag that may arrive as a string from env or configurable."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
@@ -0,0 +1,23 @@
+"""State schema of the agent graph, shared by its nodes."""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from langgraph.graph.message import MessagesState
+
+
+class State(MessagesState):
+    """The agent state.
+
+    Extends MessagesState to handle conversation messages, plus the context
+    management fields written by `trim_context`.
+    """
+
+    summary: str
+    summarized_count: int
+    # Model input is messages[context_start:] after the leading system messages
+    context_start: int
+    context_stats: Dict[str, Any]
+    # Pointer to messages compacted out of `messages` by the backend
+    archive: Dict[str, Any]
@@ -0,0 +1,132 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from agent.context import count_tokens, model_input, select_context, trim_context
+from agent.graph import graph
+from agent.models import clear_model_cache
+
+
+@pytest.fixture(autouse=True)
+def _fake_model(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("AGENT_MODEL", "fake")
+    monkeypatch.setenv("FAKE_MODEL_FIRST_TOKEN_LATENCY", "0")
+    monkeypatch.setenv("FAKE_MODEL_TOKENS_PER_SECOND", "0")
+    monkeypatch.setenv("FAKE_MODEL_RESPONSE_TOKENS", "5")
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+
+def _conversation(turns: int, words: int = 40):
+    messages = []
+    for i in range(turns):
+        messages.append(
+            HumanMessage(content=f"question {i} " + "word " * words, id=f"h{i}")
+        )
+        messages.append(AIMessage(content=f"answer {i} " + "word " * words, id=f"a{i}"))
+    return messages
+
+
+def test_count_tokens_is_cached_per_message() -> None:
+    message = HumanMessage(content="x" * 400, id="cached-1")
+    assert count_tokens(message) == 104
+    # Same id: served from the cache (messages are replaced, not edited)
+    message.content = "y" * 400
+    assert count_tokens(message) == 104
+
+
+def test_select_context_keeps_system_and_latest_within_budget() -> None:
+    messages = [SystemMessage(content="be brief", id="s")] + _conversation(10)
+    latest = HumanMessage(content="latest", id="latest")
+    messages.append(latest)
+
+    window, start = select_context(messages, max_tokens=250)
+
+    assert window[0].id == "s"
+    assert window[-1] is latest
+    assert isinstance(window[1], HumanMessage)
+    assert sum(count_tokens(m) for m in window) <= 250
+    assert start > 1
+
+
+def test_select_context_always_keeps_latest_message() -> None:
+    huge = HumanMessage(content="z" * 10_000, id="huge")
+    window, _ = select_context(_conversation(2) + [huge], max_tokens=10)
+    assert window == [huge]
+
+
+@pytest.mark.anyio
+async def test_trim_context_reports_tokens_saved() -> None:
+    messages = _conversation(20) + [HumanMessage(content="now", id="now")]
+
+    update = await trim_context(
+        {"messages": messages}, {"configurable": {"max_context_tokens": 300}}
+    )
+
+    stats = update["context_stats"]
+    assert stats["tokens_saved"] > 0
+    assert stats["input_tokens"] <= 300
+    assert update["context_start"] > 0
+    assert model_input({"messages": messages, **update})[-1].id == "now"
+    assert "summary" not in update
+
+
+@pytest.mark.anyio
+async def test_trim_context_folds_dropped_turns_into_summary() -> None:
+    messages = _conversation(20) + [HumanMessage(content="now", id="now")]
+    config = {"configurable": {"max_context_tokens": 300, "summarize_context": True}}
+
+    update = await trim_context({"messages": messages}, config)
+
+    assert update["summary"]
+    assert update["summarized_count"] > 0
+    model_messages = model_input({"messages": messages, **update})
+    assert isinstance(model_messages[0], SystemMessage)
+    assert update["summary"] in model_messages[0].content
+    window, start = select_context(messages, 300)
+    assert update["context_start"] == start
+    assert model_messages[1:] == window
+
+
+@pytest.mark.anyio
+async def test_summary_is_not_streamed_to_client() -> None:
+    messages = _conversation(20) + [HumanMessage(content="now", id="now")]
+    config = {"configurable": {"max_context_tokens": 300, "summarize_context": True}}
+
+    streamed = []
+    async for chunk, metadata in graph.astream(
+        {"messages": messages}, config, stream_mode="messages"
+    ):
+        if chunk.content:
+            streamed.append(metadata["langgraph_node"])
+
+    assert streamed == ["call_model"] * 5
+
+
+@pytest.mark.anyio
+async def test_graph_sends_trimmed_history_but_keeps_full_state() -> None:
+    config = {"configurable": {"max_context_tokens": 200}}
+    messages = _conversation(15) + [HumanMessage(content="now", id="now")]
+
+    result = await graph.ainvoke({"messages": messages}, config)
+
+    assert len(result["messages"]) == len(messages) + 1
+    assert result["context_stats"]["messages_sent"] < len(messages)
+    # Only the window start is checkpointed, not a copy of the messages
+    assert isinstance(result["context_start"], int)
+    assert "llm_input_messages" not in result
+
+
+def test_summary_sent_after_compaction() -> None:
+    messages = [HumanMessage(content="latest", id="latest")]
+    state = {
+        "messages": messages,
+        "summary": "earlier turns",
+        "archive": {"message_count": 40},
+    }
+
+    model_messages = model_input(state)
+
+    assert isinstance(model_messages[0], SystemMessage)
+    assert "earlier turns" in model_messages[0].content
+    assert model_input({"messages": messages, "summary": "earlier turns"}) == messages
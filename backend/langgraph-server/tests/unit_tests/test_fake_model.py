@@ -0,0 +1,110 @@
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agent.fake_model import FakeStreamingChatModel
+from agent.graph import graph
+from agent.models import fake_model_from_config, get_model, get_model_name
+
+
+def test_fake_model_is_deterministic() -> None:
+    model = FakeStreamingChatModel(
+        first_token_latency=0, tokens_per_second=0, response_tokens=12
+    )
+    messages = [HumanMessage(content="hello")]
+
+    first = model.invoke(messages)
+    second = model.invoke(messages)
+
+    assert isinstance(first, AIMessage)
+    assert first.content == second.content
+    assert len(first.content.split()) == 12
+    assert (
+        model.invoke([HumanMessage(content="something else")]).content != first.content
+    )
+
+
+def test_fake_model_seed_changes_reply() -> None:
+    messages = [HumanMessage(content="hello")]
+    a = FakeStreamingChatModel(
+        first_token_latency=0, tokens_per_second=0, seed=1
+    ).invoke(messages)
+    b = FakeStreamingChatModel(
+        first_token_latency=0, tokens_per_second=0, seed=2
+    ).invoke(messages)
+    assert a.content != b.content
+
+
+def test_fake_model_streams_at_configured_rate() -> None:
+    model = FakeStreamingChatModel(
+        first_token_latency=0.05, tokens_per_second=200, response_tokens=11
+    )
+
+    start = time.perf_counter()
+    # Newer langchain-core versions append an empty closing chunk
+    chunks = [c for c in model.stream([HumanMessage(content="hi")]) if c.content]
+    elapsed = time.perf_counter() - start
+
+    assert len(chunks) == 11
+    # 50ms first-token latency + 10 gaps of 5ms
+    assert elapsed >= 0.09
+
+
+def test_get_model_selects_fake_from_config(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("AGENT_MODEL", raising=False)
+    config = {
+        "configurable": {
+            "model_name": "fake",
+            "fake_response_tokens": "3",
+            "fake_seed": 7,
+        }
+    }
+
+    model = get_model(config)
+
+    assert isinstance(model, FakeStreamingChatModel)
+    assert model.response_tokens == 3
+    assert model.seed == 7
+
+
+def test_env_selects_model_without_configurable(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("AGENT_MODEL", "fake")
+    monkeypatch.setenv("FAKE_MODEL_TOKENS_PER_SECOND", "0")
+
+    model = get_model({})
+
+    assert isinstance(model, FakeStreamingChatModel)
+    assert model.tokens_per_second == 0
+    assert fake_model_from_config({}).tokens_per_second == 0
+
+
+def test_configurable_model_name_overrides_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AGENT_MODEL", "fake")
+
+    assert get_model_name({"configurable": {"model_name": "gpt-4o"}}) == "gpt-4o"
+    assert get_model_name({"configurable": {}}) == "fake"
+
+
+@pytest.mark.anyio
+async def test_graph_streams_fake_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("AGENT_MODEL", raising=False)
+    config = {
+        "configurable": {
+            "model_name": "fake",
+            "fake_first_token_latency": 0,
+            "fake_tokens_per_second": 0,
+            "fake_response_tokens": 5,
+        }
+    }
+
+    tokens = []
+    async for chunk, _ in graph.astream(
+        {"messages": [HumanMessage(content="hello")]}, config, stream_mode="messages"
+    ):
+        if chunk.content:
+            tokens.append(chunk.content)
+
+    assert len(tokens) == 5
@@ -0,0 +1,71 @@
+import pytest
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+from agent import models
+from agent.graph import graph
+from agent.models import clear_model_cache, get_model
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("AGENT_MODEL", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+
+def test_openai_model_honors_configurable() -> None:
+    model = get_model({"configurable": {"model_name": "gpt-4o", "temperature": 0.1}})
+
+    assert isinstance(model, ChatOpenAI)
+    assert model.model_name == "gpt-4o"
+    assert model.temperature == 0.1
+
+
+def test_clients_are_cached_per_configuration() -> None:
+    config = {"configurable": {"model_name": "gpt-4o-mini"}}
+
+    first = get_model(config)
+
+    assert get_model(config) is first
+    assert (
+        get_model({"configurable": {"model_name": "gpt-4o-mini", "temperature": 0}})
+        is not first
+    )
+    assert get_model({"configurable": {"model_name": "gpt-4o"}}) is not first
+
+
+def test_rotated_api_key_builds_new_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    first = get_model({})
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-rotated")
+    assert get_model({}) is not first
+
+
+@pytest.mark.anyio
+async def test_model_not_rebuilt_per_turn(monkeypatch: pytest.MonkeyPatch) -> None:
+    builds = []
+    build_model = models._build_model
+
+    def counting_build(key):
+        builds.append(key)
+        return build_model(key)
+
+    monkeypatch.setattr(models, "_build_model", counting_build)
+    config = {
+        "configurable": {
+            "model_name": "fake",
+            "fake_first_token_latency": 0,
+            "fake_tokens_per_second": 0,
+        }
+    }
+
+    state = {"messages": [HumanMessage(content="first turn")]}
+    for turn in range(3):
+        state = await graph.ainvoke(
+            {"messages": state["messages"] + [HumanMessage(content=f"turn {turn}")]},
+            config,
+        )
+
+    assert len(builds) == 1
@@ -0,0 +1,103 @@
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agent.graph import graph
+from agent.models import clear_model_cache
+from agent.response_cache import (
+    ReplayChatModel,
+    ResponseCache,
+    cache_key,
+    clear_response_caches,
+    get_response_cache,
+)
+
+FAKE = {
+    "model_name": "fake",
+    "fake_first_token_latency": 0,
+    "fake_tokens_per_second": 0,
+    "fake_response_tokens": 6,
+}
+
+
+@pytest.fixture(autouse=True)
+def _isolated(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("AGENT_MODEL", raising=False)
+    monkeypatch.delenv("AGENT_RESPONSE_CACHE", raising=False)
+    clear_model_cache()
+    yield
+    clear_response_caches()
+
+
+def test_cache_key_normalizes_history() -> None:
+    config = {"configurable": FAKE}
+    a = cache_key([HumanMessage(content="What is  LangGraph?\n", id="1")], config)
+    b = cache_key([HumanMessage(content="What is LangGraph?", id="2")], config)
+    c = cache_key(
+        [HumanMessage(content="What is LangGraph?")],
+        {"configurable": {**FAKE, "fake_seed": 1}},
+    )
+
+    assert a == b
+    assert a != c
+
+
+def test_ttl_and_size_eviction(tmp_path) -> None:
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl=60, max_entries=2)
+    cache.put("a", "first")
+    cache.put("b", "second")
+    assert cache.get("a") == "first"
+    cache.put("c", "third")
+
+    # "b" was least recently used
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    cache.ttl = 0.01
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.anyio
+async def test_replay_streams_cached_content() -> None:
+    chunks = [
+        c.content
+        async for c in ReplayChatModel(content="one two  three").astream([])
+        if c.content
+    ]
+    assert chunks == ["one", " two", "  three"]
+
+
+@pytest.mark.anyio
+async def test_graph_serves_repeated_prompt_from_cache(tmp_path) -> None:
+    config = {
+        "configurable": {
+            **FAKE,
+            "response_cache": True,
+            "response_cache_path": str(tmp_path / "c.sqlite3"),
+        }
+    }
+
+    async def run() -> list:
+        tokens = []
+        async for chunk, _ in graph.astream(
+            {"messages": [HumanMessage(content="How do I start?")]},
+            config,
+            stream_mode="messages",
+        ):
+            if chunk.content and isinstance(chunk, AIMessage):
+                tokens.append(chunk.content)
+        return tokens
+
+    first = await run()
+    second = await run()
+
+    assert len(first) == 6
+    assert second == first
+    assert get_response_cache(config).stats() == {
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+    }
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+
+from agent.routing import ModelLimiter, ModelRouter
+
+CONFIG = {
+    "configurable": {
+        "model_name": "gpt-4o",
+        "fallback_model_name": "gpt-4o-mini",
+        "fallback_p95_seconds": 2,
+        "fallback_error_rate": 0.5,
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def _no_env_model(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("AGENT_MODEL", raising=False)
+    monkeypatch.delenv("AGENT_FALLBACK_MODEL", raising=False)
+
+
+@pytest.mark.anyio
+async def test_limiter_caps_concurrency_and_records_queueing() -> None:
+    limiter = ModelLimiter(2)
+    peak = 0
+
+    async def call() -> None:
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(6)))
+
+    stats = limiter.stats()
+    assert peak == 2
+    assert stats["calls"] == 6
+    assert stats["queued_calls"] == 4
+    assert stats["max_wait_seconds"] > 0
+    assert stats["in_flight"] == 0
+
+
+def test_router_falls_back_on_slow_primary() -> None:
+    router = ModelRouter(min_samples=5)
+    for _ in range(5):
+        router.record("gpt-4o", 0.5)
+    assert router.choose(CONFIG) == "gpt-4o"
+
+    router.record("gpt-4o", 3.0)
+    assert router.health("gpt-4o")["p95_seconds"] == 3.0
+    assert router.choose(CONFIG) == "gpt-4o-mini"
+
+
+def test_router_falls_back_on_errors_and_recovers() -> None:
+    router = ModelRouter(window_seconds=0.05, min_samples=4)
+    for error in (True, True, True, False):
+        router.record("gpt-4o", 0.1, error=error)
+    assert router.choose(CONFIG) == "gpt-4o-mini"
+
+    # Once the failures age out of the window the primary is tried again
+    time.sleep(0.06)
+    assert router.choose(CONFIG) == "gpt-4o"
+
+
+def test_router_without_fallback_keeps_primary() -> None:
+    router = ModelRouter(min_samples=1)
+    router.record("gpt-4o", 60.0, error=True)
+    assert router.choose({"configurable": {"model_name": "gpt-4o"}}) == "gpt-4o"
+
+
+def test_router_expires_samples_on_record() -> None:
+    # Without a fallback, health() never runs; record() alone must bound memory
+    router = ModelRouter(window_seconds=0.05)
+    for _ in range(100):
+        router.record("gpt-4o", 0.1)
+    time.sleep(0.06)
+    router.record("gpt-4o", 0.1)
+
+    assert len(router._samples["gpt-4o"]) == 1
@@ -0,0 +1,9 @@
+"""
+End-to-end load tests for the Assistant UI LangGraph Backend.
+
+Starts local stand-ins for LangGraph, Supabase and Assistant Cloud, runs the
+backend against them in a separate uvicorn process and drives it with
+concurrent virtual users. Run from the backend directory, e.g.
+
+    python -m loadtest --scenario chat --users 50 --tokens-per-second 40
+"""
@@ -0,0 +1,177 @@
+"""
+Load-test runner.
+
+Usage:
+    python -m loadtest [--scenario all|signup|chat|admin] [--users 20] [--iterations 5]
+                       [--tokens-per-second 50] [--tokens 60] [--first-token-latency 0.3]
+                       [--upstream-latency 0.02] [--error-rate 0.0] [--workers 1] [--json results.json]
+
+The backend runs with its normal .env; upstream URLs, keys and the JWT
+secret are overridden so it only talks to the local stand-ins. Extra
+backend settings can be passed through the environment as usual, e.g.
+THREAD_STATE_CACHE_TTL=1 python -m loadtest --scenario admin.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+import httpx
+import jwt
+import uvicorn
+
+from loadtest.scenarios import (VirtualUsers, admin_dashboard, chat_streams,
+                                format_report, signup_storm)
+from loadtest.standins import (LangGraphBehavior, UpstreamBehavior,
+                               create_assistant_cloud_app,
+                               create_langgraph_app, create_supabase_app)
+
+JWT_SECRET = "loadtest-jwt-secret-loadtest-jwt-secret"
+JWT_ISSUER = "http://127.0.0.1/auth/v1"
+BETA_EMAILS = [f"beta-{i}@example.com" for i in range(50)]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve_in_thread(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name=f"standin-{port}", daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def _backend_env(langgraph_url: str, supabase_url: str, assistant_url: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "LANGGRAPH_API_URL": langgraph_url,
+        "LANGGRAPH_API_KEY": "",
+        "SUPABASE_URL": supabase_url,
+        # supabase-py only accepts JWT-shaped keys
+        "SUPABASE_ANON_KEY": jwt.encode({"role": "anon"}, JWT_SECRET, algorithm="HS256"),
+        "SUPABASE_SERVICE_ROLE_KEY": jwt.encode({"role": "service_role"}, JWT_SECRET, algorithm="HS256"),
+        "SUPABASE_JWT_SECRET": JWT_SECRET,
+        "SUPABASE_JWT_ISSUER": JWT_ISSUER,
+        "ASSISTANT_API_BASE_URL": assistant_url,
+        "ASSISTANT_API_KEY": "loadtest",
+    })
+    env.setdefault("LOG_LEVEL", "WARNING")
+    return env
+
+
+def _start_backend(port: int, env: Dict[str, str], workers: int = 1) -> subprocess.Popen:
+    if workers > 1:
+        # Production launch path: run_server.py with supervised workers
+        env = dict(env, SERVER_HOST="127.0.0.1", SERVER_PORT=str(port), SERVER_RELOAD="false",
+                   SERVER_WORKERS=str(workers))
+        command = [sys.executable, "run_server.py"]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+                   "--log-level", "warning", "--no-access-log"]
+    process = subprocess.Popen(command, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited during startup with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                if workers > 1:
+                    # The first healthy worker answered; give the rest time to finish importing
+                    time.sleep(2)
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Backend did not become healthy within 30s")
+
+
+async def _run_scenarios(args: argparse.Namespace, base_url: str) -> List[Dict[str, Any]]:
+    identities = VirtualUsers(JWT_SECRET, JWT_ISSUER)
+    selected = ["signup", "chat", "admin"] if args.scenario == "all" else [args.scenario]
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+    results = []
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        for name in selected:
+            if name == "signup":
+                stats = await signup_storm(client, args.users, args.iterations, BETA_EMAILS)
+            elif name == "chat":
+                stats = await chat_streams(client, args.users, args.iterations, identities)
+            else:
+                if "chat" not in selected:
+                    # Give the dashboard something to list
+                    await chat_streams(client, min(args.users, 10), 1, identities)
+                stats = await admin_dashboard(client, args.users, args.iterations, identities)
+            results.append(stats.summary())
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load test against local upstream stand-ins")
+    parser.add_argument("--scenario", choices=["all", "signup", "chat", "admin"], default="all")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=5, help="requests (or chat turns) per user")
+    parser.add_argument("--timeout", type=float, default=60.0, help="client timeout in seconds")
+    parser.add_argument("--tokens", type=int, default=60, help="tokens per streamed response")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="stand-in model token rate")
+    parser.add_argument("--first-token-latency", type=float, default=0.3, help="stand-in model think time")
+    parser.add_argument("--upstream-latency", type=float, default=0.02, help="latency added to every upstream call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of LangGraph calls failing")
+    parser.add_argument("--error-status", type=int, default=503, help="status code of injected failures")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction of LangGraph calls that hang")
+    parser.add_argument("--workers", type=int, default=1, help="backend worker processes (>1 uses run_server.py)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    langgraph = LangGraphBehavior(
+        latency=args.upstream_latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        hang_rate=args.hang_rate,
+        tokens_per_response=args.tokens,
+        tokens_per_second=args.tokens_per_second,
+        first_token_latency=args.first_token_latency
+    )
+    upstream = UpstreamBehavior(latency=args.upstream_latency)
+
+    standins = []
+    urls = []
+    for app in (
+        create_langgraph_app(langgraph),
+        create_supabase_app(upstream, BETA_EMAILS),
+        create_assistant_cloud_app(upstream),
+    ):
+        port = _free_port()
+        standins.append(_serve_in_thread(app, port))
+        urls.append(f"http://127.0.0.1:{port}")
+
+    backend_port = _free_port()
+    backend = _start_backend(backend_port, _backend_env(*urls), args.workers)
+    try:
+        results = asyncio.run(_run_scenarios(args, f"http://127.0.0.1:{backend_port}"))
+    finally:
+        backend.terminate()
+        backend.wait(timeout=10)
+        for server in standins:
+            server.should_exit = True
+
+    print(format_report(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Load-test scenarios and result reporting.
+
+Each scenario runs a number of virtual users concurrently against a running
+backend. Every request is timed per operation; chat streams additionally
+record time to first token.
+"""
+
+import asyncio
+import json
+import math
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import jwt
+
+
+class Stats:
+    """Latencies and errors per operation for one scenario run"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.requests: Dict[str, int] = {}
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.ttft: List[float] = []
+        self.started = 0.0
+        self.finished = 0.0
+
+    async def timed(self, operation: str, call: Callable[[], Awaitable[httpx.Response]]) -> Optional[httpx.Response]:
+        """Time one request; non-2xx responses and transport errors count as errors"""
+        start = time.perf_counter()
+        try:
+            response = await call()
+        except httpx.HTTPError:
+            self.record(operation, None)
+            return None
+        if response.status_code >= 400:
+            self.record(operation, None)
+            return None
+        self.record(operation, time.perf_counter() - start)
+        return response
+
+    def record(self, operation: str, latency: Optional[float]) -> None:
+        """Record one request; a latency of None marks it as failed"""
+        self.requests[operation] = self.requests.get(operation, 0) + 1
+        if latency is None:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+        else:
+            self.latencies.setdefault(operation, []).append(latency)
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = max(self.finished - self.started, 1e-9)
+        operations = {}
+        for operation, requests in self.requests.items():
+            samples = self.latencies.get(operation, [])
+            operations[operation] = {
+                "requests": requests,
+                "errors": self.errors.get(operation, 0),
+                "throughput_rps": round(len(samples) / elapsed, 2),
+                "p50_ms": _ms(percentile(samples, 50)),
+                "p99_ms": _ms(percentile(samples, 99)),
+            }
+        result: Dict[str, Any] = {
+            "scenario": self.name,
+            "duration_s": round(elapsed, 3),
+            "operations": operations,
+        }
+        if self.ttft:
+            result["time_to_first_token"] = {
+                "streams": len(self.ttft),
+                "p50_ms": _ms(percentile(self.ttft, 50)),
+                "p99_ms": _ms(percentile(self.ttft, 99)),
+            }
+        return result
+
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for no samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 1000, 1)
+
+
+class VirtualUsers:
+    """Mints Supabase-style JWTs for load-test users and admins"""
+
+    def __init__(self, jwt_secret: str, jwt_issuer: str):
+        self.jwt_secret = jwt_secret
+        self.jwt_issuer = jwt_issuer
+
+    def token(self, user_id: str, email: str, role: Optional[str] = None) -> str:
+        claims = {
+            "sub": user_id,
+            "email": email,
+            "aud": "authenticated",
+            "iss": self.jwt_issuer,
+            "exp": int(time.time()) + 3600,
+            "role": "authenticated",
+        }
+        if role:
+            claims["user_role"] = role
+        return jwt.encode(claims, self.jwt_secret, algorithm="HS256")
+
+    def headers(self, user_id: str, email: str, role: Optional[str] = None) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token(user_id, email, role)}"}
+
+
+async def run_users(stats: Stats, users: int, user_fn: Callable[[int], Awaitable[None]]) -> Stats:
+    stats.started = time.perf_counter()
+    await asyncio.gather(*(user_fn(i) for i in range(users)))
+    stats.finished = time.perf_counter()
+    return stats
+
+
+# Scenarios
+
+async def signup_storm(client: httpx.AsyncClient, users: int, iterations: int, beta_emails: List[str]) -> Stats:
+    """
+    Many visitors hitting the sign-up flow at once: check the email, then
+    leave it on the waiting list when it is not in the beta.
+    """
+    stats = Stats("signup_storm")
+
+    async def user(index: int) -> None:
+        for iteration in range(iterations):
+            if beta_emails and iteration % 2 == 0:
+                email = beta_emails[(index + iteration) % len(beta_emails)]
+            else:
+                email = f"visitor-{index}-{iteration}-{uuid.uuid4().hex[:6]}@example.com"
+
+            response = await stats.timed(
+                "check_user", lambda: client.post("/api/auth/check-user", json={"email": email})
+            )
+            if response is not None and response.json().get("status") == "not_beta":
+                await stats.timed(
+                    "non_beta_request",
+                    lambda: client.post("/api/auth/non-beta-request", json={"email": email})
+                )
+
+    return await run_users(stats, users, user)
+
+
+async def chat_streams(client: httpx.AsyncClient, users: int, iterations: int, identities: VirtualUsers) -> Stats:
+    """
+    Signed-in users opening the app (assistant token + new thread) and then
+    sending `iterations` messages, each streamed back token by token.
+    """
+    stats = Stats("chat_streams")
+
+    async def user(index: int) -> None:
+        user_id = f"loadtest-user-{index}"
+        email = f"{user_id}@example.com"
+        headers = identities.headers(user_id, email)
+
+        await stats.timed("assistant_token", lambda: client.post("/api/assistant/token", headers=headers))
+        response = await stats.timed(
+            "create_thread",
+            lambda: client.post("/api/threads", json={"user_id": user_id, "user_email": email}, headers=headers)
+        )
+        if response is None:
+            return
+        thread_id = response.json()["thread_id"]
+
+        for turn in range(iterations):
+            body = {"messages": [{"role": "user", "content": f"message {turn} from {user_id}"}]}
+            await _stream(client, stats, thread_id, body, headers)
+
+    return await run_users(stats, users, user)
+
+
+async def _stream(
+    client: httpx.AsyncClient,
+    stats: Stats,
+    thread_id: str,
+    body: Dict[str, Any],
+    headers: Dict[str, str]
+) -> None:
+    start = time.perf_counter()
+    first_token: Optional[float] = None
+    failed = False
+    try:
+        async with client.stream("POST", f"/api/threads/{thread_id}/stream", json=body, headers=headers) as response:
+            if response.status_code >= 400:
+                failed = True
+            else:
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    event = json.loads(line[6:])
+                    if event.get("type") == "error":
+                        failed = True
+                    elif first_token is None and event.get("type", "").startswith("messages"):
+                        first_token = time.perf_counter() - start
+    except httpx.HTTPError:
+        failed = True
+
+    if failed:
+        stats.record("stream", None)
+        return
+    stats.record("stream", time.perf_counter() - start)
+    if first_token is not None:
+        stats.ttft.append(first_token)
+
+
+async def admin_dashboard(client: httpx.AsyncClient, users: int, iterations: int, identities: VirtualUsers) -> Stats:
+    """Admins repeatedly loading the thread list and opening a thread"""
+    stats = Stats("admin_dashboard")
+
+    async def admin(index: int) -> None:
+        headers = identities.headers(f"loadtest-admin-{index}", f"admin-{index}@example.com", role="admin")
+        for iteration in range(iterations):
+            response = await stats.timed("list_threads", lambda: client.get("/api/admin/threads", headers=headers))
+            threads = response.json() if response is not None else []
+            if threads:
+                thread_id = threads[(index + iteration) % len(threads)]["id"]
+                await stats.timed(
+                    "thread_details", lambda: client.get(f"/api/admin/threads/{thread_id}", headers=headers)
+                )
+
+    return await run_users(stats, users, admin)
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    """Human-readable table of scenario summaries"""
+    lines = []
+    for result in results:
+        lines.append(f"\n== {result['scenario']} ({result['duration_s']}s)")
+        lines.append(f"{'operation':<20} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        for operation, row in result["operations"].items():
+            lines.append(
+                f"{operation:<20} {row['requests']:>9} {row['errors']:>7} {row['throughput_rps']:>9} "
+                f"{_fmt(row['p50_ms']):>9} {_fmt(row['p99_ms']):>9}"
+            )
+        ttft = result.get("time_to_first_token")
+        if ttft:
+            lines.append(
+                f"time to first token: p50 {_fmt(ttft['p50_ms'])} ms, p99 {_fmt(ttft['p99_ms'])} ms "
+                f"over {ttft['streams']} streams"
+            )
+    return "\n".join(lines)
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
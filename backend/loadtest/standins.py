@@ -0,0 +1,272 @@
+"""
+Local stand-ins for the upstream services the backend talks to.
+
+- LangGraph: the `threads` endpoints and `runs/stream` used by
+  LangGraphClient, with a configurable token rate and latency
+- Supabase: the PostgREST tables (beta_emails, beta_requests) and the
+  GoTrue admin users endpoint used by SupabaseClient
+- Assistant Cloud: the token-minting endpoint
+
+Every stand-in shares an UpstreamBehavior: added latency with jitter, and
+fault injection (a fraction of requests fail with a given status code or
+hang until the client gives up) for exercising retries and the breaker.
+"""
+
+import asyncio
+import json
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class UpstreamBehavior:
+    latency: float = 0.02  # seconds added to every request
+    jitter: float = 0.01  # +/- seconds of uniform noise on the latency
+    error_rate: float = 0.0  # fraction of requests failing with error_status
+    error_status: int = 503
+    hang_rate: float = 0.0  # fraction of requests that never answer
+
+    async def apply(self) -> Optional[Response]:
+        """Wait out the configured latency; return an error response if one is injected"""
+        delay = max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+        if delay:
+            await asyncio.sleep(delay)
+        if self.hang_rate and random.random() < self.hang_rate:
+            await asyncio.sleep(3600)
+        if self.error_rate and random.random() < self.error_rate:
+            return JSONResponse({"detail": "injected fault"}, status_code=self.error_status)
+        return None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# LangGraph
+
+@dataclass
+class LangGraphBehavior(UpstreamBehavior):
+    tokens_per_response: int = 60
+    tokens_per_second: float = 50.0  # 0 streams all tokens at once
+    first_token_latency: float = 0.3  # model "thinking" time before the first token
+
+
+def create_langgraph_app(behavior: LangGraphBehavior) -> FastAPI:
+    app = FastAPI(title="LangGraph stand-in")
+    threads: Dict[str, Dict[str, Any]] = {}
+
+    def new_thread(metadata: Dict[str, Any], thread_id: Optional[str] = None) -> Dict[str, Any]:
+        thread_id = thread_id or str(uuid.uuid4())
+        thread = {
+            "thread_id": thread_id,
+            "created_at": _now(),
+            "updated_at": _now(),
+            "metadata": metadata,
+            "status": "idle",
+            "values": {"messages": []},
+        }
+        threads[thread_id] = thread
+        return thread
+
+    @app.post("/threads")
+    async def create_thread(request: Request):
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        body = await request.json()
+        thread_id = body.get("thread_id")
+        if thread_id in threads:
+            if body.get("if_exists") == "do_nothing":
+                return threads[thread_id]
+            return JSONResponse({"detail": "Thread already exists"}, status_code=409)
+        return new_thread(body.get("metadata") or {}, thread_id)
+
+    @app.patch("/threads/{thread_id}")
+    async def update_thread(thread_id: str, request: Request):
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        thread = threads.get(thread_id)
+        if thread is None:
+            return JSONResponse({"detail": "Thread not found"}, status_code=404)
+        body = await request.json()
+        thread["metadata"].update(body.get("metadata") or {})
+        thread["updated_at"] = _now()
+        return thread
+
+    @app.get("/threads/{thread_id}/state")
+    async def get_state(thread_id: str):
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        thread = threads.get(thread_id)
+        if thread is None:
+            return JSONResponse({"detail": "Thread not found"}, status_code=404)
+        return {
+            "values": thread["values"],
+            "next": [],
+            "checkpoint": {"thread_id": thread_id, "checkpoint_ns": "", "checkpoint_id": str(uuid.uuid4())},
+            "metadata": thread["metadata"],
+            "created_at": thread["updated_at"],
+            "parent_checkpoint": None,
+            "tasks": [],
+        }
+
+    @app.post("/threads/{thread_id}/state")
+    async def update_state(thread_id: str, request: Request):
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        thread = threads.get(thread_id)
+        if thread is None:
+            return JSONResponse({"detail": "Thread not found"}, status_code=404)
+        body = await request.json()
+        # Values replace whole channels; the real server would run reducers
+        thread["values"].update(body.get("values") or {})
+        thread["updated_at"] = _now()
+        return {"checkpoint": {"thread_id": thread_id, "checkpoint_ns": "", "checkpoint_id": str(uuid.uuid4())}}
+
+    @app.delete("/threads/{thread_id}")
+    async def delete_thread(thread_id: str):
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        if threads.pop(thread_id, None) is None:
+            return JSONResponse({"detail": "Thread not found"}, status_code=404)
+        return Response(status_code=204)
+
+    @app.post("/threads/search")
+    async def search_threads(request: Request):
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        body = await request.json()
+        metadata = body.get("metadata") or {}
+        limit = body.get("limit") or 10
+        select = body.get("select")
+        matched: List[Dict[str, Any]] = []
+        for thread in reversed(list(threads.values())):
+            if all(thread["metadata"].get(key) == value for key, value in metadata.items()):
+                matched.append({key: thread[key] for key in select} if select else thread)
+                if len(matched) >= limit:
+                    break
+        return matched
+
+    @app.post("/threads/{thread_id}/runs/stream")
+    async def stream_run(thread_id: str, request: Request):
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        thread = threads.get(thread_id)
+        if thread is None:
+            return JSONResponse({"detail": "Thread not found"}, status_code=404)
+        body = await request.json()
+        run_id = str(uuid.uuid4())
+        message_id = f"run-{run_id}"
+
+        async def events():
+            yield f"event: metadata\ndata: {json.dumps({'run_id': run_id})}\n\n"
+            await asyncio.sleep(behavior.first_token_latency)
+            delay = 1.0 / behavior.tokens_per_second if behavior.tokens_per_second else 0.0
+            tokens = []
+            for i in range(behavior.tokens_per_response):
+                token = f"tok{i} "
+                tokens.append(token)
+                chunk = {"type": "AIMessageChunk", "id": message_id, "content": token}
+                yield f"event: messages\ndata: {json.dumps([chunk, {'run_id': run_id}])}\n\n"
+                if delay:
+                    await asyncio.sleep(delay)
+
+            # Persist the exchange like a real run would
+            thread["values"]["messages"].extend((body.get("input") or {}).get("messages", []))
+            thread["values"]["messages"].append({"type": "ai", "id": message_id, "content": "".join(tokens)})
+            thread["updated_at"] = _now()
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+# Supabase
+
+def create_supabase_app(behavior: UpstreamBehavior, beta_emails: List[str]) -> FastAPI:
+    """
+    PostgREST tables under /rest/v1 and GoTrue admin users under /auth/v1.
+    Only the query shapes SupabaseClient issues are supported (`col=eq.value`).
+    """
+    app = FastAPI(title="Supabase stand-in")
+    tables: Dict[str, List[Dict[str, Any]]] = {
+        "beta_emails": [{"email": email} for email in beta_emails],
+        "beta_requests": [],
+    }
+    users = [
+        {
+            "id": str(uuid.uuid4()),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": email,
+            "email_confirmed_at": _now(),
+            "app_metadata": {},
+            "user_metadata": {},
+            "created_at": _now(),
+        }
+        for email in beta_emails[: len(beta_emails) // 2]
+    ]
+
+    @app.get("/rest/v1/{table}")
+    async def select_rows(table: str, request: Request):
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        rows = tables.get(table)
+        if rows is None:
+            return JSONResponse({"message": f"relation {table} does not exist"}, status_code=404)
+        filters = {
+            key: value[3:] for key, value in request.query_params.items()
+            if key != "select" and value.startswith("eq.")
+        }
+        return [row for row in rows if all(str(row.get(k)) == v for k, v in filters.items())]
+
+    @app.post("/rest/v1/{table}")
+    async def insert_rows(table: str, request: Request):
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        rows = tables.get(table)
+        if rows is None:
+            return JSONResponse({"message": f"relation {table} does not exist"}, status_code=404)
+        body = await request.json()
+        new_rows = body if isinstance(body, list) else [body]
+        rows.extend(new_rows)
+        return JSONResponse(new_rows, status_code=201)
+
+    @app.get("/auth/v1/admin/users")
+    async def list_users():
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        return {"users": users, "aud": "authenticated"}
+
+    return app
+
+
+# Assistant Cloud
+
+def create_assistant_cloud_app(behavior: UpstreamBehavior) -> FastAPI:
+    app = FastAPI(title="Assistant Cloud stand-in")
+
+    @app.post("/v1/auth/tokens")
+    async def create_token(request: Request):
+        fault = await behavior.apply()
+        if fault:
+            return fault
+        user_id = request.headers.get("aui-user-id", "")
+        return {"token": f"aui-{user_id}-{uuid.uuid4().hex}"}
+
+    return app
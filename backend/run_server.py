@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 
-import uvicorn
 import logging
-from app.main import app
+
 from app.core.config import settings
+from app.core.server import serve
 
 logger = logging.getLogger(__name__)
 
@@ -13,13 +13,8 @@ if __name__ == "__main__":
         extra={
             "host": settings.server_host, 
             "port": settings.server_port,
-            "environment": settings.environment
+            "environment": settings.environment,
+            "workers": settings.server_workers
         }
     )
-    uvicorn.run(
-        app, 
-        host=settings.server_host, 
-        port=settings.server_port, 
-        reload=settings.server_reload,
-        log_level=settings.log_level.lower()
-    ) 
\ No newline at end of file
+    serve(settings)
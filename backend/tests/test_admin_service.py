@@ -0,0 +1,210 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.services import admin_service as admin_module
+from app.services.admin_service import AdminService
+from app.services.cold_storage import ColdThreadStore
+from app.services.message_archive import MessageArchive
+
+
+class _FakeLangGraph:
+    def __init__(self, threads: List[Dict[str, Any]]) -> None:
+        self.threads = {t["thread_id"]: t for t in threads}
+        self.deleted: List[str] = []
+        self.search_limits: List[Optional[int]] = []
+        self.failing: set = set()
+        self.updates: List[Dict[str, Any]] = []
+        self.fail_updates = False
+
+    async def search_threads(
+        self,
+        limit: Optional[int] = None,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        select: Optional[List[str]] = None,
+        sort_by: Optional[str] = None,
+        sort_order: Optional[str] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        self.search_limits.append(limit)
+        matched = [
+            t for t in self.threads.values()
+            if all((t.get("metadata") or {}).get(k) == v for k, v in (metadata_filter or {}).items())
+        ]
+        return matched[offset:][:limit]
+
+    async def update_thread_state(
+        self, thread_id: str, values: Dict[str, Any], as_node: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if self.fail_updates:
+            raise RuntimeError("upstream unavailable")
+        self.updates.append(values)
+        return {}
+
+    async def delete_thread(self, thread_id: str) -> None:
+        if thread_id in self.failing:
+            raise RuntimeError("upstream unavailable")
+        self.threads.pop(thread_id)
+        self.deleted.append(thread_id)
+
+
+def _thread(thread_id: str, days_idle: float = 0, **fields: Any) -> Dict[str, Any]:
+    updated = datetime.now(timezone.utc) - timedelta(days=days_idle)
+    return {
+        "thread_id": thread_id,
+        "status": "idle",
+        "updated_at": updated.isoformat(),
+        "metadata": {"user_id": "user-1"},
+        "values": {"messages": []},
+        **fields,
+    }
+
+
+@pytest.fixture
+def cold_store(tmp_path, monkeypatch: pytest.MonkeyPatch) -> ColdThreadStore:
+    store = ColdThreadStore(str(tmp_path / "cold"))
+    monkeypatch.setattr(admin_module, "cold_thread_store", store)
+    return store
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch: pytest.MonkeyPatch) -> MessageArchive:
+    store = MessageArchive(str(tmp_path / "archive"))
+    monkeypatch.setattr(admin_module, "message_archive", store)
+    return store
+
+
+def _conversation(turns: int) -> List[Dict[str, Any]]:
+    messages = [{"type": "system", "id": "sys", "content": "You are helpful."}]
+    for turn in range(turns):
+        messages.append({"type": "human", "id": f"h{turn}", "content": f"question {turn}"})
+        messages.append({"type": "ai", "id": f"a{turn}", "content": f"answer {turn}"})
+    return messages
+
+
+def test_compaction_archives_old_turns_and_shifts_summarized_count(archive: MessageArchive) -> None:
+    client = _FakeLangGraph([])
+    values = {"messages": _conversation(3)}
+
+    result = asyncio.run(AdminService(client)._compact_values("t1", values, keep_turns=1, admin_user_id="admin"))
+
+    assert (result.archived_messages, result.kept_messages) == (4, 3)
+    update = client.updates[0]
+    assert [m["id"] for m in update["messages"]] == ["h0", "a0", "h1", "a1"]
+    assert all(m["type"] == "remove" for m in update["messages"])
+    assert update["archive"]["message_count"] == 4
+    assert [s["id"] for s in update["archive"]["segments"]] == [result.segment_id]
+    assert "question 0; question 1" in update["summary"]
+    # The boundary message (index 5) lands at index 1 once four are removed
+    assert update["summarized_count"] == 1
+    stored = asyncio.run(archive.load("t1", [result.segment_id]))
+    assert [m["id"] for m in stored] == ["h0", "a0", "h1", "a1"]
+
+
+def test_compaction_extends_an_existing_archive(archive: MessageArchive) -> None:
+    client = _FakeLangGraph([])
+    values = {
+        "messages": _conversation(3),
+        "archive": {"segments": [{"id": "earlier", "message_count": 2}], "message_count": 2},
+        "summary": "Earlier summary.",
+        # Already summarized past the compaction boundary
+        "summarized_count": 6,
+    }
+
+    asyncio.run(AdminService(client)._compact_values("t1", values, keep_turns=1, admin_user_id="admin"))
+
+    update = client.updates[0]
+    assert update["archive"]["message_count"] == 6
+    assert update["archive"]["segments"][0]["id"] == "earlier"
+    assert len(update["archive"]["segments"]) == 2
+    assert update["summary"] == "Earlier summary."
+    assert update["summarized_count"] == 2
+
+
+def test_compaction_skips_short_threads_and_discards_segment_on_failure(archive: MessageArchive) -> None:
+    client = _FakeLangGraph([])
+    service = AdminService(client)
+
+    skipped = asyncio.run(service._compact_values("t1", {"messages": _conversation(1)}, 1, "admin"))
+    assert skipped.archived_messages == 0
+    assert client.updates == []
+
+    client.fail_updates = True
+    with pytest.raises(RuntimeError):
+        asyncio.run(service._compact_values("t1", {"messages": _conversation(3)}, 1, "admin"))
+    assert os.listdir(os.path.join(archive.root, "t1")) == []
+
+
+def test_archive_skips_threads_without_a_usable_timestamp(cold_store: ColdThreadStore) -> None:
+    missing = _thread("missing", days_idle=200)
+    del missing["updated_at"]
+    client = _FakeLangGraph([
+        _thread("old", days_idle=200),
+        _thread("recent", days_idle=1),
+        missing,
+        _thread("garbled", updated_at="last tuesday"),
+    ])
+
+    result = asyncio.run(AdminService(client).archive_idle_threads(idle_days=90))
+
+    assert result.matched == 1
+    assert result.archived == 1
+    assert client.deleted == ["old"]
+    assert cold_store.contains("old")
+
+
+def _owned(count: int, user_id: str) -> List[Dict[str, Any]]:
+    return [_thread(f"{user_id}-{i}", metadata={"user_id": user_id}) for i in range(count)]
+
+
+def test_bulk_delete_by_ids_reports_each_result() -> None:
+    client = _FakeLangGraph(_owned(3, "user-1"))
+    client.failing.add("user-1-1")
+
+    result = asyncio.run(
+        AdminService(client).bulk_delete_threads(thread_ids=["user-1-0", "user-1-1"])
+    )
+
+    assert (result.matched, result.deleted, result.failed) == (2, 1, 1)
+    assert not result.truncated
+    assert client.deleted == ["user-1-0"]
+    assert "user-1-2" in client.threads
+
+
+def test_bulk_delete_by_filter_only_touches_matching_threads() -> None:
+    client = _FakeLangGraph(_owned(2, "user-1") + _owned(2, "user-2"))
+
+    dry = asyncio.run(
+        AdminService(client).bulk_delete_threads(metadata_filter={"user_id": "user-1"}, dry_run=True)
+    )
+    assert (dry.matched, dry.deleted) == (2, 0)
+    assert client.deleted == []
+
+    result = asyncio.run(
+        AdminService(client).bulk_delete_threads(metadata_filter={"user_id": "user-1"})
+    )
+    assert (result.matched, result.deleted) == (2, 2)
+    assert sorted(client.deleted) == ["user-1-0", "user-1-1"]
+
+
+def test_bulk_delete_by_filter_pages_and_reports_truncation(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(admin_module, "SEARCH_PAGE_SIZE", 2)
+    monkeypatch.setattr(admin_module.settings, "bulk_delete_max_threads", 3)
+    client = _FakeLangGraph(_owned(5, "user-1"))
+    service = AdminService(client)
+
+    dry = asyncio.run(service.bulk_delete_threads(metadata_filter={"user_id": "user-1"}, dry_run=True))
+    assert dry.matched == 5
+    assert dry.truncated
+
+    result = asyncio.run(service.bulk_delete_threads(metadata_filter={"user_id": "user-1"}))
+    assert (result.matched, result.deleted) == (5, 3)
+    assert result.truncated
+    assert client.deleted == ["user-1-0", "user-1-1", "user-1-2"]
+
+    rest = asyncio.run(service.bulk_delete_threads(metadata_filter={"user_id": "user-1"}))
+    assert (rest.matched, rest.deleted) == (2, 2)
+    assert not rest.truncated
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from app.services.cold_storage import ColdThreadStore
+
+
+def _record(thread_id: str) -> dict:
+    return {
+        "thread_id": thread_id,
+        "metadata": {"user_id": "user-1"},
+        "values": {"messages": [{"type": "human", "content": "hello"}]},
+    }
+
+
+def test_put_contains_get_remove_round_trip(tmp_path) -> None:
+    store = ColdThreadStore(str(tmp_path))
+
+    sizes = store.put_many([_record("t1"), _record("t2")])
+
+    assert set(sizes) == {"t1", "t2"}
+    assert store.contains("t1")
+    assert store.get("t1")["values"] == _record("t1")["values"]
+    assert store.entries()["t2"]["user_id"] == "user-1"
+
+    store.remove("t1")
+
+    assert not store.contains("t1")
+    assert store.get("t1") is None
+    assert store.contains("t2")
+
+
+def test_writes_from_another_process_show_up_after_refresh(tmp_path) -> None:
+    reader = ColdThreadStore(str(tmp_path))
+    writer = ColdThreadStore(str(tmp_path))
+    reader.refresh()
+
+    writer.put_many([_record("t1")])
+    assert not reader.contains("t1")
+
+    reader.refresh()
+    assert reader.contains("t1")
+
+
+def test_contains_does_not_wait_for_a_writer(tmp_path) -> None:
+    store = ColdThreadStore(str(tmp_path))
+    store.put_many([_record("t1")])
+    release = threading.Event()
+
+    def slow_writer() -> None:
+        with store._write_lock():
+            release.wait(5)
+
+    writer = threading.Thread(target=slow_writer)
+    writer.start()
+    try:
+        started = time.perf_counter()
+        for _ in range(100):
+            assert store.contains("t1")
+        assert time.perf_counter() - started < 0.5
+    finally:
+        release.set()
+        writer.join()
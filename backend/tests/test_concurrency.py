@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.core.concurrency import ConcurrencyGovernor
+from app.core.exceptions import RateLimitError, ServiceUnavailableError
+
+
+def _governor(global_limit: int = 2, per_user_limit: int = 1, max_queue: int = 1) -> ConcurrencyGovernor:
+    return ConcurrencyGovernor(
+        name="test_governor",
+        global_limit=global_limit,
+        per_user_limit=per_user_limit,
+        max_queue=max_queue,
+        queue_timeout=0.05
+    )
+
+
+def test_per_user_limit_rejects_without_taking_a_global_slot() -> None:
+    async def test() -> None:
+        governor = _governor()
+        lease = await governor.acquire("user-1")
+
+        with pytest.raises(RateLimitError):
+            await governor.acquire("user-1")
+        other = await governor.acquire("user-2")
+
+        assert governor.active == 2
+        lease.release()
+        other.release()
+        assert governor.active == 0
+
+    asyncio.run(test())
+
+
+def test_queue_overflow_and_timeout_are_rejected() -> None:
+    async def test() -> None:
+        governor = _governor(global_limit=1, max_queue=1)
+        lease = await governor.acquire("user-1")
+
+        queued = asyncio.ensure_future(governor.acquire("user-2"))
+        await asyncio.sleep(0)
+        assert governor.queue_depth == 1
+        with pytest.raises(ServiceUnavailableError) as overflow:
+            await governor.acquire("user-3")
+        assert overflow.value.context["reason"] == "queue_full"
+
+        with pytest.raises(ServiceUnavailableError) as timeout:
+            await queued
+        assert timeout.value.context["reason"] == "queue_timeout"
+        assert governor.queue_depth == 0
+        assert governor.active == 1
+
+        lease.release()
+        (await governor.acquire("user-3")).release()
+
+    asyncio.run(test())
+
+
+def test_release_is_idempotent() -> None:
+    async def test() -> None:
+        governor = _governor(global_limit=1)
+        lease = await governor.acquire("user-1")
+
+        lease.release()
+        lease.release()
+
+        assert governor.active == 0
+        assert governor._global._value == 1
+
+    asyncio.run(test())
+
+
+def test_queued_waiter_gets_the_released_slot() -> None:
+    async def test() -> None:
+        governor = _governor(global_limit=1)
+        lease = await governor.acquire("user-1")
+        queued = asyncio.ensure_future(governor.acquire("user-2"))
+        await asyncio.sleep(0)
+
+        lease.release()
+        (await queued).release()
+
+        assert governor.active == 0
+        assert governor._global._value == 1
+
+    asyncio.run(test())
+
+
+def test_abandoned_wait_does_not_leak_a_slot() -> None:
+    async def test() -> None:
+        governor = _governor(global_limit=1)
+        lease = await governor.acquire("user-1")
+        queued = asyncio.ensure_future(governor.acquire("user-2"))
+        await asyncio.sleep(0)
+
+        # The slot is handed to the waiter in the same iteration it is cancelled
+        lease.release()
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+
+        assert governor.active == 0
+        assert governor._global._value == 1
+        (await governor.acquire("user-3")).release()
+
+    asyncio.run(test())
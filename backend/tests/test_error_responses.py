@@ -0,0 +1,76 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from app.core.error_responses import COMMON_ERRORS, error_body
+from app.core.exceptions import new_correlation_id, utc_timestamp
+from app.models.error import ErrorResponse
+
+
+def test_correlation_ids_are_unique_uuid4() -> None:
+    ids = {new_correlation_id() for _ in range(1000)}
+
+    assert len(ids) == 1000
+    for value in list(ids)[:50]:
+        parsed = uuid.UUID(value)
+        assert str(parsed) == value
+        assert parsed.version == 4
+        assert parsed.variant == uuid.RFC_4122
+
+
+def test_utc_timestamp_matches_isoformat() -> None:
+    for epoch in (0.0, 1700000000.5, 1700000000.123456, 1700000001.0):
+        expected = datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat(timespec="microseconds")
+        assert utc_timestamp(epoch) == expected
+
+
+@pytest.mark.parametrize("status_code,error,message", COMMON_ERRORS)
+def test_spliced_bodies_match_the_error_model(status_code: int, error: str, message: str) -> None:
+    correlation_id = new_correlation_id()
+    timestamp = utc_timestamp()
+
+    body = json.loads(error_body(status_code, error, message, correlation_id, timestamp))
+
+    assert body == ErrorResponse(
+        error=error, message=message, correlation_id=correlation_id, timestamp=timestamp, status_code=status_code
+    ).model_dump()
+
+
+def test_body_with_details_and_an_unusual_correlation_id() -> None:
+    body = json.loads(error_body(
+        400, "VALIDATION_ERROR", "Bad", 'caller "id"\n', "2024-01-01T00:00:00.000000",
+        details={"field": "email"}
+    ))
+
+    assert body["correlation_id"] == 'caller "id"\n'
+    assert body["details"] == {"field": "email"}
+    ErrorResponse.model_validate(body)
+
+
+def _request(method: str, path: str) -> httpx.Response:
+    from app.main import app
+
+    async def run() -> httpx.Response:
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend") as client:
+            return await client.request(method, path)
+
+    return asyncio.run(run())
+
+
+def test_routing_errors_use_the_error_shape() -> None:
+    missing = _request("GET", "/no-such-route")
+    wrong_method = _request("DELETE", "/health")
+
+    assert missing.status_code == 404
+    body = ErrorResponse.model_validate(missing.json())
+    assert (body.error, body.message, body.status_code) == ("HTTP_ERROR", "Not Found", 404)
+    assert uuid.UUID(body.correlation_id).version == 4
+
+    assert wrong_method.status_code == 405
+    assert ErrorResponse.model_validate(wrong_method.json()).message == "Method Not Allowed"
+    assert "GET" in wrong_method.headers["allow"]
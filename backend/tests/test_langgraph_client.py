@@ -0,0 +1,191 @@
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+from langgraph_sdk.client import LangGraphClient as SDKClient
+
+from app.core.cache import SingleFlight
+from app.core.exceptions import ExternalServiceError
+from app.services.cold_storage import ColdThreadStore
+from app.services import langgraph_client as langgraph_module
+from app.services.langgraph_client import LangGraphClient
+from loadtest.standins import LangGraphBehavior, create_langgraph_app
+
+
+class _LostResponseTransport(httpx.AsyncBaseTransport):
+    """Forward to the stand-in, but drop the response of the first DELETE after it was handled"""
+
+    def __init__(self, app: Any) -> None:
+        self._transport = httpx.ASGITransport(app=app)
+        self.deletes = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        if request.method == "DELETE":
+            self.deletes += 1
+            if self.deletes == 1:
+                raise httpx.ReadError("connection reset", request=request)
+        return response
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """Forward to the stand-in, counting thread state reads"""
+
+    def __init__(self, app: Any) -> None:
+        self._transport = httpx.ASGITransport(app=app)
+        self.state_reads = 0
+        self.creates = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET" and request.url.path.endswith("/state"):
+            self.state_reads += 1
+        if request.method == "POST" and request.url.path == "/threads":
+            self.creates += 1
+        return await self._transport.handle_async_request(request)
+
+
+def _client(transport: httpx.AsyncBaseTransport) -> LangGraphClient:
+    client = LangGraphClient()
+    client.client = SDKClient(httpx.AsyncClient(transport=transport, base_url="http://langgraph"))
+    return client
+
+
+def _behavior() -> LangGraphBehavior:
+    return LangGraphBehavior(
+        latency=0.0, jitter=0.0, tokens_per_response=2, tokens_per_second=0.0, first_token_latency=0.0
+    )
+
+
+@pytest.fixture
+def state_cache(monkeypatch: pytest.MonkeyPatch):
+    cache = langgraph_module.thread_state_cache
+    monkeypatch.setattr(cache, "ttl", 60.0)
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+def test_delete_retry_finding_thread_gone_is_success() -> None:
+    transport = _LostResponseTransport(create_langgraph_app(_behavior()))
+    client = _client(transport)
+
+    async def run() -> None:
+        thread = await client.client.threads.create()
+        await client.delete_thread(thread["thread_id"])
+
+    asyncio.run(run())
+
+    assert transport.deletes == 2
+
+
+def test_delete_of_unknown_thread_still_fails() -> None:
+    client = _client(httpx.ASGITransport(app=create_langgraph_app(_behavior())))
+
+    with pytest.raises(ExternalServiceError):
+        asyncio.run(client.delete_thread("missing"))
+
+
+def test_single_flight_coalesces_concurrent_calls() -> None:
+    flight = SingleFlight("test_flight")
+    calls = 0
+
+    async def fetch() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "state"
+
+    async def run() -> None:
+        first = asyncio.ensure_future(flight.do("t1", fetch))
+        second = asyncio.ensure_future(flight.do("t1", fetch))
+        other = asyncio.ensure_future(flight.do("t2", fetch))
+        await asyncio.sleep(0)
+        # A caller going away does not cancel the shared call
+        first.cancel()
+
+        assert await second == "state"
+        assert await other == "state"
+        assert first.cancelled()
+
+    asyncio.run(run())
+
+    assert calls == 2
+
+
+def test_thread_state_is_cached_until_a_run_ends(state_cache) -> None:
+    transport = _CountingTransport(create_langgraph_app(_behavior()))
+    client = _client(transport)
+
+    async def run() -> None:
+        thread_id = (await client.client.threads.create())["thread_id"]
+        await asyncio.gather(*(client.get_thread_state(thread_id) for _ in range(3)))
+        await client.get_thread_state(thread_id)
+        assert transport.state_reads == 1
+
+        async for _ in client.stream_messages(thread_id, [{"type": "human", "content": "hi"}]):
+            pass
+        state = await client.get_thread_state(thread_id)
+
+        assert transport.state_reads == 2
+        assert [m["type"] for m in state["values"]["messages"]] == ["human", "ai"]
+
+    asyncio.run(run())
+
+
+def test_update_and_delete_invalidate_cached_state(state_cache) -> None:
+    transport = _CountingTransport(create_langgraph_app(_behavior()))
+    client = _client(transport)
+
+    async def run() -> None:
+        thread_id = (await client.client.threads.create())["thread_id"]
+        await client.get_thread_state(thread_id)
+
+        await client.update_thread_state(thread_id, {"summary": "earlier chat"})
+        state = await client.get_thread_state(thread_id)
+        assert state["values"]["summary"] == "earlier chat"
+        assert transport.state_reads == 2
+
+        await client.delete_thread(thread_id)
+        assert len(state_cache) == 0
+        with pytest.raises(ExternalServiceError):
+            await client.get_thread_state(thread_id)
+
+    asyncio.run(run())
+
+
+def test_state_fetched_across_an_invalidation_is_not_cached(state_cache) -> None:
+    transport = _CountingTransport(create_langgraph_app(_behavior()))
+    client = _client(transport)
+
+    async def run() -> None:
+        thread_id = (await client.client.threads.create())["thread_id"]
+        fetch = asyncio.ensure_future(client.get_thread_state(thread_id))
+        await asyncio.sleep(0)
+        langgraph_module.invalidate_thread_state(thread_id)
+        await fetch
+
+        assert len(state_cache) == 0
+
+    asyncio.run(run())
+
+
+def test_archived_thread_is_restored_once_on_first_read(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    store = ColdThreadStore(str(tmp_path))
+    monkeypatch.setattr(langgraph_module, "cold_thread_store", store)
+    messages = [{"type": "human", "id": "h0", "content": "hello"}, {"type": "ai", "id": "a0", "content": "hi"}]
+    store.put_many([{"thread_id": "archived-1", "metadata": {"user_id": "user-1"}, "values": {"messages": messages}}])
+    transport = _CountingTransport(create_langgraph_app(_behavior()))
+    client = _client(transport)
+
+    async def run() -> None:
+        states = await asyncio.gather(*(client.get_thread_state("archived-1") for _ in range(3)))
+        assert all(state["values"]["messages"] == messages for state in states)
+        assert transport.creates == 1
+        assert not store.contains("archived-1")
+
+        assert not await client.restore_if_archived("archived-1")
+        found = await client.search_threads(metadata_filter={"user_id": "user-1"}, select=["thread_id"])
+        assert found == [{"thread_id": "archived-1"}]
+
+    asyncio.run(run())
@@ -0,0 +1,35 @@
+import io
+import logging
+import sys
+
+import pytest
+
+from app.core.log_handlers import StdoutHandler
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.makeLogRecord({"msg": message, "levelno": logging.WARNING, "levelname": "WARNING"})
+
+
+def test_stdout_handler_follows_the_current_stdout(monkeypatch: pytest.MonkeyPatch) -> None:
+    handler = StdoutHandler()
+    first, second = io.StringIO(), io.StringIO()
+
+    monkeypatch.setattr(sys, "stdout", first)
+    handler.emit(_record("one"))
+    monkeypatch.setattr(sys, "stdout", second)
+    handler.emit(_record("two"))
+
+    assert first.getvalue() == "one\n"
+    assert second.getvalue() == "two\n"
+
+
+def test_stdout_handler_skips_a_closed_stdout(monkeypatch: pytest.MonkeyPatch) -> None:
+    closed = io.StringIO()
+    closed.close()
+    monkeypatch.setattr(sys, "stdout", closed)
+    handler = StdoutHandler()
+    handler.handleError = lambda record: pytest.fail("emit raised")
+
+    handler.emit(_record("lost"))
+    handler.flush()
@@ -0,0 +1,19 @@
+import os
+
+from app.core.metrics import MetricsRegistry, metrics
+
+
+def test_samples_are_labelled_with_the_worker() -> None:
+    registry = MetricsRegistry(const_labels={"worker": "42"})
+    registry.counter("requests_total", "Requests", ["route"]).inc(route="/health")
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1,)).observe(0.05)
+
+    text = registry.render_prometheus()
+
+    assert 'requests_total{route="/health",worker="42"} 1' in text
+    assert 'latency_seconds_bucket{worker="42",le="0.1"} 1' in text
+    assert registry.snapshot()["requests_total"]["samples"][0]["labels"] == {"route": "/health", "worker": "42"}
+
+
+def test_global_registry_uses_the_process_id() -> None:
+    assert metrics.const_labels == {"worker": str(os.getpid())}
@@ -0,0 +1,24 @@
+from app.core.profiling import ProfileStore
+
+
+def test_profiles_written_by_one_worker_are_read_by_another(tmp_path) -> None:
+    writer = ProfileStore(max_profiles=2, directory=str(tmp_path))
+    reader = ProfileStore(max_profiles=2, directory=str(tmp_path))
+
+    for number in range(3):
+        writer.add(f"p{number}", f"main;handler {number}\n", route="/api/threads")
+
+    assert [entry["profile_id"] for entry in reader.list()] == ["p2", "p1"]
+    assert reader.get("p2")["folded"] == "main;handler 2\n"
+    assert reader.get("p0") is None
+
+
+def test_in_memory_store_keeps_the_newest() -> None:
+    store = ProfileStore(max_profiles=1)
+
+    store.add("a", "x 1\n")
+    store.add("b", "y 1\n")
+
+    assert store.get("a") is None
+    assert [entry["profile_id"] for entry in store.list()] == ["b"]
+    assert "folded" not in store.list()[0]
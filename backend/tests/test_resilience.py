@@ -0,0 +1,203 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+import httpx
+import pytest
+
+from app.core import resilience
+from app.core.exceptions import ServiceUnavailableError
+from app.core.resilience import CircuitBreaker, RetryPolicy, call_with_retry
+from loadtest.standins import LangGraphBehavior, create_langgraph_app
+
+
+def _behavior(**kwargs: Any) -> LangGraphBehavior:
+    return LangGraphBehavior(**{"latency": 0.0, "jitter": 0.0, **kwargs})
+
+
+def _run(behavior: LangGraphBehavior, test: Callable[[httpx.AsyncClient], Awaitable[Any]]) -> Any:
+    """Run `test` with an HTTP client talking to the fault-injecting LangGraph stand-in"""
+    async def run() -> Any:
+        transport = httpx.ASGITransport(app=create_langgraph_app(behavior))
+        async with httpx.AsyncClient(transport=transport, base_url="http://langgraph") as http:
+            return await test(http)
+
+    return asyncio.run(run())
+
+
+def _search(http: httpx.AsyncClient, calls: list) -> Callable[[], Awaitable[Any]]:
+    async def search() -> Any:
+        calls.append(1)
+        response = await http.post("/threads/search", json={})
+        response.raise_for_status()
+        return response.json()
+    return search
+
+
+def _retry(fn: Callable[[], Awaitable[Any]], breaker: CircuitBreaker, **kwargs: Any) -> Awaitable[Any]:
+    return call_with_retry(
+        fn,
+        service="langgraph",
+        operation="search_threads",
+        breaker=breaker,
+        policy=RetryPolicy(attempts=3, base_delay=0.0),
+        **kwargs
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list:
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_consecutive_failures(clock: list) -> None:
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=30.0)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(ServiceUnavailableError):
+        breaker.before_call()
+
+
+def test_breaker_success_resets_failure_count(clock: list) -> None:
+    breaker = CircuitBreaker("test", failure_threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_probe_closes_on_success(clock: list) -> None:
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=30.0)
+    breaker.record_failure()
+
+    clock[0] += 29.0
+    with pytest.raises(ServiceUnavailableError):
+        breaker.before_call()
+
+    clock[0] += 1.0
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    with pytest.raises(ServiceUnavailableError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_breaker_half_open_probe_reopens_on_failure(clock: list) -> None:
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=30.0)
+    breaker.record_failure()
+
+    clock[0] += 30.0
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(ServiceUnavailableError):
+        breaker.before_call()
+
+
+def test_breaker_cancelled_probe_lets_another_through(clock: list) -> None:
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=30.0)
+    breaker.record_failure()
+
+    clock[0] += 30.0
+    breaker.before_call()
+    breaker.record_cancelled()
+    breaker.before_call()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_retry_recovers_from_transient_errors() -> None:
+    behavior = _behavior(error_rate=1.0, error_status=503)
+    breaker = CircuitBreaker("test", failure_threshold=5)
+    calls: list = []
+
+    async def test(http: httpx.AsyncClient) -> Any:
+        search = _search(http, calls)
+
+        async def flaky() -> Any:
+            if len(calls) == 2:
+                behavior.error_rate = 0.0
+            return await search()
+
+        return await _retry(flaky, breaker)
+
+    assert _run(behavior, test) == []
+    assert len(calls) == 3
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retry_gives_up_after_policy_attempts() -> None:
+    behavior = _behavior(error_rate=1.0, error_status=429)
+    calls: list = []
+
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        _run(behavior, lambda http: _retry(_search(http, calls), CircuitBreaker("test")))
+
+    assert exc_info.value.response.status_code == 429
+    assert len(calls) == 3
+
+
+def test_retry_does_not_retry_non_transient_errors() -> None:
+    behavior = _behavior(error_rate=1.0, error_status=404)
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    calls: list = []
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _run(behavior, lambda http: _retry(_search(http, calls), breaker))
+
+    assert len(calls) == 1
+    # A 404 means the upstream answered; it must not open the circuit
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retry_fails_fast_when_circuit_is_open() -> None:
+    behavior = _behavior(error_rate=1.0, error_status=503)
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=30.0)
+    calls: list = []
+
+    with pytest.raises(ServiceUnavailableError):
+        _run(behavior, lambda http: _retry(_search(http, calls), breaker))
+
+    assert len(calls) == 2
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_hedged_request_wins_over_slow_first_attempt() -> None:
+    behavior = _behavior()
+    calls: list = []
+
+    async def test(http: httpx.AsyncClient) -> Any:
+        search = _search(http, calls)
+
+        async def first_slow() -> Any:
+            behavior.latency = 5.0 if not calls else 0.0
+            return await search()
+
+        return await asyncio.wait_for(_retry(first_slow, CircuitBreaker("test"), hedge_delay=0.05), timeout=2.0)
+
+    assert _run(behavior, test) == []
+    assert len(calls) == 2
+
+
+def test_hedge_not_sent_for_fast_reads() -> None:
+    calls: list = []
+
+    result = _run(_behavior(), lambda http: _retry(_search(http, calls), CircuitBreaker("test"), hedge_delay=1.0))
+
+    assert result == []
+    assert len(calls) == 1
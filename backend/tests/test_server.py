@@ -0,0 +1,85 @@
+from typing import List, Optional
+
+import pytest
+
+from app.core import server
+from app.core.server import WorkerSupervisor
+
+
+class _Process:
+    def __init__(self, exitcode: Optional[int] = None) -> None:
+        self.exitcode = exitcode
+        self.name = "worker-0"
+        self.pid = 1234
+
+    def is_alive(self) -> bool:
+        return self.exitcode is None
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    now = [100.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _supervisor(spawned: List[float], clock: List[float]) -> WorkerSupervisor:
+    supervisor = WorkerSupervisor({}, workers=1)
+
+    def spawn(slot: int) -> None:
+        spawned.append(clock[0])
+        supervisor._started[slot] = clock[0]
+
+    supervisor._spawn = spawn
+    return supervisor
+
+
+def test_failed_starts_back_off_then_give_up(clock: List[float]) -> None:
+    spawned: List[float] = []
+    supervisor = _supervisor(spawned, clock)
+    supervisor._started[0] = clock[0]
+
+    delays = []
+    while not supervisor._should_exit:
+        # The worker crashes right after every start
+        supervisor._processes[0] = _Process(exitcode=1)
+        start = clock[0]
+        supervisor._replace_exited()
+        while supervisor._restart_at[0] is not None and not supervisor._should_exit:
+            clock[0] += 0.5
+            supervisor._replace_exited()
+        if not supervisor._should_exit:
+            delays.append(spawned[-1] - start)
+
+    assert delays == [1.0, 2.0, 4.0, 8.0]
+    assert supervisor.exit_code == 1
+
+
+def test_recycled_worker_is_replaced_immediately(clock: List[float]) -> None:
+    spawned: List[float] = []
+    supervisor = _supervisor(spawned, clock)
+    supervisor._started[0] = clock[0]
+    # Exit status 0: recycled after SERVER_MAX_REQUESTS, however quickly
+    supervisor._processes[0] = _Process(exitcode=0)
+
+    supervisor._replace_exited()
+
+    assert spawned == [100.0]
+    assert not supervisor._should_exit
+
+
+def test_failure_after_a_healthy_run_resets_backoff(clock: List[float]) -> None:
+    spawned: List[float] = []
+    supervisor = _supervisor(spawned, clock)
+    supervisor._failed_starts[0] = 3
+    supervisor._started[0] = clock[0]
+    clock[0] += server.MIN_WORKER_LIFETIME + 1
+    supervisor._processes[0] = _Process(exitcode=1)
+
+    supervisor._replace_exited()
+
+    assert spawned == [clock[0]]
+    assert supervisor._failed_starts[0] == 0
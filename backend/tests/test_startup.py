@@ -0,0 +1,22 @@
+import statistics
+
+from benchmarks.bench_startup import (MAX_IMPORT_RATIO, REFERENCE,
+                                      cold_import, cold_reference_import)
+
+RUNS = 3
+
+
+def test_cold_import_stays_lazy_and_within_budget() -> None:
+    timings = []
+    eager = set()
+    reference = []
+    for _ in range(RUNS):
+        seconds, loaded = cold_import()
+        timings.append(seconds)
+        eager.update(loaded)
+        reference.append(cold_reference_import())
+
+    assert not eager, f"deferred modules imported by app.main: {sorted(eager)}"
+    # Relative to the framework import in the same run, so it holds on any machine
+    ratio = statistics.median(timings) / statistics.median(reference)
+    assert ratio <= MAX_IMPORT_RATIO, f"import app.main is {ratio:.1f}x import {REFERENCE}"
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from app.core.dependencies import get_langgraph_client
+from app.main import app
+from app.models.chat import parse_send_message
+
+
+class _RecordingClient:
+    def __init__(self) -> None:
+        self.messages: List[Dict[str, Any]] = []
+
+    async def stream_messages(self, thread_id: str, messages: List[Dict[str, Any]]):
+        self.messages = messages
+        yield {"type": "end", "data": {}}
+
+
+def _post(body: Dict[str, Any]) -> "tuple[httpx.Response, _RecordingClient]":
+    client = _RecordingClient()
+    app.dependency_overrides[get_langgraph_client] = lambda: client
+
+    async def run() -> httpx.Response:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.post("/api/threads/thread-1/stream", json=body)
+
+    try:
+        return asyncio.run(run()), client
+    finally:
+        app.dependency_overrides.pop(get_langgraph_client, None)
+
+
+def test_frontend_langchain_messages_are_accepted() -> None:
+    # Shape posted by frontend/src/features/chat/api/chat-api.ts streamMessages
+    body = {
+        "messages": [
+            {"id": "m1", "type": "human", "content": [{"type": "text", "text": "hello"}]},
+            {"id": "m2", "type": "ai", "content": "hi there"},
+            {"id": "m3", "type": "human", "content": "how are you?"},
+        ]
+    }
+
+    response, client = _post(body)
+
+    assert response.status_code == 200
+    assert client.messages == [
+        {"role": "user", "content": [{"type": "text", "text": "hello"}]},
+        {"role": "assistant", "content": "hi there"},
+        {"role": "user", "content": "how are you?"},
+    ]
+
+
+def test_role_messages_pass_through() -> None:
+    request = parse_send_message(b'{"messages": [{"role": "system", "content": "be brief"}, {"content": "hi"}]}')
+
+    assert request["messages"] == [
+        {"role": "system", "content": "be brief"},
+        {"role": "user", "content": "hi"},
+    ]
+
+
+def test_malformed_body_is_rejected() -> None:
+    with pytest.raises(ValidationError):
+        parse_send_message(b'{"messages": [{"role": "robot", "content": "hi"}]}')
+
+    response, _ = _post({"messages": "not a list"})
+    assert response.status_code == 422
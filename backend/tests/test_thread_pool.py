@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.services.thread_pool import (POOL_METADATA_KEY, POOL_UNASSIGNED,
+                                      WarmThreadPool)
+
+
+class _FakeLangGraph:
+    def __init__(self) -> None:
+        self.threads: Dict[str, Dict[str, Any]] = {}
+        self.created = 0
+
+    def add(self, thread_id: str, age: float, **metadata: Any) -> None:
+        created_at = datetime.now(timezone.utc) - timedelta(seconds=age)
+        self.threads[thread_id] = {
+            "thread_id": thread_id,
+            "created_at": created_at.isoformat(),
+            "metadata": {POOL_METADATA_KEY: POOL_UNASSIGNED, **metadata},
+        }
+
+    async def create_unassigned_thread(self) -> str:
+        self.created += 1
+        thread_id = f"pool-{self.created}"
+        self.add(thread_id, age=0)
+        return thread_id
+
+    async def delete_thread(self, thread_id: str) -> None:
+        del self.threads[thread_id]
+
+    async def search_threads(
+        self,
+        limit: Optional[int] = None,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        select: Optional[List[str]] = None,
+        sort_by: Optional[str] = None,
+        sort_order: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        matched = [
+            t for t in self.threads.values()
+            if all(t["metadata"].get(k) == v for k, v in (metadata_filter or {}).items())
+        ]
+        return matched[:limit]
+
+
+def _run(test) -> Any:
+    async def run() -> Any:
+        pool = WarmThreadPool(size=2, ttl=60.0)
+        client = _FakeLangGraph()
+        pool._client = client
+        pool._task = asyncio.create_task(pool._refill_loop())
+        pool._request_refill()
+        try:
+            return await test(pool, client)
+        finally:
+            pool._task.cancel()
+
+    return asyncio.run(run())
+
+
+async def _settle() -> None:
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_claim_takes_a_thread_and_refills() -> None:
+    async def test(pool: WarmThreadPool, client: _FakeLangGraph) -> None:
+        await _settle()
+        assert pool.available == 2
+
+        assert pool.claim() == "pool-1"
+        await _settle()
+
+        assert pool.available == 2
+        assert client.created == 3
+
+    _run(test)
+
+
+def test_claim_misses_when_empty_or_disabled() -> None:
+    assert WarmThreadPool(size=0).claim() is None
+
+    async def test(pool: WarmThreadPool, client: _FakeLangGraph) -> None:
+        assert pool.claim() is None  # refill has not run yet
+        await _settle()
+        assert pool.claim() is not None
+
+    _run(test)
+
+
+def test_reaper_deletes_only_old_orphans() -> None:
+    async def test(pool: WarmThreadPool, client: _FakeLangGraph) -> None:
+        await _settle()
+        client.add("orphan", age=3600)
+        client.add("other-worker", age=30)
+        client.add("owned", age=3600, warm_pool="claimed")
+
+        assert await pool.reap_orphans() == 1
+        assert "orphan" not in client.threads
+        assert {"other-worker", "owned", "pool-1", "pool-2"} <= set(client.threads)
+
+    _run(test)
+
+
+def test_expired_pool_threads_are_replaced() -> None:
+    async def test(pool: WarmThreadPool, client: _FakeLangGraph) -> None:
+        await _settle()
+        thread_id, _ = pool._available[0]
+        pool._available[0] = (thread_id, pool._available[0][1] - 120)
+
+        assert await pool.retire_expired() == 1
+        await _settle()
+
+        assert thread_id not in client.threads
+        assert pool.available == 2
+
+    _run(test)